@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark reproductible d'UltraCompression
+Génère un corpus synthétique (create_test_files.create_benchmark_corpus), mesure chaque phase
+et écrit un rapport JSON: fichiers/s, MB/s, pic de mémoire (RSS) et latence par fichier (p50/p99).
+
+    python benchmark.py --profil rapide --moteur xz --niveau 1 --rapport bench.json
+
+Phases mesurées:
+- scan: parcours complet du corpus (FileScanner, règles d'éligibilité appliquées)
+- ordonnancement: répartition en voies et ordre des petits fichiers (LaneScheduler)
+- estimation: temps de compression estimé par le modèle de débit (à comparer à la phase pipeline)
+- pipeline: passage réel du moteur (scan, compression, vérification et suppression se
+  recouvrent dans le pipeline), avec la latence de compression de chaque fichier
+- étapes: durées cumulées de compression (par voie), de vérification et de suppression des
+  originaux, lues dans les histogrammes du moteur (la durée de compression d'un fichier
+  comprend sa vérification, aussi donnée seule)
+- processus: processus 7z lancés par fichier compressé (lots solides) et durée de lancement
+Le corpus est consommé par la phase pipeline (les originaux sont supprimés).
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import threading
+import time
+
+import psutil
+
+import config
+from compression_engine import CompressionEngine
+from create_test_files import BENCHMARK_PROFILES, create_benchmark_corpus
+from file_plan import FilePlan
+from file_scanner import FileScanner
+from lane_scheduler import LaneScheduler
+from throughput_model import ThroughputModel
+
+
+class PeakMemorySampler:
+    """Échantillonne la mémoire résidente du processus (et de ses processus 7z) en arrière-plan"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_children_rss = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                break
+
+    def _sample(self):
+        try:
+            self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+            children = 0
+            for child in self._process.children(recursive=True):
+                try:
+                    children += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak_children_rss = max(self.peak_children_rss, children)
+        except psutil.Error:
+            pass
+
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche (values trié)"""
+    if not values:
+        return 0.0
+    rank = math.ceil(fraction * len(values))
+    return values[min(len(values), max(1, rank)) - 1]
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else 0.0
+
+
+def _histogram_report(histogram):
+    """Nombre, durée cumulée (s) et latences (ms) d'un histogramme du moteur (vide s'il n'a rien mesuré)"""
+    histogram = histogram or {'count': 0, 'sum': 0.0, 'mean': 0.0, 'p50': 0.0, 'p99': 0.0}
+    return {
+        'count': histogram['count'],
+        'seconds': histogram['sum'],
+        'mean_ms': histogram['mean'] * 1000,
+        'p50_ms': histogram['p50'] * 1000,
+        'p99_ms': histogram['p99'] * 1000,
+    }
+
+
+def run_benchmark(corpus_path, backend_name, compression_level, log_callback=None):
+    """Exécute les phases sur un corpus existant; retourne le dictionnaire du rapport"""
+    log = log_callback or (lambda message, level="INFO": None)
+    engine = CompressionEngine(log_callback=log, backend_name=backend_name)
+    report = {'phases': {}}
+    MB = 1024 * 1024
+
+    # Même détection du disque que le moteur (ordre de lecture, nombre de workers)
+    engine.optimizer.configure_for_path(corpus_path)
+
+    with PeakMemorySampler() as memory:
+        # Scan seul (fichiers conservés dans un plan compact, comme l'étage de déduplication)
+        start = time.perf_counter()
+        scanner = FileScanner(engine.optimizer)
+        plan = FilePlan(scanner.scan(corpus_path))
+        elapsed = time.perf_counter() - start
+        report['phases']['scan'] = {
+            'seconds': elapsed,
+            'files': len(plan),
+            'files_per_s': _rate(len(plan), elapsed),
+            'plan_mb': plan.nbytes() / MB,
+        }
+
+        # Ordonnancement (même découpage en fenêtres que le pipeline)
+        start = time.perf_counter()
+        lanes = LaneScheduler(engine.optimizer, engine.optimizer.get_optimal_thread_count(None))
+        window, small_files = [], 0
+        for record in plan:
+            if lanes.is_large(record):
+                continue
+            small_files += 1
+            window.append(record)
+            if len(window) == config.SCHEDULER_WINDOW_SIZE:
+                lanes.order_small(window)
+                window = []
+        lanes.order_small(window)
+        elapsed = time.perf_counter() - start
+        report['phases']['ordering'] = {
+            'seconds': elapsed,
+            'files_per_s': _rate(small_files, elapsed),
+            'large_files': len(plan) - small_files,
+        }
+
+        # Estimation
+        start = time.perf_counter()
+        model = ThroughputModel.open(corpus_path, engine.backend.name, compression_level,
+                                     engine.optimizer.default_speed_mbs(), lanes.small.workers)
+        estimation = model.estimate_scan(scanner.stats)
+        report['phases']['estimation'] = {
+            'seconds': time.perf_counter() - start,
+            'estimated_seconds': estimation['estimated_seconds'],
+        }
+        del plan, window
+
+        # Passage complet, avec la latence de compression de chaque fichier
+        latencies = []
+        latencies_lock = threading.Lock()
+        compress_file = engine.compress_file
+
+        def timed_compress_file(record, level, threads=None):
+            file_start = time.perf_counter()
+            result = compress_file(record, level, threads)
+            with latencies_lock:
+                latencies.append(time.perf_counter() - file_start)
+            return result
+
+        engine.compress_file = timed_compress_file
+        start = time.perf_counter()
+        summary = engine.compress(corpus_path, compression_level) or {}
+        elapsed = time.perf_counter() - start
+        report['phases']['pipeline'] = {
+            'seconds': elapsed,
+            'processed': summary.get('processed', 0),
+            'failed': summary.get('failed', 0),
+            'files_per_s': _rate(summary.get('processed', 0), elapsed),
+            'mb_per_s': _rate(summary.get('bytes_in', 0) / MB, elapsed),
+            'bytes_in': summary.get('bytes_in', 0),
+            'bytes_out': summary.get('bytes_out', 0),
+        }
+
+    # Étapes du passage, séparées par les histogrammes du moteur
+    metrics = engine.metrics.snapshot()
+    report['steps'] = {
+        'compress': {lane: _histogram_report(metrics.get(f'ultracompression_compress_seconds{{lane="{lane}"}}'))
+                     for lane in ("petits", "gros")},
+        'verify': _histogram_report(metrics.get("ultracompression_verify_seconds")),
+        'delete': _histogram_report(metrics.get("ultracompression_delete_seconds")),
+    }
+
+    # Processus externes lancés pendant le passage (configuration par défaut du moteur)
+    spawns = metrics.get("ultracompression_7z_spawn_seconds") or {'count': 0, 'p50': 0.0}
+    report['processes'] = {
+        'solid_batches': engine.solid_batches_enabled(),
+        'spawned': spawns['count'],
+        'per_file': _rate(spawns['count'], summary.get('processed', 0)),
+        'spawn_ms_p50': spawns['p50'] * 1000,
+    }
+
+    latencies.sort()
+    report['latency_ms'] = {
+        'count': len(latencies),
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'max': (latencies[-1] if latencies else 0.0) * 1000,
+    }
+    report['peak_rss_mb'] = memory.peak_rss / MB
+    report['peak_children_rss_mb'] = memory.peak_children_rss / MB
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark reproductible d'UltraCompression (rapport JSON)")
+    parser.add_argument("--profil", choices=sorted(BENCHMARK_PROFILES), default="rapide")
+    parser.add_argument("--graine", type=int, default=42, help="graine du corpus (reproductible)")
+    parser.add_argument("--echelle", type=float, default=1.0, help="multiplie le nombre et la taille des fichiers")
+    parser.add_argument("--chemin", default="bench_corpus", help="dossier du corpus (recréé)")
+    parser.add_argument("--moteur", default=config.COMPRESSION_BACKEND, help="moteur de compression")
+    parser.add_argument("--niveau", type=int, choices=range(10), default=1, metavar="0-9")
+    parser.add_argument("--rapport", default=None, help="fichier JSON du rapport (défaut: sortie standard)")
+    parser.add_argument("--conserver", action="store_true", help="ne pas supprimer le corpus compressé")
+    parser.add_argument("-v", "--verbose", action="store_true", help="afficher les logs du moteur")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.chemin):
+        shutil.rmtree(args.chemin)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):  # La sortie standard est réservée au rapport JSON
+        files, size = create_benchmark_corpus(args.chemin, args.profil, args.graine, args.echelle)
+    generation = time.perf_counter() - start
+
+    log = (lambda message, level="INFO": print(message, file=sys.stderr)) if args.verbose else None
+    try:
+        report = run_benchmark(args.chemin, args.moteur, args.niveau, log)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if not args.conserver:
+            shutil.rmtree(args.chemin, ignore_errors=True)
+
+    report.update({
+        'profile': args.profil,
+        'seed': args.graine,
+        'scale': args.echelle,
+        'backend': args.moteur,
+        'level': args.niveau,
+        'corpus': {'files': files, 'bytes': size, 'generation_seconds': generation},
+        'system': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+    })
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.rapport:
+        with open(args.rapport, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
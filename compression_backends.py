@@ -0,0 +1,942 @@
+# -*- coding: utf-8 -*-
+"""
+Moteurs de compression interchangeables
+- SevenZipBackend: appelle l'exécutable 7z (un processus par fichier); la source est lue ici
+  par grands blocs et envoyée sur l'entrée standard de 7z (7z -si), sa sortie est ignorée.
+  Les processus des petits fichiers annoncés par prepare() sont lancés à l'avance (WarmProcessPool)
+- LzmaBackend / Bz2Backend / ZstdBackend: compression dans le processus, par blocs,
+  sans lancer de processus (lzma, bz2 et zstandard libèrent le GIL pendant la compression)
+
+cancel() interrompt les compressions en cours (processus 7z terminés, moteurs intégrés
+arrêtés au bloc suivant): l'arrêt demandé par l'utilisateur prend effet immédiatement.
+
+Vérification (config.VERIFY_MODE): les moteurs intégrés calculent la somme de contrôle de la
+source pendant sa lecture pour la compression, puis la comparent à celle stockée dans l'archive
+(CRC32 du bloc xz, XXH64 de la trame zstd): l'original n'est jamais relu.
+"""
+
+import bz2
+import locale
+import lzma
+import mmap
+import os
+import shutil
+import struct
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+
+import config
+from metrics import STAT_CALLS
+from process_pool import WarmProcessPool
+
+try:
+    import zstandard
+except ImportError:  # Dépendance optionnelle
+    zstandard = None
+
+try:
+    import xxhash
+except ImportError:  # Dépendance optionnelle
+    xxhash = None
+
+# Évite l'ouverture d'une console par processus 7z sous Windows (n'existe pas ailleurs)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def find_7zip():
+    """Trouve l'exécutable 7zip sur le système"""
+    possible_paths = [
+        "7z.exe",  # Dans le PATH
+        "C:\\Program Files\\7-Zip\\7z.exe",
+        "C:\\Program Files (x86)\\7-Zip\\7z.exe",
+        "7z",      # Linux / macOS (p7zip, 7-Zip officiel)
+        "7zz",
+        "7za",
+    ]
+
+    for path in possible_paths:
+        found = shutil.which(path)
+        if found:
+            return found
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class CompressionCancelled(Exception):
+    """Compression interrompue par cancel()"""
+
+    def __init__(self):
+        super().__init__("Compression annulée")
+
+
+class ArchiveVerificationError(Exception):
+    """L'archive écrite ne correspond pas à la source (l'original ne doit pas être supprimé)"""
+
+
+class CompressionBackend:
+    """Interface commune des moteurs de compression"""
+
+    name = ""
+    extension = ""
+    batch_extension = ""
+
+    # Un processus externe par archive: les petits fichiers gagnent à être compressés par lots
+    process_per_file = False
+
+    # MetricsRegistry optionnel (durée de lancement des processus externes)
+    metrics = None
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """Interrompt les compressions en cours et refuse les suivantes jusqu'à reset()"""
+        self.cancelled.set()
+
+    def reset(self):
+        """Autorise de nouveau les compressions (début d'un passage)"""
+        self.cancelled.clear()
+
+    def _archive_size(self, archive_path):
+        """Taille de l'archive écrite (un seul stat, compté dans les métriques)"""
+        if self.metrics is not None:
+            self.metrics.counter(STAT_CALLS, "Appels stat du passage", {"stage": "archive"}).inc()
+        try:
+            return os.path.getsize(archive_path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove_partial(archive_path):
+        """Supprime une archive incomplète ou incorrecte (absente: rien à faire)"""
+        try:
+            os.remove(archive_path)
+        except OSError:
+            pass
+
+    def _timed_verification(self):
+        """Contexte mesurant la durée d'une vérification d'archive (sans métriques: aucun effet)"""
+        if self.metrics is None:
+            return _NullTimer()
+        return self.metrics.histogram("ultracompression_verify_seconds",
+                                      "Durée de vérification d'une archive").time()
+
+    def is_available(self):
+        """Indique si le moteur peut être utilisé sur ce système"""
+        return True
+
+    def archive_path_for(self, source_path):
+        """Chemin de l'archive produite pour un fichier source"""
+        return source_path + self.extension
+
+    def describe(self, compression_level):
+        """Description courte des paramètres utilisés (pour les logs)"""
+        return f"{self.name} niveau {compression_level}"
+
+    def start_pool(self, workers):
+        """
+        Début d'un passage (workers: workers de la voie des petits fichiers).
+        Retourne True si le moteur veut que les compressions lui soient annoncées par prepare()
+        """
+        return False
+
+    def stop_pool(self):
+        """Fin d'un passage: statistiques des compressions préparées, ou None"""
+        return None
+
+    def prepare(self, source_path, archive_path, compression_level, file_size=0, threads=None):
+        """Annonce une compression à venir (sans effet pour les moteurs qui n'ont rien à préparer)"""
+
+    def compress(self, source_path, archive_path, compression_level, file_size=0, threads=None):
+        """
+        Compresse source_path vers archive_path (threads: threads par processus, si applicable).
+        Retourne (succès, taille compressée, message d'erreur)
+        """
+        raise NotImplementedError
+
+    def compress_batch(self, directory, names, archive_path, compression_level, threads=None, sizes=None):
+        """
+        Compresse plusieurs fichiers d'un répertoire dans une seule archive solide
+        (sizes: tailles relevées par le scanner, comparées à celles de l'archive si fournies).
+        Retourne (succès, taille compressée, message d'erreur)
+        """
+        raise NotImplementedError
+
+    def extract_member(self, archive_path, member_name, output_dir):
+        """Extrait un seul fichier d'une archive de lot"""
+        raise NotImplementedError
+
+
+class SevenZipBackend(CompressionBackend):
+    """Compression via l'exécutable 7z (comportement historique)"""
+
+    name = "7z"
+    extension = ".7z"
+    batch_extension = ".7z"
+    process_per_file = True
+
+    def __init__(self, optimizer, seven_zip_path=None):
+        super().__init__()
+        self.optimizer = optimizer
+        self.seven_zip_path = seven_zip_path or find_7zip()
+
+        # Processus 7z en cours, terminés par cancel()
+        self._processes = set()
+        self._processes_lock = threading.Lock()
+
+        # Processus lancés à l'avance pour les petits fichiers (config.SEVEN_ZIP_WARM_POOL)
+        self._pool = None
+
+    def is_available(self):
+        return self.seven_zip_path is not None
+
+    def describe(self, compression_level):
+        params = self.optimizer.get_optimal_compression_params(compression_level)
+        return f"7z {' '.join(params[:3])}"
+
+    def start_pool(self, workers):
+        if config.SEVEN_ZIP_STDIN and config.SEVEN_ZIP_WARM_POOL and self._pool is None:
+            self._pool = WarmProcessPool(lambda cmd: self._spawn(cmd, feed=True), self._discard,
+                                         workers, self.cancelled, self._startup_seconds(), self.metrics)
+        return self._pool is not None
+
+    def _startup_seconds(self):
+        """Durée d'un 7z lancé sans commande (lancement, initialisation, sortie): coût évité par fichier"""
+        start = time.perf_counter()
+        try:
+            subprocess.run([self.seven_zip_path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, creationflags=_NO_WINDOW, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return 0.0
+        return time.perf_counter() - start
+
+    def stop_pool(self):
+        pool, self._pool = self._pool, None
+        return pool.close() if pool is not None else None
+
+    def prepare(self, source_path, archive_path, compression_level, file_size=0, threads=None):
+        pool = self._pool
+        if pool is not None:
+            pool.hint(source_path, self._command(source_path, archive_path, compression_level, file_size, threads),
+                      archive_path)
+
+    def _command(self, source_path, archive_path, compression_level, file_size, threads):
+        # Obtenir les paramètres optimisés
+        optimized_params = self.optimizer.get_optimal_compression_params(compression_level, file_size, threads)
+
+        # Construire la commande 7zip optimisée
+        # -t7z: le format ne dépend pas de l'extension (archives écrites sous un nom temporaire)
+        # -bd: pas d'indicateur de progression (la sortie de 7z est ignorée)
+        cmd = [self.seven_zip_path, "a", "-t7z", "-bd"] + optimized_params
+        if config.SEVEN_ZIP_STDIN:
+            # Source lue par nos soins (grands blocs, lecture anticipée) et envoyée à 7z -si<nom>
+            return cmd + [f"-si{os.path.basename(source_path)}", archive_path]
+        return cmd + [archive_path, source_path]
+
+    def compress(self, source_path, archive_path, compression_level, file_size=0, threads=None):
+        cmd = self._command(source_path, archive_path, compression_level, file_size, threads)
+        feeder = _StdinFeeder(source_path, self.cancelled) if config.SEVEN_ZIP_STDIN else None
+
+        # Processus déjà lancé pour ce fichier (petits fichiers annoncés par prepare())
+        pool = self._pool
+        process = pool.take(source_path, cmd) if pool is not None and feeder is not None else None
+
+        # Exécuter la commande sans interface
+        start = time.perf_counter()
+        result = self._run(cmd, feeder=feeder, process=process)
+        if process is not None:
+            pool.observe(time.perf_counter() - start)
+
+        error = result.stderr if result.returncode != 0 else ""
+        if not error and feeder is not None and feeder.error is not None:
+            # Source illisible ou envoi interrompu: 7z a pu terminer une archive tronquée
+            error = str(feeder.error)
+        if not error and config.VERIFY_MODE != "none":
+            with self._timed_verification():
+                if feeder is not None:
+                    error = self._verify(archive_path, feeder.size, feeder.checksum.value)
+                else:
+                    error = self._verify(archive_path, file_size)
+
+        if error:
+            # 7z interrompu, en erreur ou archive incorrecte: ne jamais la laisser à côté de l'original
+            self._remove_partial(archive_path)
+            return False, 0, error
+
+        return True, self._archive_size(archive_path), ""
+
+    def _verify(self, archive_path, file_size, crc=None):
+        """
+        L'en-tête de l'archive (7z l -slt, sans décompression) doit contenir un seul fichier, de
+        la taille de la source. Si la source a été envoyée par nos soins, son CRC (calculé pendant
+        l'envoi) est comparé à celui de l'en-tête. Sinon (7z a lu lui-même la source), ou en mode
+        "full", l'archive est testée (7z t): son contenu décompressé est comparé au CRC calculé
+        par 7z pendant sa lecture de la source, sans relire celle-ci.
+        Retourne un message d'erreur ou "".
+        """
+        members, error = self._list_members(archive_path)
+        if error:
+            return error
+        if len(members) != 1:
+            return f"Vérification échouée: {len(members)} fichiers dans l'archive"
+        member = members[0]
+        # 7z n'enregistre pas de CRC pour un fichier vide
+        if member.get("Size") != str(file_size) or not (member.get("CRC") or file_size == 0):
+            return (f"Vérification échouée: taille {member.get('Size')} (source {file_size}), "
+                    f"CRC {member.get('CRC') or 'absent'}")
+        if crc is not None and file_size and member.get("CRC", "").upper() != f"{crc:08X}":
+            return f"Vérification échouée: CRC {member.get('CRC')} (source {crc:08X})"
+        if crc is None or config.VERIFY_MODE == "full":
+            return self._test_archive(archive_path)
+        return ""
+
+    def _list_members(self, archive_path):
+        """Fichiers de l'en-tête de l'archive (7z l -slt): (liste de dictionnaires, message d'erreur)"""
+        result = self._run([self.seven_zip_path, "l", "-slt", "-sccUTF-8", archive_path],
+                           capture_output=True, encoding="utf-8")
+        if result.returncode != 0:
+            return [], f"Vérification échouée: {result.stderr.strip()}"
+        return _parse_7z_listing(result.stdout), ""
+
+    def _test_archive(self, archive_path):
+        """Test complet de l'archive (7z t). Retourne un message d'erreur ou """""
+        result = self._run([self.seven_zip_path, "t", archive_path])
+        return "" if result.returncode == 0 else f"Vérification échouée: {result.stderr.strip()}"
+
+    def compress_batch(self, directory, names, archive_path, compression_level, threads=None, sizes=None):
+        # Archive solide obligatoire pour un lot, quel que soit le type de disque
+        params = self.optimizer.get_optimal_compression_params(compression_level, threads=threads)
+        params = [p for p in params if not p.startswith("-ms=")] + ["-ms=on"]
+
+        # Liste des fichiers passée via @listfile (noms relatifs au répertoire du lot); 7z est
+        # lancé dans ce répertoire: le chemin de l'archive doit être absolu
+        archive_path = os.path.abspath(archive_path)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".lst", delete=False) as listfile:
+            listfile.write("\n".join(names) + "\n")
+        try:
+            cmd = [self.seven_zip_path, "a", "-t7z", "-bd"] + params + ["-scsUTF-8", archive_path, "@" + listfile.name]
+            result = self._run(cmd, cwd=directory)
+        finally:
+            os.remove(listfile.name)
+
+        error = result.stderr if result.returncode != 0 else ""
+        if not error and config.VERIFY_MODE != "none":
+            try:
+                with self._timed_verification():
+                    error = self._verify_batch(archive_path, names, sizes)
+            except CompressionCancelled as e:
+                error = str(e)
+
+        if error:
+            self._remove_partial(archive_path)
+            return False, 0, error
+
+        return True, self._archive_size(archive_path), ""
+
+    def _verify_batch(self, archive_path, names, sizes=None):
+        """
+        L'en-tête de l'archive (7z l -slt) doit contenir exactement les fichiers du lot, chacun
+        avec la taille relevée par le scanner (sizes). 7z lit lui-même les fichiers d'un lot:
+        l'archive est ensuite testée (7z t), ce qui compare chaque fichier décompressé au CRC
+        calculé par 7z pendant sa lecture, sans relire les sources.
+        Retourne un message d'erreur ou "".
+        """
+        listed, error = self._list_members(archive_path)
+        if error:
+            return error
+        members = {member.get("Path"): member for member in listed}
+        if sorted(members) != sorted(names):
+            return f"Vérification échouée: {len(members)} fichiers dans l'archive ({len(names)} dans le lot)"
+        for name, size in zip(names, sizes or ()):
+            member = members[name]
+            if member.get("Size") != str(size) or not (member.get("CRC") or size == 0):
+                return (f"Vérification échouée: {name}, taille {member.get('Size')} (source {size}), "
+                        f"CRC {member.get('CRC') or 'absent'}")
+        if self.cancelled.is_set():
+            raise CompressionCancelled()
+        return self._test_archive(archive_path)
+
+    def _spawn(self, cmd, cwd=None, capture_output=False, feed=False):
+        """
+        Lance 7z sans interface; le processus est enregistré pour pouvoir être terminé par cancel().
+        La durée de lancement du processus est publiée dans les métriques.
+        """
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE if feed else subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE if capture_output else subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE, cwd=cwd, creationflags=_NO_WINDOW)
+        if self.metrics is not None:
+            self.metrics.histogram("ultracompression_7z_spawn_seconds",
+                                   "Durée de lancement d'un processus 7z").observe(time.perf_counter() - start)
+
+        with self._processes_lock:
+            self._processes.add(process)
+        return process
+
+    def _discard(self, process, archive_path):
+        """Arrête un processus préchauffé jamais utilisé et supprime ce qu'il a pu écrire"""
+        try:
+            process.terminate()
+            process.wait(timeout=config.CANCEL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        except OSError:
+            pass
+        for stream in (process.stdin, process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        with self._processes_lock:
+            self._processes.discard(process)
+        self._remove_partial(archive_path)
+
+    def _run(self, cmd, cwd=None, capture_output=False, feeder=None, process=None, encoding=None):
+        """
+        Exécute 7z sans interface (process: processus préchauffé déjà lancé pour cette commande).
+        capture_output: garder la sortie standard (listages); sinon elle est ignorée
+        encoding: encodage de la sortie standard (7z -scc), sinon celui du système
+        feeder: _StdinFeeder qui envoie la source sur l'entrée standard (7z -si)
+        L'erreur standard n'est décodée qu'en cas d'échec.
+        """
+        if process is None:
+            if self.cancelled.is_set():
+                return subprocess.CompletedProcess(cmd, -1, "", str(CompressionCancelled()))
+            process = self._spawn(cmd, cwd, capture_output, feed=feeder is not None)
+        try:
+            # Annulation arrivée pendant le lancement: cancel() n'a pas pu voir ce processus
+            if self.cancelled.is_set():
+                process.terminate()
+            if feeder is None:
+                stdout, stderr = process.communicate()
+            else:
+                # Erreur standard lue par un thread pendant l'envoi (7z ne doit jamais bloquer sur elle)
+                errors = []
+                reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+                reader.start()
+                feeder(process.stdin)
+                process.wait()
+                reader.join()
+                process.stderr.close()
+                stdout, stderr = None, b"".join(errors)
+        finally:
+            with self._processes_lock:
+                self._processes.discard(process)
+
+        system_encoding = locale.getpreferredencoding(False)
+        stdout = stdout.decode(encoding or system_encoding, errors="replace") if stdout else ""
+        stderr = stderr.decode(system_encoding, errors="replace") if process.returncode != 0 else ""
+        if self.cancelled.is_set() and process.returncode != 0:
+            stderr = str(CompressionCancelled())
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def cancel(self):
+        """Termine les processus 7z en cours (arrêt forcé après CANCEL_GRACE_SECONDS)"""
+        super().cancel()
+        with self._processes_lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+
+        deadline = time.time() + config.CANCEL_GRACE_SECONDS
+        for process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+
+    def extract_member(self, archive_path, member_name, output_dir):
+        cmd = [self.seven_zip_path, "e", archive_path, f"-o{output_dir}", member_name, "-y"]
+        result = self._run(cmd)
+        if result.returncode != 0:
+            raise OSError(result.stderr)
+        return os.path.join(output_dir, member_name)
+
+
+def _read_sequential(path, buffer_size):
+    """
+    Lit un fichier par grands blocs dans un tampon aligné sur la page (mmap anonyme réutilisé),
+    avec posix_fadvise(SEQUENTIAL) et lecture anticipée (WILLNEED) du bloc suivant quand le
+    système le permet. Produit des memoryview valables jusqu'au bloc suivant.
+    """
+    buffer_size = max(mmap.PAGESIZE, buffer_size - buffer_size % mmap.PAGESIZE)
+    advise = getattr(os, "posix_fadvise", None)
+    buffer = mmap.mmap(-1, buffer_size)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            if advise is not None:
+                advise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            offset = 0
+            while True:
+                if advise is not None:
+                    advise(fd, offset + buffer_size, buffer_size, os.POSIX_FADV_WILLNEED)
+                read = f.readinto(view)
+                if not read:
+                    break
+                offset += read
+                yield view[:read]
+    finally:
+        view.release()
+        try:
+            buffer.close()
+        except BufferError:
+            pass  # Dernier bloc encore référencé par l'appelant: libéré avec lui
+
+
+class _StdinFeeder:
+    """Envoie un fichier sur l'entrée standard de 7z et calcule son CRC32 au passage"""
+
+    def __init__(self, source_path, cancelled):
+        self.source_path = source_path
+        self.cancelled = cancelled
+        self.checksum = _Crc32()
+        self.size = 0
+        self.error = None
+
+    def __call__(self, stdin):
+        try:
+            for chunk in _read_sequential(self.source_path, config.SEVEN_ZIP_READ_BUFFER):
+                if self.cancelled.is_set():
+                    raise CompressionCancelled()
+                self.checksum.update(chunk)
+                self.size += len(chunk)
+                stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # 7z s'est arrêté: son code de retour et son erreur standard expliquent pourquoi
+        except (OSError, CompressionCancelled) as e:
+            self.error = e
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+
+def _parse_7z_listing(output):
+    """Propriétés (dictionnaires) des fichiers listés par 7z l -slt"""
+    members = []
+    _, separator, listing = output.partition("----------")
+    if not separator:
+        return members
+    current = None
+    for line in listing.splitlines():
+        key, sep, value = line.partition(" = ")
+        if not sep:
+            current = None
+            continue
+        if current is None:
+            current = {}
+            members.append(current)
+        current[key.strip()] = value.strip()
+    return members
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Crc32:
+    """CRC32 de la source, calculé au fil de la lecture (zlib, implémentation C)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+
+class _Xxh64:
+    """XXH64 de la source (32 bits de poids faible, comme la somme de contrôle des trames zstd)"""
+
+    __slots__ = ("_hasher",)
+
+    def __init__(self):
+        self._hasher = xxhash.xxh64()
+
+    def update(self, data):
+        self._hasher.update(data)
+
+    @property
+    def value(self):
+        return self._hasher.intdigest() & 0xFFFFFFFF
+
+
+class _ChecksumReader:
+    """Lecteur qui met à jour une somme de contrôle avec les données lues (entrée de tarfile)"""
+
+    def __init__(self, fileobj, checksum):
+        self.fileobj = fileobj
+        self.checksum = checksum
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.checksum.update(data)
+        return data
+
+
+def _read_varint(data, pos):
+    """Entier de taille variable du format xz; retourne (valeur, position suivante)"""
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("entier xz invalide")
+
+
+# Taille de la somme de contrôle des blocs xz selon son type (CRC32, CRC64, SHA-256)
+_XZ_CHECK_SIZES = {0: 0, 1: 4, 4: 8, 10: 32}
+
+
+def _xz_single_block(archive_path):
+    """
+    (taille décompressée, type de somme de contrôle, somme de contrôle) du bloc unique d'une
+    archive xz, lus dans l'index en fin de fichier sans décompresser. None si l'archive n'a
+    pas exactement un flux d'un bloc.
+    """
+    with open(archive_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:6] != b"\xfd7zXZ\x00":
+            raise ArchiveVerificationError("en-tête xz invalide")
+        check_type = header[7] & 0x0F
+        check_size = _XZ_CHECK_SIZES.get(check_type)
+
+        file_size = f.seek(0, os.SEEK_END)
+        f.seek(file_size - 12)
+        footer = f.read(12)
+        if footer[10:] != b"YZ" or footer[8:10] != header[6:8]:
+            return None
+        index_size = (struct.unpack("<I", footer[4:8])[0] + 1) * 4
+        index_start = file_size - 12 - index_size
+        f.seek(index_start)
+        index = f.read(index_size)
+        if not index or index[0] != 0 or struct.unpack("<I", index[-4:])[0] != zlib.crc32(index[:-4]):
+            raise ArchiveVerificationError("index xz invalide")
+
+        count, pos = _read_varint(index, 1)
+        if count != 1 or check_size is None:
+            return None
+        unpadded_size, pos = _read_varint(index, pos)
+        uncompressed_size, pos = _read_varint(index, pos)
+        if 12 + (unpadded_size + 3) // 4 * 4 != index_start:
+            return None  # Plusieurs flux concaténés
+
+        # Bloc: en-tête et données compressées, bourrage jusqu'à un multiple de 4, somme de contrôle
+        f.seek(12 + (unpadded_size - check_size + 3) // 4 * 4)
+        return uncompressed_size, check_type, f.read(check_size)
+
+
+def _compress_cancellable(compressor, data, cancelled):
+    """
+    Compresse data par tranches de CANCEL_CHECK_BYTES en vérifiant l'annulation entre chaque:
+    aux niveaux élevés, un bloc de 1MB peut demander plusieurs secondes de calcul
+    """
+    step = config.CANCEL_CHECK_BYTES
+    if len(data) <= step:
+        if cancelled.is_set():
+            raise CompressionCancelled()
+        return compressor.compress(data)
+    view = memoryview(data)
+    out = []
+    for offset in range(0, len(view), step):
+        if cancelled.is_set():
+            raise CompressionCancelled()
+        out.append(compressor.compress(view[offset:offset + step]))
+    return b"".join(out)
+
+
+class _CompressingWriter:
+    """Objet fichier en écriture seule qui compresse à la volée (utilisé comme sortie de tarfile)"""
+
+    def __init__(self, fileobj, compressor, cancelled):
+        self.fileobj = fileobj
+        self.compressor = compressor
+        self.cancelled = cancelled
+        self.compressed_size = 0
+
+    def write(self, data):
+        out = _compress_cancellable(self.compressor, data, self.cancelled)
+        if out:
+            self.fileobj.write(out)
+            self.compressed_size += len(out)
+        return len(data)
+
+    def finish(self):
+        out = self.compressor.flush()
+        self.fileobj.write(out)
+        self.compressed_size += len(out)
+
+
+class _StreamingBackend(CompressionBackend):
+    """Base des moteurs en processus: lecture et écriture par blocs de taille fixe"""
+
+    def _new_compressor(self, compression_level, size=None):
+        """Retourne un objet avec compress(data) et flush() (size: taille de la source, si connue)"""
+        raise NotImplementedError
+
+    def _open_decompressed(self, archive_path):
+        """Lecteur binaire du contenu décompressé d'une archive d'un seul fichier"""
+        raise NotImplementedError
+
+    def _new_checksum(self):
+        """Somme de contrôle de la source calculée pendant la compression (update(data), value)"""
+        return _Crc32()
+
+    def _stored_check(self, archive_path, checksum, size):
+        """
+        Compare la source à la somme de contrôle stockée dans l'archive, sans décompresser.
+        Retourne True/False, ou None si le format ne permet pas cette comparaison.
+        """
+        return None
+
+    def verify(self, archive_path, checksum, size):
+        """
+        Vérifie l'archive à partir de la somme de contrôle de la source (checksum) et de sa taille:
+        somme stockée dans l'archive en mode "crc", sinon décompression de l'archive (jamais de
+        relecture de la source). Lève ArchiveVerificationError en cas de différence.
+        """
+        with self._timed_verification():
+            matches = self._stored_check(archive_path, checksum, size) if config.VERIFY_MODE == "crc" else None
+            if matches is None:
+                decompressed = self._new_checksum()
+                read = 0
+                with self._open_decompressed(archive_path) as reader:
+                    while True:
+                        if self.cancelled.is_set():
+                            raise CompressionCancelled()
+                        chunk = reader.read(config.BACKEND_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        decompressed.update(chunk)
+                        read += len(chunk)
+                matches = read == size and decompressed.value == checksum.value
+        if not matches:
+            raise ArchiveVerificationError("Vérification échouée: l'archive ne correspond pas à la source")
+
+    def compress(self, source_path, archive_path, compression_level, file_size=0, threads=None):
+        compressor = self._new_compressor(compression_level, file_size or None)
+        checksum = self._new_checksum() if config.VERIFY_MODE != "none" else None
+        compressed_size = 0
+        source_size = 0
+        try:
+            with open(source_path, "rb") as source, open(archive_path, "wb") as archive:
+                while True:
+                    chunk = source.read(config.BACKEND_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if checksum is not None:
+                        checksum.update(chunk)
+                    source_size += len(chunk)
+                    data = _compress_cancellable(compressor, chunk, self.cancelled)
+                    if data:
+                        archive.write(data)
+                        compressed_size += len(data)
+                data = compressor.flush()
+                archive.write(data)
+                compressed_size += len(data)
+            if checksum is not None:
+                self.verify(archive_path, checksum, source_size)
+        except Exception as e:
+            # Ne jamais laisser une archive partielle à côté de l'original
+            self._remove_partial(archive_path)
+            return False, 0, str(e)
+
+        return True, compressed_size, ""
+
+    def compress_batch(self, directory, names, archive_path, compression_level, threads=None, sizes=None):
+        # Archive tar compressée en flux: solide par construction
+        verify = config.VERIFY_MODE != "none"
+        members = []  # (nom, taille, CRC32) de chaque source, calculés pendant l'écriture
+        try:
+            with open(archive_path, "wb") as archive:
+                writer = _CompressingWriter(archive, self._new_compressor(compression_level), self.cancelled)
+                with tarfile.open(fileobj=writer, mode="w|", bufsize=config.BACKEND_CHUNK_SIZE) as tar:
+                    for name in names:
+                        path = os.path.join(directory, name)
+                        info = tar.gettarinfo(path, arcname=name)
+                        checksum = _Crc32()
+                        with open(path, "rb") as source:
+                            tar.addfile(info, _ChecksumReader(source, checksum) if verify else source)
+                        members.append((name, info.size, checksum.value))
+                writer.finish()
+            if sizes is not None and [member[1] for member in members] != list(sizes):
+                raise ArchiveVerificationError("Vérification échouée: taille modifiée depuis l'analyse")
+            if verify:
+                self.verify_batch(archive_path, members)
+        except Exception as e:
+            self._remove_partial(archive_path)
+            return False, 0, str(e)
+
+        return True, writer.compressed_size, ""
+
+    def verify_batch(self, archive_path, members):
+        """
+        Relit l'archive d'un lot et compare chaque fichier (nom, taille, CRC32 du contenu
+        décompressé) à sa source. Un tar ne stocke aucune somme par fichier: l'archive est
+        toujours décompressée, quel que soit VERIFY_MODE. Lève ArchiveVerificationError.
+        """
+        found = []
+        with self._timed_verification(), self._open_tar_for_reading(archive_path) as tar:
+            for member in tar:
+                checksum = _Crc32()
+                reader = tar.extractfile(member)
+                if reader is not None:
+                    while True:
+                        if self.cancelled.is_set():
+                            raise CompressionCancelled()
+                        chunk = reader.read(config.BACKEND_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        checksum.update(chunk)
+                found.append((member.name, member.size, checksum.value))
+        if found != members:
+            raise ArchiveVerificationError("Vérification échouée: le lot ne correspond pas aux fichiers source")
+
+    def _open_tar_for_reading(self, archive_path):
+        return tarfile.open(archive_path, "r:*")
+
+    def extract_member(self, archive_path, member_name, output_dir):
+        # Parcours séquentiel: fonctionne aussi pour les archives lues en flux (zstd)
+        with self._open_tar_for_reading(archive_path) as tar:
+            for member in tar:
+                if member.name == member_name:
+                    tar.extract(member, output_dir)
+                    return os.path.join(output_dir, member_name)
+        raise KeyError(f"{member_name} absent de {archive_path}")
+
+
+class LzmaBackend(_StreamingBackend):
+    """Archives .xz produites avec le module lzma de Python"""
+
+    name = "xz"
+    extension = ".xz"
+    batch_extension = ".tar.xz"
+
+    def _new_compressor(self, compression_level, size=None):
+        # CRC32 par bloc: la somme stockée est directement comparable à celle calculée sur la source
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, check=lzma.CHECK_CRC32, preset=compression_level)
+
+    def _open_decompressed(self, archive_path):
+        return lzma.open(archive_path, "rb")
+
+    def _stored_check(self, archive_path, checksum, size):
+        block = _xz_single_block(archive_path)
+        if block is None or block[1] != lzma.CHECK_CRC32:
+            return None
+        uncompressed_size, _, stored = block
+        return uncompressed_size == size and struct.unpack("<I", stored)[0] == checksum.value
+
+
+class Bz2Backend(_StreamingBackend):
+    """Archives .bz2 produites avec le module bz2 de Python"""
+
+    name = "bz2"
+    extension = ".bz2"
+    batch_extension = ".tar.bz2"
+
+    def _new_compressor(self, compression_level, size=None):
+        # bz2 n'accepte que les niveaux 1 à 9
+        return bz2.BZ2Compressor(max(1, compression_level))
+
+    def _open_decompressed(self, archive_path):
+        # Le CRC stocké par bz2 n'est pas un CRC32 zlib: vérification par décompression
+        return bz2.open(archive_path, "rb")
+
+
+class ZstdBackend(_StreamingBackend):
+    """Archives .zst produites avec le paquet optionnel zstandard"""
+
+    name = "zstd"
+    extension = ".zst"
+    batch_extension = ".tar.zst"
+
+    # Correspondance niveaux 0-9 de l'application → niveaux zstd 1-19
+    LEVELS = {0: 1, 1: 1, 2: 2, 3: 3, 4: 5, 5: 7, 6: 9, 7: 12, 8: 16, 9: 19}
+
+    def is_available(self):
+        return zstandard is not None
+
+    def _new_compressor(self, compression_level, size=None):
+        # Taille de la source écrite dans l'en-tête de trame: comparée par _stored_check()
+        cctx = zstandard.ZstdCompressor(level=self.LEVELS.get(compression_level, 7), write_checksum=True,
+                                        write_content_size=True)
+        return cctx.compressobj(size=size if size else -1)
+
+    def _open_decompressed(self, archive_path):
+        return zstandard.ZstdDecompressor().stream_reader(open(archive_path, "rb"), closefd=True)
+
+    def _new_checksum(self):
+        # Avec xxhash, la somme de la source est comparable à celle de la trame (4 derniers octets)
+        return _Xxh64() if xxhash is not None else _Crc32()
+
+    def _stored_check(self, archive_path, checksum, size):
+        if xxhash is None:
+            return None
+        with open(archive_path, "rb") as f:
+            params = zstandard.get_frame_parameters(f.read(18))  # En-tête de trame: 18 octets au plus
+            f.seek(-4, os.SEEK_END)
+            stored = struct.unpack("<I", f.read(4))[0]
+        # Taille absente de l'en-tête (source vide ou taille inconnue): vérification par décompression
+        if params.content_size in (0, getattr(zstandard, "CONTENTSIZE_UNKNOWN", -1)):
+            return None
+        return params.content_size == size and stored == checksum.value
+
+    def _open_tar_for_reading(self, archive_path):
+        # tarfile ne connaît pas zstd: décompression en flux
+        reader = zstandard.ZstdDecompressor().stream_reader(open(archive_path, "rb"), closefd=True)
+        return tarfile.open(fileobj=reader, mode="r|")
+
+
+BACKENDS = {
+    "7z": SevenZipBackend,
+    "xz": LzmaBackend,
+    "bz2": Bz2Backend,
+    "zstd": ZstdBackend,
+}
+
+
+def get_backend(optimizer, name=None):
+    """
+    Instancie le moteur demandé (config.COMPRESSION_BACKEND par défaut).
+    "auto" utilise 7z s'il est installé, sinon la compression xz intégrée.
+    Retourne None si le moteur demandé n'est pas disponible.
+    """
+    name = name or config.COMPRESSION_BACKEND
+
+    if name == "auto":
+        for candidate in ("7z", "xz"):
+            backend = get_backend(optimizer, candidate)
+            if backend is not None:
+                return backend
+        return None
+
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        return None
+
+    backend = backend_class(optimizer) if backend_class is SevenZipBackend else backend_class()
+    return backend if backend.is_available() else None
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de compression UltraCompression, sans interface graphique
+Regroupe l'analyse (scan + estimation), la compression et la vérification d'un disque.
+Importable sans tkinter: utilisé par l'interface graphique, la ligne de commande et les benchmarks.
+
+Les messages sont transmis par deux fonctions de rappel:
+- log_callback(message, niveau): logs détaillés en temps réel
+- event_callback(type, *données): événements de progression ("status", "total", "progress",
+  "log", "error_log", "time_estimate", "optimizations", "complete", "stopped", "error")
+"""
+
+import os
+import time
+
+import config
+from compression_backends import get_backend, SevenZipBackend
+from compression_journal import CompressionJournal
+from compression_optimizer import CompressionOptimizer
+from compression_pipeline import CompressionPipeline, CompressionResult
+from concurrency_controller import AdaptiveConcurrencyController
+from deduplication import Deduplicator
+from device_probe import describe as describe_device, disk_name
+from entropy_sampler import EntropySampler
+from file_scanner import FileScanner
+from metrics import MetricsExporter, MetricsRegistry, PrometheusEndpoint, STAT_CALLS
+from scan_index import ScanIndex
+from solid_batches import write_solid_batch
+from throughput_model import ThroughputModel
+
+
+class CompressionEngine:
+    """Analyse et compresse un disque; toutes les interfaces (GUI, CLI) passent par ce moteur"""
+
+    def __init__(self, log_callback=None, event_callback=None, should_continue=None, backend_name=None):
+        """
+        should_continue: fonction sans argument, False pour demander l'arrêt
+        backend_name: moteur de compression (config.COMPRESSION_BACKEND par défaut)
+        Lève RuntimeError si le moteur de compression demandé n'est pas disponible.
+        """
+        self.log = log_callback or (lambda message, level="INFO": None)
+        self.emit = event_callback or (lambda *event: None)
+        self.should_continue = should_continue or (lambda: True)
+
+        self.optimizer = CompressionOptimizer()
+
+        # Moteur de compression (7zip ou compression intégrée)
+        self.backend = get_backend(self.optimizer, backend_name)
+        if self.backend is None:
+            raise RuntimeError(f"Moteur de compression '{backend_name or config.COMPRESSION_BACKEND}' indisponible "
+                               "(7zip n'est pas installé ou introuvable dans le PATH)")
+
+        self.journal = None
+        self.controller = None
+        self.sampler = None
+
+        # Budget de threads partagé avec les moteurs des autres disques (CpuBudget, JobManager)
+        self.cpu_budget = None
+
+        # Métriques du dernier passage (MetricsRegistry), lisibles après compress()
+        self.metrics = None
+
+        # Archive temporaire attribuée à chaque petit fichier annoncé au moteur (prepare_file)
+        self._prepared = {}
+
+        # Vitesses apprises et temps restant du passage en cours (ThroughputModel)
+        self.throughput_model = None
+        self._last_eta = 0.0
+        self._last_model_save = 0.0
+
+    def describe_backend(self):
+        """Description du moteur de compression (pour les logs de démarrage)"""
+        if isinstance(self.backend, SevenZipBackend):
+            return f"📦 7zip trouvé: {os.path.basename(self.backend.seven_zip_path)}"
+        return f"📦 Moteur de compression intégré: {self.backend.name}"
+
+    # ------------------------------------------------------------------
+    # Analyse sans compression
+    # ------------------------------------------------------------------
+
+    def plan(self, root_path, compression_level=5):
+        """
+        Analyse le disque sans rien modifier (ni compression, ni index, ni journal).
+        Retourne (statistiques du scan, estimation du temps de compression); l'estimation
+        utilise les vitesses apprises lors des passages précédents sur ce disque.
+        """
+        self.optimizer.configure_for_path(root_path)
+        scanner = FileScanner(self.optimizer, self.log, self.should_continue)
+        for _ in scanner.scan(root_path):
+            pass
+        model = self._open_throughput_model(root_path, compression_level)
+        return scanner.stats, model.estimate_scan(scanner.stats)
+
+    def _open_throughput_model(self, root_path, compression_level):
+        return ThroughputModel.open(root_path, self.backend.name, compression_level,
+                                    self.optimizer.default_speed_mbs(),
+                                    self.optimizer.get_optimal_thread_count(None), self.log)
+
+    # ------------------------------------------------------------------
+    # Compression
+    # ------------------------------------------------------------------
+
+    def compress_file(self, record, compression_level, threads=None):
+        """
+        Compresse un fichier individuel avec le moteur configuré
+        (threads: threads par processus de compression fixés par la voie du fichier).
+        La vérification et la suppression de l'original sont faites par l'étage de finalisation.
+        """
+        file_path = record.path
+        filename = os.path.basename(file_path)
+        output_path = self.backend.archive_path_for(file_path)
+        try:
+            # Log du début de compression
+            self.log(f"🔄 {filename}", "COMPRESS")
+
+            # Avec le journal, l'archive est écrite sous un nom temporaire puis renommée
+            # (nom déjà attribué si la compression a été annoncée par prepare_file)
+            journal = self.journal
+            target_path = self._prepared.pop(file_path, None)
+            if target_path is None:
+                target_path = journal.partial_path(output_path) if journal is not None else output_path
+
+            success, compressed_size, error = self.backend.compress(
+                file_path, target_path, compression_level, record.size, threads)
+
+            if success:
+                if journal is not None:
+                    journal.commit_archive(target_path, output_path)
+                return CompressionResult(record, True, output_path, compressed_size, "")
+            else:
+                return CompressionResult(record, False, output_path, 0,
+                                         f"Erreur compression {filename}: {error}")
+
+        except Exception as e:
+            return CompressionResult(record, False, output_path, 0, f"Erreur: {e}")
+
+    def prepare_file(self, record, compression_level, threads=None):
+        """Annonce au moteur un petit fichier qui sera compressé (processus 7z lancé à l'avance)"""
+        output_path = self.backend.archive_path_for(record.path)
+        target_path = self.journal.partial_path(output_path) if self.journal is not None else output_path
+        self._prepared[record.path] = target_path
+        self.backend.prepare(record.path, target_path, compression_level, record.size, threads)
+
+    def compress_batch(self, batch, compression_level, threads=None):
+        """Compresse un lot de petits fichiers dans une archive solide avec manifeste"""
+        self.log(f"📦 Lot de {len(batch.records)} fichiers: {os.path.basename(batch.directory) or batch.directory}", "COMPRESS")
+        return write_solid_batch(self.backend, batch, compression_level, self.journal, threads)
+
+    def solid_batches_enabled(self):
+        """Lots solides: selon SOLID_BATCH_ENABLED, ou automatiques si le moteur lance un processus par archive"""
+        if config.SOLID_BATCH_ENABLED is None:
+            return self.backend.process_per_file
+        return config.SOLID_BATCH_ENABLED
+
+    def compress(self, root_path, compression_level):
+        """
+        Compresse récursivement root_path (pipeline scan → compression → vérification).
+        Retourne le résumé du pipeline, ou None en cas d'erreur critique.
+        """
+        if not root_path or not os.path.exists(root_path):
+            self.emit("error", "Disque sélectionné invalide")
+            return None
+
+        self.emit("log", f"Démarrage de la compression sur {root_path}")
+        self.emit("log", f"Niveau de compression: {compression_level}")
+        self.log("🚀 Initialisation de la compression", "INFO")
+        self.log(f"📁 Disque cible: {root_path}", "INFO")
+        self.log(f"⚙️ Niveau de compression: {compression_level}", "INFO")
+
+        # Informations d'optimisation (périphérique du disque cible, mesure de lecture)
+        device = self.optimizer.configure_for_path(root_path)
+        disk_type = self.optimizer.disk_type
+        cpu_count = self.optimizer.cpu_count
+        available_ram = self.optimizer.available_memory / (1024**3)  # GB
+
+        self.emit("optimizations", f"{disk_type}, {cpu_count} CPU cores")
+        self.log("🔧 Configuration système détectée:", "INFO")
+        self.log(f"   💾 Type de disque: {describe_device(device)}", "INFO")
+        self.log(f"   🖥️ CPU cores: {cpu_count}", "INFO")
+        self.log(f"   💻 RAM disponible: {available_ram:.1f} GB", "INFO")
+
+        # Nombre de workers (nombre de fichiers encore inconnu: le scan tourne en parallèle)
+        max_workers = self.optimizer.get_optimal_thread_count(None)
+        self.emit("log", f"Utilisation de {max_workers} threads pour la compression")
+        self.log("⚡ Optimisations appliquées:", "INFO")
+        self.log(f"   🔀 Threads parallèles: {max_workers}", "INFO")
+
+        # Contrôleur adaptatif: ajuste le nombre de workers selon le débit, le CPU et le disque
+        self.controller = None
+        if config.ADAPTIVE_CONCURRENCY:
+            # Le disque ne peut qu'abaisser la limite fixée par le CPU (ou la configuration)
+            cpu_cap = config.ADAPTIVE_MAX_WORKERS or cpu_count
+            io_cap = self.optimizer.max_io_workers()
+            self.controller = AdaptiveConcurrencyController(
+                cpu_count, max_workers, min(cpu_cap, io_cap) if io_cap is not None else cpu_cap, self.log,
+                disk=disk_name(root_path))
+            io_text = f"disque {io_cap}" if io_cap is not None else "disque sans limite connue"
+            self.log(f"   📈 Concurrence adaptative: 1 à {self.controller.max_workers} workers "
+                     f"(CPU {cpu_cap}, {io_text})", "INFO")
+        self.log(f"   📋 Ordonnancement par fenêtres de {config.SCHEDULER_WINDOW_SIZE} fichiers", "INFO")
+        solid_batches = self.solid_batches_enabled()
+        if solid_batches:
+            self.log(f"   📦 Lots solides pour les fichiers < {config.SOLID_BATCH_THRESHOLD // 1024} KB", "INFO")
+        if config.SEVEN_ZIP_WARM_POOL and not config.SEVEN_ZIP_STDIN and self.backend.name == "7z":
+            self.log("   ⚠️ SEVEN_ZIP_WARM_POOL sans effet: nécessite SEVEN_ZIP_STDIN = True", "WARNING")
+
+        # Paramètres du moteur pour ce niveau
+        self.log(f"   🗜️ Paramètres: {self.backend.describe(compression_level)}", "INFO")
+
+        self.emit("status", "Analyse et compression en cours...")
+        self.log("🔍 Début de l'analyse des fichiers...", "ANALYSIS")
+        self.log("🎯 La compression démarre dès les premiers fichiers trouvés", "COMPRESS")
+
+        # Journal: reprise d'un passage interrompu (archives partielles, suppressions en attente)
+        self.journal = CompressionJournal.open(root_path, self.log) if config.JOURNAL_ENABLED else None
+        if self.journal is not None:
+            try:
+                self.journal.recover(self.log)
+            except OSError as e:
+                self.log(f"⚠️ Reprise du journal impossible: {e}", "WARNING")
+                self.journal = None
+
+        # Index persistant: les répertoires inchangés depuis le dernier passage ne sont pas relus
+        index = ScanIndex.open(root_path, self.log) if config.SCAN_INDEX_ENABLED else None
+        if index is not None:
+            self.log(f"🗂️ Index de scan: {index.db_path}", "INFO")
+
+        # Métriques: export périodique JSON lines et point d'accès Prometheus optionnel
+        self.metrics = MetricsRegistry()
+        self.backend.metrics = self.metrics
+        self.backend.reset()
+        exporters = self._start_metrics_export(root_path)
+
+        scanner = FileScanner(self.optimizer, self.log, self.should_continue,
+                              apply_file_rules=False, index=index, metrics=self.metrics)
+        pipeline = CompressionPipeline(
+            scanner, self.optimizer,
+            lambda record, threads: self.compress_file(record, compression_level, threads),
+            max_workers,
+            log_callback=self.log,
+            event_callback=self.emit,
+            should_continue=self.should_continue,
+            on_scan_complete=self._on_scan_complete,
+            compress_batch_func=(lambda batch, threads: self.compress_batch(batch, compression_level, threads))
+                                if solid_batches else None,
+            controller=self.controller
+        )
+
+        lanes = pipeline.lanes
+        self.log(f"   🛣️ Gros fichiers (≥ {lanes.threshold // (1024 * 1024)} MB): "
+                 f"{lanes.large.workers} workers × {lanes.large.threads} threads, plus gros d'abord", "INFO")
+        if self.controller is not None:
+            self.log(f"   🛣️ Petits fichiers: {lanes.small.workers} workers, -mmt réglé par le contrôleur "
+                     f"(actuellement {self.controller.threads_per_process()})", "INFO")
+        else:
+            self.log(f"   🛣️ Petits fichiers: {lanes.small.workers} workers mono-thread", "INFO")
+
+        if index is not None:
+            pipeline.add_filter(index.filter_record)
+            pipeline.add_result_listener(index.record_result)
+
+        # Échantillonnage après l'index: les fichiers déjà écartés et inchangés ne sont pas relus
+        self.sampler = EntropySampler(index=index) if config.ENTROPY_SAMPLING_ENABLED else None
+        if self.sampler is not None:
+            pipeline.add_filter(self.sampler.filter_record)
+
+        # Modèle de débit: temps restant recalculé au fil des compressions
+        self.throughput_model = self._open_throughput_model(root_path, compression_level)
+        self._last_eta = self._last_model_save = time.time()
+        pipeline.throughput_model = self.throughput_model
+        pipeline.add_result_listener(self._on_result)
+        self.metrics.gauge("ultracompression_eta_seconds", "Temps restant estimé par le modèle de débit",
+                           func=self.throughput_model.estimate)
+
+        if config.DEDUP_ENABLED:
+            pipeline.deduplicator = Deduplicator(self.metrics)
+            pipeline.add_stop_listener(pipeline.deduplicator.cancel)
+            self.log("   🔎 Déduplication: la compression démarre après la fin du scan", "INFO")
+
+        pipeline.journal = self.journal
+        pipeline.metrics = self.metrics
+        pipeline.cpu_budget = self.cpu_budget
+
+        # Processus 7z des petits fichiers lancés dès leur entrée dans la file de leur voie
+        self._prepared = {}
+        if self.backend.start_pool(lanes.small.workers):
+            pipeline.prepare_func = lambda record, threads: self.prepare_file(record, compression_level, threads)
+
+        # Arrêt: processus 7z terminés et compressions intégrées interrompues au bloc suivant
+        pipeline.add_stop_listener(self.backend.cancel)
+
+        # Passage complet: pipeline terminé sans arrêt ni étage interrompu par une erreur
+        pipeline_completed = False
+        try:
+            summary = pipeline.run(root_path)
+            pipeline_completed = self.should_continue() and summary['stage_errors'] == 0
+        except Exception as e:
+            self.emit("log", f"Erreur critique du pipeline: {e}")
+            self.log(f"💥 Erreur critique: {e}", "ERROR")
+            self.emit("error", f"Erreur critique: {e}")
+            return None
+        finally:
+            # Processus préchauffés jamais utilisés arrêtés avant la fermeture du journal
+            pool_stats = self.backend.stop_pool()
+            if index is not None:
+                index.finish_run(completed=pipeline_completed)
+            if self.journal is not None:
+                self.journal.close(completed=pipeline_completed)
+                self.journal = None
+            for exporter in exporters:
+                exporter.stop()
+            self._save_throughput_model()
+
+        if pool_stats is not None:
+            summary['warm_pool'] = pool_stats
+            self.log(f"🔥 Processus 7z préchauffés: {pool_stats['hits']}/{pool_stats['hits'] + pool_stats['misses']} "
+                     f"fichiers sans attendre de lancement ({pool_stats['hit_rate'] * 100:.0f}%), pool de "
+                     f"{pool_stats['size']} (démarrage de 7z {pool_stats['startup_seconds'] * 1000:.1f} ms, "
+                     f"compression {pool_stats['service_seconds'] * 1000:.1f} ms)", "INFO")
+
+        # Chaque fichier est lu par un seul stat (scanner), repris par tous les étages
+        summary['stat_calls'] = self.metrics.total(STAT_CALLS)
+        self.log(f"🧮 {summary['stat_calls']} appels stat pour {scanner.stats.files_found} fichiers", "INFO")
+
+        if not self.should_continue():
+            self.log("⏹️ Compression arrêtée par l'utilisateur", "WARNING")
+            self.emit("stopped", "Compression arrêtée par l'utilisateur")
+        elif summary['stage_errors']:
+            self.log("⚠️ Compression incomplète: un étage du pipeline s'est arrêté sur une erreur", "WARNING")
+            self.emit("complete", f"Compression incomplète! {summary['processed']} fichiers traités")
+        elif summary['discovered'] == 0:
+            self.log("⚠️ Aucun fichier éligible trouvé", "WARNING")
+            self.emit("complete", "Aucun fichier à compresser")
+        else:
+            self.log("🎉 Compression terminée avec succès!", "SUCCESS")
+            self.emit("complete", f"Compression terminée! {summary['processed']} fichiers traités")
+        return summary
+
+    def _start_metrics_export(self, root_path):
+        """Démarre les exports de métriques configurés; retourne la liste à arrêter en fin de passage"""
+        exporters = []
+        if not config.METRICS_ENABLED:
+            return exporters
+
+        exporter = MetricsExporter.open(self.metrics, root_path, self.log)
+        if exporter is not None:
+            exporter.start()
+            exporters.append(exporter)
+            self.log(f"📏 Métriques: {exporter.path} (toutes les {exporter.interval:.0f} s)", "INFO")
+
+        if config.METRICS_PROMETHEUS_PORT is not None:
+            try:
+                endpoint = PrometheusEndpoint(self.metrics, config.METRICS_PROMETHEUS_PORT)
+            except OSError as e:
+                self.log(f"⚠️ Point d'accès Prometheus indisponible: {e}", "WARNING")
+            else:
+                endpoint.start()
+                exporters.append(endpoint)
+                self.log(f"📏 Métriques Prometheus: http://127.0.0.1:{endpoint.port}/metrics", "INFO")
+        return exporters
+
+    def _on_result(self, result, success):
+        """Écouteur du pipeline: temps restant et sauvegarde périodiques des vitesses apprises"""
+        now = time.time()
+        if now - self._last_eta >= config.THROUGHPUT_ETA_INTERVAL:
+            self._last_eta = now
+            self.emit("time_estimate", self.throughput_model.format_eta())
+        if now - self._last_model_save >= config.THROUGHPUT_SAVE_INTERVAL:
+            self._last_model_save = now
+            self._save_throughput_model()
+
+    def _save_throughput_model(self):
+        try:
+            self.throughput_model.save()
+        except OSError as e:
+            self.log(f"⚠️ Vitesses apprises non enregistrées: {e}", "WARNING")
+
+    def _on_scan_complete(self, scan_stats):
+        """Appelé par le pipeline quand le scan est terminé: statistiques et estimation"""
+        self.emit("log", f"Fichiers à traiter: {scan_stats.eligible_files}")
+        self.log(f"📊 {scan_stats.eligible_files} fichiers éligibles détectés", "ANALYSIS")
+        if self.sampler is not None and self.sampler.stats['skipped']:
+            sampler_stats = self.sampler.stats
+            self.log(f"🎲 {sampler_stats['skipped']} fichiers incompressibles ignorés "
+                     f"({sampler_stats['skipped_bytes']/(1024*1024):.1f} MB, "
+                     f"{sampler_stats['cache_hits']} décisions en cache)", "ANALYSIS")
+        if scan_stats.eligible_files == 0:
+            return
+
+        # Logger les statistiques des types de fichiers (issues du scan, sans nouveau stat)
+        self.log("📈 Analyse des types de fichiers:", "ANALYSIS")
+        for ext, count in scan_stats.top_file_types(10):
+            self.log(f"   {ext}: {count} fichiers", "ANALYSIS")
+
+        self.log(f"💾 Taille totale à compresser: {scan_stats.total_size/(1024*1024):.1f} MB", "ANALYSIS")
+
+        # Estimer le temps de compression à partir des tailles du scan et des vitesses apprises
+        estimation = self.throughput_model.estimate_scan(scan_stats)
+        self.emit("log", f"Estimation: {estimation['estimated_minutes']:.1f} minutes pour {estimation['total_size_mb']:.1f} MB")
+        self.emit("time_estimate", self.throughput_model.format_eta())
+
+        # Détails de l'estimation
+        self.log("⏱️ Estimations détaillées:", "ANALYSIS")
+        self.log(f"   📊 Taille totale: {estimation['total_size_mb']:.1f} MB", "ANALYSIS")
+        # Estimation nulle (fichiers vides, ou modèle sans durée pour ces fichiers): pas de vitesse
+        if estimation['estimated_minutes'] > 0:
+            speed = estimation['total_size_mb'] / estimation['estimated_minutes']
+            self.log(f"   📈 Vitesse estimée: {speed:.1f} MB/min", "ANALYSIS")
+        self.log(f"   ⏱️ Temps estimé: {estimation['estimated_minutes']:.1f} minutes", "ANALYSIS")
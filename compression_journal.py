@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Journal de compression résistant aux plantages
+Chaque fichier passe par les états queued → compressing → verified → deleted (ou failed).
+Les entrées sont écrites par lots (pas de fsync par fichier) et rejouées au démarrage
+du passage suivant pour reprendre le travail là où il s'est arrêté.
+
+Les archives sont écrites dans un dossier temporaire du disque cible puis renommées
+atomiquement: une archive partielle n'est jamais visible à côté de l'original et
+toutes les archives partielles d'un passage interrompu sont supprimées à la reprise.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+
+import config
+
+# Codes d'état courts pour limiter la taille du journal
+QUEUED = "q"
+COMPRESSING = "c"
+VERIFIED = "v"
+DELETED = "d"
+FAILED = "f"
+
+
+class CompressionJournal:
+    """
+    Journal d'écriture anticipée des états de compression d'un disque.
+    recover() doit être appelé avant le passage: il rejoue l'ancien journal puis en ouvre un nouveau.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = root_path
+        state_dir = os.path.join(root_path, config.STATE_DIR_NAME)
+        self.journal_path = os.path.join(state_dir, config.JOURNAL_FILE)
+        self.partial_dir = os.path.join(state_dir, config.JOURNAL_PARTIAL_DIR)
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.time()
+        self._counter = itertools.count(1)
+        self._file = None
+
+    @classmethod
+    def open(cls, root_path, log_callback=None):
+        """Ouvre le journal du disque, ou retourne None s'il est inaccessible"""
+        try:
+            return cls(root_path)
+        except OSError as e:
+            if log_callback:
+                log_callback(f"⚠️ Journal indisponible, reprise impossible: {e}", "WARNING")
+            return None
+
+    # ------------------------------------------------------------------
+    # Reprise
+    # ------------------------------------------------------------------
+
+    def recover(self, log_callback=None):
+        """
+        Rejoue le journal d'un passage interrompu:
+        - supprime les archives partielles
+        - termine les suppressions d'originaux dont l'archive était déjà vérifiée
+        Retourne un dictionnaire de statistiques de reprise.
+        """
+        log = log_callback or (lambda message, level="INFO": None)
+        stats = {'partials_removed': 0, 'deletions_resumed': 0, 'interrupted': 0, 'completed': 0}
+
+        # Archives partielles: tout le contenu du dossier temporaire
+        for name in os.listdir(self.partial_dir):
+            try:
+                os.remove(os.path.join(self.partial_dir, name))
+                stats['partials_removed'] += 1
+            except OSError:
+                continue
+
+        # Dernier état connu de chaque fichier
+        last_states = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Dernière ligne tronquée par le plantage
+                    last_states[entry["p"]] = entry
+
+        for path, entry in last_states.items():
+            state = entry["s"]
+            if state == DELETED:
+                stats['completed'] += 1
+            elif state == VERIFIED:
+                archive_path = entry.get("a")
+                # Ne supprimer l'original que si son archive vérifiée est bien présente
+                if archive_path and os.path.exists(archive_path) and os.path.exists(path):
+                    try:
+                        os.remove(path)
+                        stats['deletions_resumed'] += 1
+                    except OSError as e:
+                        log(f"❌ Reprise: suppression impossible de {os.path.basename(path)}: {e}", "ERROR")
+                        continue
+                stats['completed'] += 1
+            elif state in (QUEUED, COMPRESSING):
+                stats['interrupted'] += 1
+
+        if last_states:
+            log(f"♻️ Reprise du passage précédent: {stats['completed']} fichiers déjà traités, "
+                f"{stats['interrupted']} interrompus", "INFO")
+        if stats['deletions_resumed']:
+            log(f"♻️ {stats['deletions_resumed']} suppressions d'originaux terminées", "INFO")
+        if stats['partials_removed']:
+            log(f"🧹 {stats['partials_removed']} archives partielles supprimées", "INFO")
+
+        # Le journal rejoué n'est plus utile: on repart d'un journal vide
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        return stats
+
+    # ------------------------------------------------------------------
+    # Archives partielles
+    # ------------------------------------------------------------------
+
+    def partial_path(self, archive_path):
+        """Chemin temporaire unique où écrire une archive avant son renommage"""
+        name = f"{next(self._counter):08d}_{os.path.basename(archive_path)}{config.PARTIAL_SUFFIX}"
+        return os.path.join(self.partial_dir, name)
+
+    @staticmethod
+    def commit_archive(partial_path, archive_path):
+        """Publie une archive terminée à son emplacement final (renommage atomique)"""
+        try:
+            os.replace(partial_path, archive_path)
+        except OSError:
+            # Racine et fichier sur des systèmes de fichiers différents (point de montage)
+            shutil.move(partial_path, archive_path)
+
+    # ------------------------------------------------------------------
+    # États (appelés par le pipeline)
+    # ------------------------------------------------------------------
+
+    def queued(self, record):
+        self._append({"s": QUEUED, "p": record.path})
+
+    def compressing(self, record):
+        self._append({"s": COMPRESSING, "p": record.path})
+
+    def verified(self, record, archive_path):
+        self._append({"s": VERIFIED, "p": record.path, "a": archive_path})
+
+    def deleted(self, record):
+        self._append({"s": DELETED, "p": record.path})
+
+    def failed(self, record):
+        self._append({"s": FAILED, "p": record.path})
+
+    def _append(self, entry):
+        """Ajoute une entrée au tampon; écriture + fsync par lots"""
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            now = time.time()
+            if (len(self._buffer) >= config.JOURNAL_FLUSH_EVERY
+                    or now - self._last_flush >= config.JOURNAL_FLUSH_INTERVAL):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._file is None or not self._buffer:
+            return
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+        self._last_flush = time.time()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self, completed):
+        """Ferme le journal; un passage terminé n'a plus rien à reprendre"""
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None:
+                if completed:
+                    self._file.truncate(0)
+                self._file.close()
+                self._file = None
@@ -6,9 +6,10 @@ Contient des algorithmes pour maximiser la vitesse de compression
 
 import os
 import psutil
-from pathlib import Path
 from collections import defaultdict
 import config
+from device_probe import DeviceInfo, detect_device
+from exclusion_rules import ExclusionRules
 
 class CompressionOptimizer:
     """Optimise l'ordre et la méthode de compression des fichiers"""
@@ -16,58 +17,42 @@ class CompressionOptimizer:
     def __init__(self):
         self.cpu_count = os.cpu_count()
         self.available_memory = psutil.virtual_memory().available
-        self.disk_type = self._detect_disk_type()
-    
-    def _detect_disk_type(self):
-        """Détecte le type de disque (SSD/HDD) pour optimiser les paramètres"""
-        try:
-            # Heuristique simple basée sur les performances de lecture
-            import time
-            test_file = Path.cwd() / "temp_test_file"
-            
-            # Créer un fichier test
-            with open(test_file, 'wb') as f:
-                f.write(b'0' * 1024 * 1024)  # 1MB
-            
-            # Mesurer le temps de lecture
-            start_time = time.time()
-            with open(test_file, 'rb') as f:
-                f.read()
-            read_time = time.time() - start_time
-            
-            # Nettoyer
-            test_file.unlink()
-            
-            # SSD si lecture très rapide (< 10ms pour 1MB)
-            return "SSD" if read_time < 0.01 else "HDD"
-            
-        except Exception:
-            return "HDD"  # Par défaut
+        
+        # Périphérique du disque cible, connu une fois le disque choisi (configure_for_path)
+        self.device = DeviceInfo("inconnu")
+        self.disk_type = self.device.kind
+
+        # Règles d'exclusion compilées (motifs du disque chargés par configure_for_path)
+        self.rules = ExclusionRules()
     
-    def optimize_file_order(self, file_paths):
+    def configure_for_path(self, path, probe=None):
         """
-        Optimise l'ordre de traitement des fichiers pour maximiser la vitesse
+        Détecte le périphérique du disque cible (type SSD/HDD, débit et IOPS mesurés)
+        pour régler les paramètres, le nombre de workers et l'ordre de lecture,
+        et charge les règles d'exclusion du disque
         """
-        files_info = []
-        
-        for file_path in file_paths:
-            try:
-                stat = os.stat(file_path)
-                ext = Path(file_path).suffix.lower()
-                
-                files_info.append({
-                    'path': file_path,
-                    'size': stat.st_size,
-                    'extension': ext,
-                    'priority': self._get_file_priority(ext, stat.st_size)
-                })
-            except (OSError, IOError):
-                continue
-        
-        # Trier par priorité puis par taille
-        files_info.sort(key=lambda x: (x['priority'], x['size']))
-        
-        return [f['path'] for f in files_info]
+        self.rules = ExclusionRules.for_root(path)
+        self.device = detect_device(path, probe)
+        self.disk_type = self.device.kind
+        return self.device
+    
+    def max_io_workers(self):
+        """Nombre de workers que le disque peut alimenter en lectures aléatoires (None: pas de limite connue)"""
+        device = self.device
+        if device.read_iops is not None and device.direct_io:
+            return max(1, int(device.read_iops // config.DEVICE_IOPS_PER_WORKER))
+        if self.disk_type == "HDD":
+            return 2  # Au-delà, les déplacements de la tête de lecture dominent
+        return None
+    
+    def get_large_lane_workers(self):
+        """Workers de la voie des gros fichiers (lectures séquentielles)"""
+        workers = max(1, self.cpu_count // 4)
+        if self.disk_type == "HDD":
+            return 1  # Un seul flux séquentiel: des lectures entrelacées ruineraient le débit
+        if self.device.read_mbs is not None and self.device.direct_io:
+            workers = min(workers, max(1, int(self.device.read_mbs // config.DEVICE_MBS_PER_LARGE_WORKER)))
+        return workers
     
     def _get_file_priority(self, extension, size):
         """Calcule la priorité d'un fichier (plus bas = plus prioritaire)"""
@@ -89,13 +74,18 @@ class CompressionOptimizer:
         
         return priority
     
-    def get_optimal_compression_params(self, compression_level, file_size=0):
+    def get_optimal_compression_params(self, compression_level, file_size=0, threads=None):
         """
         Retourne les paramètres 7zip optimisés selon le contexte
+        (threads: nombre de threads par processus 7z imposé par le contrôleur de concurrence)
         """
         base_params = config.COMPRESSION_PARAMS.get(compression_level, config.COMPRESSION_PARAMS[5])
         optimized_params = base_params.copy()
         
+        # Threads par processus fixés par le contrôleur (évite la surcharge des CPU)
+        if threads is not None and "-mmt=on" in optimized_params:
+            optimized_params[optimized_params.index("-mmt=on")] = f"-mmt={threads}"
+        
         # Optimisations selon le type de disque
         if self.disk_type == "SSD":
             # SSD: Privilégier le CPU over I/O
@@ -124,9 +114,18 @@ class CompressionOptimizer:
         return optimized_params
     
     def get_optimal_thread_count(self, file_count):
-        """Calcule le nombre optimal de threads selon le contexte"""
+        """Calcule le nombre optimal de threads selon le contexte (file_count None: inconnu)"""
         base_threads = min(config.MAX_WORKER_THREADS, self.cpu_count)
         
+        # Limite imposée par le disque (IOPS mesurées ou disque rotatif)
+        io_workers = self.max_io_workers()
+        if io_workers is not None:
+            base_threads = min(base_threads, io_workers)
+        
+        # Nombre de fichiers encore inconnu (scan en cours dans le pipeline)
+        if file_count is None:
+            return base_threads
+        
         # Ajustements selon le nombre de fichiers
         if file_count < 10:
             return 1  # Peu de fichiers: un seul thread suffit
@@ -135,46 +134,48 @@ class CompressionOptimizer:
         else:
             return base_threads
     
-    def should_compress_file(self, file_path):
-        """Détermine si un fichier doit être compressé"""
-        try:
-            path_obj = Path(file_path)
-            
-            # Ignorer les fichiers système
-            if any(sys_folder in str(path_obj) for sys_folder in config.SYSTEM_FOLDERS):
-                return False
-            
-            # Ignorer les extensions système
-            if path_obj.suffix.lower() in config.SYSTEM_EXTENSIONS:
-                return False
-            
-            # Ignorer les fichiers déjà compressés
-            if path_obj.suffix.lower() in config.IGNORE_EXTENSIONS:
-                return False
-            
-            # Ignorer les fichiers trop petits
-            if os.path.getsize(file_path) < config.MIN_FILE_SIZE:
-                return False
-            
-            return True
-            
-        except (OSError, IOError):
-            return False
+    def get_exclusion_reason(self, file_path, extension, size):
+        """
+        Retourne la raison d'exclusion d'un fichier dont la taille est déjà connue,
+        ou None s'il doit être compressé (aucun appel système)
+        """
+        # Dossiers système et motifs d'exclusion (verdict du répertoire en cache)
+        reason = self.rules.file_reason(file_path)
+        if reason is not None:
+            return reason
+        
+        # Ignorer les archives de lot et leurs manifestes
+        filename = os.path.basename(file_path)
+        if filename.startswith(config.SOLID_BATCH_PREFIX):
+            return "lot d'archives"
+        
+        # Ignorer les manifestes de doublons
+        if filename == config.DEDUP_MANIFEST_NAME:
+            return "manifeste de doublons"
+        
+        # Ignorer le fichier d'exclusion du disque
+        if filename == config.IGNORE_FILE_NAME:
+            return "fichier d'exclusion"
+        
+        # Ignorer les extensions système
+        if extension in config.SYSTEM_EXTENSIONS:
+            return "extension système"
+        
+        # Ignorer les fichiers déjà compressés
+        if extension in config.IGNORE_EXTENSIONS:
+            return "déjà compressé"
+        
+        # Ignorer les fichiers trop petits
+        if size < config.MIN_FILE_SIZE:
+            return f"trop petit ({size} bytes)"
+        
+        return None
     
-    def estimate_compression_time(self, file_paths):
-        """Estime le temps total de compression"""
-        total_size = 0
-        file_count = 0
-        
-        for file_path in file_paths:
-            if self.should_compress_file(file_path):
-                try:
-                    total_size += os.path.getsize(file_path)
-                    file_count += 1
-                except (OSError, IOError):
-                    continue
-        
-        # Estimation basée sur des benchmarks typiques
+    def default_speed_mbs(self):
+        """
+        Débit global supposé (MB/s) tant qu'aucune vitesse n'a été mesurée
+        (le modèle de débit appris le remplace dès les premières compressions)
+        """
         # Vitesse approximative: 50MB/s pour compression niveau 5
         base_speed_mbs = 50
         
@@ -184,34 +185,30 @@ class CompressionOptimizer:
         
         # Ajustements selon le CPU
         cpu_factor = min(2.0, self.cpu_count / 4.0)
-        effective_speed = base_speed_mbs * cpu_factor
-        
-        total_size_mb = total_size / (1024 * 1024)
-        estimated_seconds = total_size_mb / effective_speed
-        
-        return {
-            'total_files': file_count,
-            'total_size_mb': total_size_mb,
-            'estimated_seconds': estimated_seconds,
-            'estimated_minutes': estimated_seconds / 60
-        }
+        return base_speed_mbs * cpu_factor
     
-    def group_files_by_location(self, file_paths):
-        """Groupe les fichiers par répertoire pour optimiser l'accès disque"""
+    def order_small_records(self, records):
+        """
+        Ordre de la voie des petits fichiers, calculé en un seul tri (FileRecord, aucun appel système):
+        fichiers groupés par répertoire (localité disque, lots solides), répertoires contenant
+        des fichiers prioritaires d'abord, puis priorité et taille croissante dans chaque répertoire.
+        Sur un disque rotatif, l'ordre des inodes (proche de l'emplacement physique) remplace la priorité.
+        """
+        rotational = self.disk_type == "HDD"
         groups = defaultdict(list)
+        for record in records:
+            if rotational:
+                key = (record.inode,)
+            else:
+                key = (self._get_file_priority(record.ext, record.size), record.size)
+            groups[os.path.dirname(record.path)].append((key, record))
         
-        for file_path in file_paths:
-            directory = os.path.dirname(file_path)
-            groups[directory].append(file_path)
-        
-        # Trier les groupes par nombre de fichiers (plus gros groupes d'abord)
-        sorted_groups = sorted(groups.items(), key=lambda x: len(x[1]), reverse=True)
+        # Répertoire le plus prioritaire (ou d'inode le plus bas) d'abord, puis les plus gros groupes
+        sorted_groups = sorted(groups.values(), key=lambda group: (min(key for key, _ in group), -len(group)))
         
-        # Retourner les fichiers dans l'ordre optimisé
         optimized_order = []
-        for directory, files in sorted_groups:
-            # Trier les fichiers du répertoire par taille
-            files.sort(key=lambda x: os.path.getsize(x) if os.path.exists(x) else 0)
-            optimized_order.extend(files)
+        for group in sorted_groups:
+            group.sort(key=lambda item: item[0])
+            optimized_order.extend(record for _, record in group)
         
         return optimized_order
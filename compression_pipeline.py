@@ -0,0 +1,664 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de compression producteur/consommateur
+scan → filtre d'éligibilité → [déduplication] → ordonnanceur → compresseurs → finaliseur (vérification + suppression)
+Les compresseurs sont répartis en deux voies selon la taille des fichiers (voir lane_scheduler).
+La déduplication, optionnelle, attend la fin du scan (elle compare tous les fichiers entre eux).
+
+Chaque étage a sa propre concurrence et les étages sont reliés par des files bornées:
+la contre-pression garde la mémoire constante quel que soit le nombre de fichiers,
+et la compression démarre pendant que le disque est encore en cours de scan.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import config
+from file_plan import FilePlan
+from lane_scheduler import LaneScheduler
+from metrics import MetricsRegistry
+from solid_batches import SolidBatch, split_into_batches
+
+# Résultat produit par la fonction de compression pour un FileRecord
+CompressionResult = namedtuple(
+    "CompressionResult", ["record", "success", "archive_path", "compressed_size", "message"]
+)
+
+# Marqueur de fin de flux transmis d'un étage à l'autre
+_END = object()
+
+
+class _Stage:
+    """Suivi des workers d'un étage: le dernier à terminer propage la fin de flux en aval"""
+
+    def __init__(self, name, workers, on_finished=None):
+        self.name = name
+        self.workers = workers
+        self.outputs = []
+        self.on_finished = on_finished
+        self._remaining = workers
+        self._lock = threading.Lock()
+
+    def worker_done(self, pipeline):
+        """Appelé par chaque worker en sortie; retourne True pour le dernier"""
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+
+        if last:
+            if self.on_finished:
+                self.on_finished()
+            for output_queue, downstream_workers in self.outputs:
+                for _ in range(downstream_workers):
+                    pipeline._put(output_queue, _END)
+        return last
+
+    def add_output(self, output_queue, downstream_workers):
+        """Déclare une file de sortie et le nombre de workers qui la consomment"""
+        self.outputs.append((output_queue, downstream_workers))
+
+
+class CompressionPipeline:
+    """Orchestre les étages du pipeline de compression dans des threads dédiés"""
+
+    def __init__(self, scanner, optimizer, compress_func, compressor_workers,
+                 log_callback=None, event_callback=None, should_continue=None,
+                 on_scan_complete=None, compress_batch_func=None, controller=None):
+        """
+        scanner: FileScanner (créé avec apply_file_rules=False, le filtrage est fait ici)
+        compress_func: fonction(record, threads) -> CompressionResult, appelée par les workers
+                       (threads: threads par processus de compression fixés par la voie)
+        compressor_workers: nombre de workers de la voie des petits fichiers
+        compress_batch_func: fonction(SolidBatch, threads) -> (succès, archive, taille compressée, erreur);
+                             si fournie, les petits fichiers sont regroupés en lots solides
+        event_callback: fonction(type, *données) recevant les événements de progression
+                        ("total", "progress", "log", "error_log", "status");
+                        "progress": (fichiers traités, fichier courant, octets compressés)
+        on_scan_complete: fonction(stats) appelée quand le scan et le filtrage sont terminés
+        controller: AdaptiveConcurrencyController optionnel; les workers de la voie des petits
+                    fichiers sont alors créés jusqu'à son maximum, seuls ceux qu'il autorise travaillent
+                    et chacune de leurs compressions reçoit le nombre de threads qu'il choisit
+        """
+        self.scanner = scanner
+        self.optimizer = optimizer
+        self.compress_func = compress_func
+        self.compress_batch_func = compress_batch_func
+        self.log = log_callback or (lambda message, level="INFO": None)
+        self.emit = event_callback or (lambda *event: None)
+        self.should_continue = should_continue or (lambda: True)
+        self.on_scan_complete = on_scan_complete
+
+        self.filter_workers = config.FILTER_WORKER_THREADS
+        self.controller = controller
+        self.lanes = LaneScheduler(optimizer, controller.max_workers if controller else compressor_workers)
+        self.finalizer_workers = config.FINALIZER_THREADS
+
+        # Filtres appliqués par l'étage de filtrage: fonction(record) -> raison d'exclusion ou None
+        self.record_filters = [self._eligibility_filter]
+
+        # Écouteurs appelés par le finaliseur pour chaque fichier: fonction(result, succès)
+        self.result_listeners = []
+
+        # Fonctions sans argument appelées une fois dès que l'arrêt est demandé
+        # (interruption des compressions et des calculs d'empreinte en cours)
+        self.stop_listeners = []
+
+        # Journal optionnel des états de chaque fichier (CompressionJournal)
+        self.journal = None
+
+        # Déduplication optionnelle (Deduplicator): étage bloquant jusqu'à la fin du scan
+        self.deduplicator = None
+
+        # Modèle de débit optionnel (ThroughputModel): fichiers restants et durée de chaque compression
+        self.throughput_model = None
+
+        # Budget de threads optionnel (CpuBudget) partagé avec les pipelines des autres disques
+        self.cpu_budget = None
+
+        # Annonce optionnelle des petits fichiers placés dans la file de leur voie:
+        # fonction(record, threads) appelée avant leur compression (processus 7z préchauffés)
+        self.prepare_func = None
+
+        # Métriques du passage (remplacées par le registre exporté du moteur)
+        self.metrics = MetricsRegistry()
+
+        queue_size = config.PIPELINE_QUEUE_SIZE
+        self.scan_queue = queue.Queue(maxsize=queue_size)
+        self.filtered_queue = queue.Queue(maxsize=queue_size)
+        self.unique_queue = queue.Queue(maxsize=queue_size)
+        self.work_queue = queue.Queue(maxsize=queue_size)
+        self.done_queue = queue.Queue(maxsize=queue_size)
+
+        # Compteurs partagés
+        self._lock = threading.Lock()
+        self.discovered = 0
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        # Étages interrompus par une erreur: des fichiers n'ont pas été traités
+        self.stage_errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add_filter(self, record_filter):
+        """Ajoute un filtre à l'étage d'éligibilité (fonction(record) -> raison ou None)"""
+        self.record_filters.append(record_filter)
+
+    def add_result_listener(self, listener):
+        """Ajoute un écouteur des résultats finaux (fonction(result, succès))"""
+        self.result_listeners.append(listener)
+
+    def add_stop_listener(self, listener):
+        """Ajoute une fonction appelée dès que l'arrêt est demandé"""
+        self.stop_listeners.append(listener)
+
+    def is_running(self):
+        """Le pipeline continue tant que l'utilisateur n'a pas demandé l'arrêt"""
+        return self.should_continue()
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    def run(self, root_path):
+        """Exécute le pipeline et bloque jusqu'à la fin du traitement (ou l'arrêt)"""
+        small, large = self.lanes.small, self.lanes.large
+        scan_stage = _Stage("scan", 1)
+        filter_stage = _Stage("filtre", self.filter_workers, on_finished=self._filtering_finished)
+        scheduler_stage = _Stage("ordonnanceur", 1)
+        compressor_stage = _Stage("compression", small.workers + large.workers)
+        finalizer_stage = _Stage("finalisation", self.finalizer_workers)
+
+        scan_stage.add_output(self.scan_queue, filter_stage.workers)
+        filter_stage.add_output(self.filtered_queue, 1 if self.deduplicator else scheduler_stage.workers)
+        scheduler_stage.add_output(self.work_queue, small.workers)
+        scheduler_stage.add_output(self.lanes.large_queue, large.workers)
+        compressor_stage.add_output(self.done_queue, finalizer_stage.workers)
+
+        # Avec la déduplication, l'ordonnanceur lit la sortie de l'étage de déduplication
+        scheduler_input = self.filtered_queue
+        if self.deduplicator is not None:
+            dedup_stage = _Stage("deduplication", 1)
+            dedup_stage.add_output(self.unique_queue, scheduler_stage.workers)
+            scheduler_input = self.unique_queue
+
+        # (nom, nombre de threads, fonction exécutée par chaque thread)
+        workers = [
+            ("scan", 1, lambda: self._scan_worker(scan_stage, root_path)),
+            ("filtre", filter_stage.workers, lambda: self._filter_worker(filter_stage)),
+            ("ordonnanceur", 1, lambda: self._scheduler_worker(scheduler_stage, scheduler_input)),
+            ("compression-petits", small.workers,
+             lambda: self._compressor_worker(compressor_stage, small, self.work_queue)),
+            ("compression-gros", large.workers,
+             lambda: self._compressor_worker(compressor_stage, large, self.lanes.large_queue)),
+            ("finalisation", finalizer_stage.workers, lambda: self._finalizer_worker(finalizer_stage)),
+        ]
+
+        if self.deduplicator is not None:
+            workers.insert(2, ("deduplication", 1, lambda: self._dedup_worker(dedup_stage)))
+
+        self._register_metrics(workers)
+
+        if self.controller is not None:
+            self.controller.start()
+
+        threads = []
+        for name, count, target in workers:
+            for index in range(count):
+                thread = threading.Thread(target=target, name=f"{name}-{index}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # Attente des étages en surveillant l'arrêt: les travaux en cours sont interrompus
+        # immédiatement au lieu d'attendre la fin de chaque compression
+        stop_notified = False
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.1)
+                if not stop_notified and not self.is_running():
+                    stop_notified = True
+                    self._notify_stop()
+
+        if self.controller is not None:
+            self.controller.stop()
+
+        return {
+            'discovered': self.discovered,
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'stage_errors': self.stage_errors,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+        }
+
+    def _register_metrics(self, workers):
+        """Déclare les métriques du pipeline (files, workers, latences) dans le registre"""
+        metrics = self.metrics
+        queues = [("scan", self.scan_queue), ("filtre", self.filtered_queue), ("uniques", self.unique_queue),
+                  ("petits", self.work_queue), ("gros", self.lanes.large_queue), ("finalisation", self.done_queue)]
+        for name, stage_queue in queues:
+            metrics.gauge("ultracompression_queue_depth", "Éléments en attente dans chaque file du pipeline",
+                          {"queue": name}, func=stage_queue.qsize)
+
+        # Utilisation d'un étage: débit de busy_seconds_total divisé par son nombre de workers
+        for name, count, _ in workers:
+            metrics.gauge("ultracompression_workers", "Threads de chaque étage", {"stage": name}).set(count)
+        self._busy = {
+            name: metrics.counter("ultracompression_worker_busy_seconds_total",
+                                  "Temps passé à traiter des éléments (hors attente des files)", {"stage": name})
+            for name in ("filtre", "compression-petits", "compression-gros", "finalisation")
+        }
+
+        if self.controller is not None:
+            controller = self.controller
+            metrics.gauge("ultracompression_active_workers", "Workers actifs autorisés par le contrôleur adaptatif",
+                          func=lambda: controller.active_workers)
+            metrics.gauge("ultracompression_threads_per_process", "Threads (-mmt) de chaque compression de petit fichier",
+                          func=controller.threads_per_process)
+            metrics.gauge("ultracompression_cpu_percent", "Utilisation CPU du système mesurée par le contrôleur adaptatif",
+                          func=lambda: controller.last_sample['cpu_percent'])
+
+        self._compress_seconds = {
+            lane.name: metrics.histogram("ultracompression_compress_seconds",
+                                         "Durée de compression par fichier (ou par lot solide)", {"lane": lane.name})
+            for lane in (self.lanes.small, self.lanes.large)
+        }
+        self._delete_seconds = metrics.histogram("ultracompression_delete_seconds",
+                                                 "Durée de suppression de chaque original")
+        self._files_done = {
+            outcome: metrics.counter("ultracompression_files_processed_total", "Fichiers terminés",
+                                     {"result": outcome})
+            for outcome in ("succes", "echec")
+        }
+        self._bytes_in = metrics.counter("ultracompression_bytes_in_total", "Octets des originaux compressés")
+        self._bytes_out = metrics.counter("ultracompression_bytes_out_total", "Octets des archives produites")
+
+    def _notify_stop(self):
+        for listener in self.stop_listeners:
+            try:
+                listener()
+            except Exception as e:
+                self.log(f"⚠️ Erreur lors de l'arrêt: {e}", "WARNING")
+
+    def _stage_failed(self, message):
+        """Erreur qui interrompt un worker d'étage: le passage ne couvre plus tout le disque"""
+        self.log(message, "ERROR")
+        with self._lock:
+            self.stage_errors += 1
+
+    def _put(self, target_queue, item):
+        """Put bloquant (contre-pression) qui abandonne si l'arrêt est demandé"""
+        while True:
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not self.is_running():
+                    return False
+
+    def _get(self, source_queue, timeout=None):
+        """
+        Get bloquant qui retourne _END si l'arrêt est demandé.
+        Avec un timeout, retourne None si rien n'est arrivé entre-temps.
+        """
+        waited = 0.0
+        while True:
+            if not self.is_running():
+                return _END
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                waited += 0.1
+                if timeout is not None and waited >= timeout:
+                    return None
+
+    # ------------------------------------------------------------------
+    # Étages
+    # ------------------------------------------------------------------
+
+    def _scan_worker(self, stage, root_path):
+        """Étage 1: parcourt le disque et pousse chaque fichier trouvé"""
+        try:
+            for record in self.scanner.scan(root_path):
+                if not self._put(self.scan_queue, record):
+                    break
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur d'analyse: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _filter_worker(self, stage):
+        """Étage 2: applique les filtres d'éligibilité"""
+        last_dir = None
+        ignored_in_dir = 0
+        try:
+            while True:
+                record = self._get(self.scan_queue)
+                if record is _END:
+                    break
+
+                directory = os.path.dirname(record.path)
+                if directory != last_dir:
+                    last_dir = directory
+                    ignored_in_dir = 0
+
+                start = time.perf_counter()
+                reason = self._exclusion_reason(record)
+                self._busy["filtre"].inc(time.perf_counter() - start)
+                if reason is None:
+                    with self._lock:
+                        self.discovered += 1
+                        self.scanner.stats.add_eligible(record)
+                        discovered = self.discovered
+                    if discovered % 100 == 0:
+                        self.emit("total", discovered)
+                    if self.journal is not None:
+                        self.journal.queued(record)
+                    if self.throughput_model is not None:
+                        self.throughput_model.add(record)
+                    if not self._put(self.filtered_queue, record):
+                        break
+                else:
+                    with self._lock:
+                        self.scanner.stats.ignored_files += 1
+                    ignored_in_dir += 1
+                    # Logger seulement quelques exemples par répertoire
+                    if ignored_in_dir <= 3:
+                        filename = os.path.basename(record.path)
+                        self.log(f"⚠️ Fichier ignoré: {filename} ({reason})", "WARNING")
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur de filtrage: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _exclusion_reason(self, record):
+        for record_filter in self.record_filters:
+            reason = record_filter(record)
+            if reason is not None:
+                return reason
+        return None
+
+    def _eligibility_filter(self, record):
+        return self.optimizer.get_exclusion_reason(record.path, record.ext, record.size)
+
+    def _filtering_finished(self):
+        """Le scan et le filtrage sont terminés: le total est définitif"""
+        self.emit("total", self.discovered)
+        if self.is_running():
+            self.scanner.log_summary()
+            if self.on_scan_complete:
+                self.on_scan_complete(self.scanner.stats)
+
+    def _dedup_worker(self, stage):
+        """
+        Étage optionnel: attend tous les fichiers filtrés, retire les doublons,
+        puis transmet un seul fichier par contenu à l'ordonnanceur.
+        Les fichiers en attente sont conservés dans un plan compact (FilePlan).
+        """
+        plan = FilePlan()
+        try:
+            while True:
+                record = self._get(self.filtered_queue)
+                if record is _END:
+                    break
+                plan.append(record)
+
+            if not self.is_running():
+                return
+
+            self.emit("status", "Recherche des doublons...")
+            self.log(f"🔎 Recherche des doublons parmi {len(plan)} fichiers "
+                     f"({plan.nbytes() / (1024 * 1024):.1f} MB en mémoire)...", "ANALYSIS")
+            try:
+                duplicates = self.deduplicator.deduplicate(plan)
+            except Exception as e:
+                # Aucun fichier encore transmis: sans déduplication, tous restent à compresser
+                # (doublons déjà mémorisés oubliés, le finaliseur n'en trouvera aucun)
+                self.log(f"💥 Erreur de déduplication: {e}", "ERROR")
+                self.deduplicator.clear()
+                duplicates = set()
+            stats = self.deduplicator.stats
+            if stats['duplicates']:
+                self.log(f"🔎 {stats['duplicates']} doublons ({stats['duplicate_bytes']/(1024*1024):.1f} MB) "
+                         f"dans {stats['groups']} groupes: compressés une seule fois", "ANALYSIS")
+            self.emit("status", "Compression en cours...")
+
+            # Une erreur pendant la transmission arrête l'étage: les fichiers déjà transmis ne le
+            # sont jamais deux fois, et les doublons des originaux restants sont conservés
+            for index in range(len(plan)):
+                if index in duplicates:
+                    continue
+                if not self._put(self.unique_queue, plan[index]):
+                    break
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur de déduplication: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _scheduler_worker(self, stage, source_queue):
+        """
+        Étage 3: répartit les fichiers entre les voies. Les gros fichiers vont directement
+        dans la file à priorité de leur voie; les petits sont ordonnés par fenêtres bornées.
+        """
+        window = []
+        try:
+            while True:
+                record = self._get(source_queue, timeout=config.SCHEDULER_FLUSH_DELAY)
+                if record is _END:
+                    break
+                if record is not None:
+                    if self.lanes.is_large(record):
+                        if not self._put(self.lanes.large_queue, record):
+                            return
+                        continue
+                    window.append(record)
+                    if len(window) < config.SCHEDULER_WINDOW_SIZE:
+                        continue
+                # Fenêtre pleine ou flux momentanément vide: libérer les fichiers en attente
+                if window and not self._flush_window(window):
+                    return
+                window = []
+
+            if self.is_running():
+                self._flush_window(window)
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur d'ordonnancement: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _flush_window(self, window):
+        """Ordonne une fenêtre de petits fichiers et la transmet à leur voie"""
+        try:
+            ordered = self.lanes.order_small(window)
+        except Exception as e:
+            self.log(f"⚠️ Erreur d'optimisation: {e}", "WARNING")
+            ordered = window
+
+        # Regrouper les petits fichiers de chaque répertoire en lots solides
+        if self.compress_batch_func is not None:
+            ordered = split_into_batches(ordered)
+
+        for item in ordered:
+            if self.prepare_func is not None and not isinstance(item, SolidBatch):
+                self.prepare_func(item, self._lane_threads(self.lanes.small))
+            if not self._put(self.work_queue, item):
+                return False
+        return True
+
+    def _compressor_worker(self, stage, lane, source_queue):
+        """Étage 4: compresse les fichiers d'une voie (un worker par thread)"""
+        # Le contrôleur limite le nombre de workers de la voie des petits fichiers actifs simultanément
+        controller = self.controller if lane is self.lanes.small else None
+        busy = self._busy[f"compression-{lane.name}"]
+        compress_seconds = self._compress_seconds[lane.name]
+        try:
+            while True:
+                item = self._get(source_queue)
+                if item is _END:
+                    break
+                if controller is not None and not controller.acquire_slot(self.is_running):
+                    break
+                threads = self._lane_threads(lane)
+                if self.cpu_budget is not None and not self.cpu_budget.acquire(threads, self.is_running):
+                    if controller is not None:
+                        controller.release_slot()
+                    break
+                start = time.perf_counter()
+                try:
+                    results = self._compress_item(item, threads)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    busy.inc(elapsed)
+                    compress_seconds.observe(elapsed)
+                    if self.cpu_budget is not None:
+                        self.cpu_budget.release(threads)
+                    if controller is not None:
+                        controller.release_slot()
+                # Seules les compressions réussies renseignent le modèle de débit
+                if self.throughput_model is not None and all(result.success for result in results):
+                    self.throughput_model.observe([result.record for result in results], elapsed, start)
+                if not all(self._put(self.done_queue, result) for result in results):
+                    break
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur de compression: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _lane_threads(self, lane):
+        """Threads par compression: choisis par le contrôleur pour les petits fichiers, fixes pour les gros"""
+        if lane is self.lanes.small and self.controller is not None:
+            return self.controller.threads_per_process()
+        return lane.threads
+
+    def _compress_item(self, item, threads):
+        """Compresse un fichier ou un lot solide; retourne un résultat par fichier"""
+        if self.journal is not None:
+            for record in (item.records if isinstance(item, SolidBatch) else [item]):
+                self.journal.compressing(record)
+        if isinstance(item, SolidBatch):
+            return self._compress_batch(item, threads)
+        try:
+            return [self.compress_func(item, threads)]
+        except Exception as e:
+            return [CompressionResult(item, False, None, 0, f"Erreur inattendue: {e}")]
+
+    def _compress_batch(self, batch, threads):
+        """Compresse un lot solide et produit un résultat par fichier du lot"""
+        try:
+            success, archive_path, compressed_size, error = self.compress_batch_func(batch, threads)
+        except Exception as e:
+            success, archive_path, compressed_size, error = False, None, 0, f"Erreur inattendue: {e}"
+
+        batch_size = sum(record.size for record in batch.records) or 1
+        results = []
+        for record in batch.records:
+            # La taille de l'archive est répartie au prorata de la taille des fichiers
+            share = compressed_size * record.size / batch_size if success else 0
+            results.append(CompressionResult(record, success, archive_path, share,
+                                             "" if success else f"Erreur lot {os.path.basename(record.path)}: {error}"))
+        return results
+
+    def _finalizer_worker(self, stage):
+        """Étage 5: vérifie l'archive, supprime l'original et publie la progression"""
+        try:
+            while True:
+                result = self._get(self.done_queue)
+                if result is _END:
+                    break
+                start = time.perf_counter()
+                self._finalize(result)
+                self._busy["finalisation"].inc(time.perf_counter() - start)
+        except Exception as e:
+            self._stage_failed(f"💥 Erreur de finalisation: {e}")
+        finally:
+            stage.worker_done(self)
+
+    def _finalize(self, result):
+        record = result.record
+        filename = os.path.basename(record.path)
+        success, message = result.success, result.message
+
+        if success:
+            # Les moteurs ont déjà comparé l'archive à la source (config.VERIFY_MODE);
+            # dans tous les cas l'archive doit exister et ne pas être vide
+            if not result.compressed_size:
+                success, message = False, f"Archive vide ou absente pour {filename}"
+            else:
+                if self.journal is not None:
+                    self.journal.verified(record, result.archive_path)
+                try:
+                    with self._delete_seconds.time():
+                        os.remove(record.path)
+                    ratio = (1 - result.compressed_size / record.size) * 100 if record.size > 0 else 0
+                    message = f"Compressé: {filename} ({ratio:.1f}% économisé)"
+                except OSError as e:
+                    success, message = False, f"Erreur suppression {filename}: {e}"
+
+        self._publish(result, success, message)
+
+        if self.deduplicator is not None:
+            self._finalize_duplicates(result, success)
+
+    def _finalize_duplicates(self, result, success):
+        """Remplace les doublons d'un fichier traité par des références vers son archive"""
+        original_name = os.path.basename(result.record.path)
+        for duplicate, digest in self.deduplicator.pop_duplicates(result.record):
+            if success:
+                dup_success, message = self.deduplicator.replace_with_reference(
+                    duplicate, digest, result, self.journal)
+            else:
+                dup_success, message = False, (f"Doublon conservé, échec de l'original {original_name}: "
+                                               f"{os.path.basename(duplicate.path)}")
+            self._publish(CompressionResult(duplicate, dup_success, result.archive_path, 0, message),
+                          dup_success, message)
+
+    def _publish(self, result, success, message):
+        """Journal, écouteurs, compteurs et événements de progression d'un fichier terminé"""
+        record = result.record
+        filename = os.path.basename(record.path)
+
+        if self.journal is not None:
+            if success:
+                self.journal.deleted(record)
+            else:
+                self.journal.failed(record)
+
+        if self.throughput_model is not None:
+            self.throughput_model.done(record)
+
+        for listener in self.result_listeners:
+            try:
+                listener(result, success)
+            except Exception as e:
+                self.log(f"⚠️ Erreur de suivi pour {filename}: {e}", "WARNING")
+
+        if self.controller is not None:
+            self.controller.report_progress(record.size)
+
+        with self._lock:
+            self.processed += 1
+            processed = self.processed
+            if success:
+                self.succeeded += 1
+                self.bytes_in += record.size
+                self.bytes_out += result.compressed_size
+            else:
+                self.failed += 1
+            bytes_in = self.bytes_in
+
+        self._files_done["succes" if success else "echec"].inc()
+        if success:
+            self._bytes_in.inc(record.size)
+            self._bytes_out.inc(result.compressed_size)
+
+        self.emit("progress", processed, filename, bytes_in)
+        if success:
+            self.emit("log", message)
+            self.log(f"✅ {filename}", "SUCCESS")
+        else:
+            self.emit("error_log", message)
+            self.log(f"❌ {filename} - {message}", "ERROR")
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Contrôleur de concurrence adaptatif
+Mesure en continu le débit (MB/s), l'utilisation CPU du système (psutil) et la file d'attente
+du disque cible (/proc/diskstats), puis ajuste le nombre de workers actifs de la voie des petits
+fichiers et le nombre de threads de chacun de leurs processus (-mmt) pour maximiser le nombre
+d'octets compressés par seconde.
+
+CpuBudget borne le nombre total de threads de compression quand plusieurs disques
+sont compressés en même temps (un pipeline par disque).
+"""
+
+import threading
+import time
+
+import psutil
+
+import config
+
+_DISKSTATS = "/proc/diskstats"
+
+
+def _read_disk_queue_time(disk):
+    """
+    Temps pondéré passé en I/O (ms) du disque entier `disk` (nom noyau, ex. "sda"), depuis
+    /proc/diskstats (Linux). Seule sa ligne est lue: ni ses partitions, comptées en double,
+    ni les autres disques. Sa dérivée donne la profondeur moyenne de sa file d'attente.
+    None si le disque ou le fichier est indisponible.
+    """
+    if disk is None:
+        return None
+    try:
+        with open(_DISKSTATS) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 14 and fields[2] == disk:
+                    return int(fields[13])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class CpuBudget:
+    """
+    Threads de compression partagés entre plusieurs pipelines: chaque compression réserve
+    autant d'unités que de threads qu'elle utilise (1 pour les petits fichiers).
+    """
+
+    def __init__(self, slots):
+        self.slots = max(1, slots)
+        self._condition = threading.Condition()
+        self._busy = 0
+
+    @property
+    def busy(self):
+        with self._condition:
+            return self._busy
+
+    def _units(self, threads):
+        return min(max(1, threads or 1), self.slots)
+
+    def acquire(self, threads, should_continue):
+        """Attend que `threads` unités soient libres; False si l'arrêt est demandé"""
+        units = self._units(threads)
+        with self._condition:
+            while self._busy + units > self.slots:
+                if not should_continue():
+                    return False
+                self._condition.wait(timeout=0.1)
+            self._busy += units
+            return True
+
+    def release(self, threads):
+        with self._condition:
+            self._busy -= self._units(threads)
+            self._condition.notify_all()
+
+
+class AdaptiveConcurrencyController:
+    """Ajuste le nombre de workers de compression actifs par montée de gradient sur le débit"""
+
+    def __init__(self, cpu_count, initial_workers, max_workers, log_callback=None, disk=None):
+        """disk: disque entier à surveiller dans /proc/diskstats (device_probe.disk_name), None sinon"""
+        self.cpu_count = max(1, cpu_count or 1)
+        self.min_workers = 1
+        self.max_workers = max(1, max_workers)
+        self.active_workers = min(max(1, initial_workers), self.max_workers)
+        self.log = log_callback or (lambda message, level="INFO": None)
+        self.disk = disk
+
+        self._condition = threading.Condition()
+        self._busy = 0
+        self._bytes_done = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        # État de la montée de gradient
+        self._direction = 1
+        self._last_throughput = None
+
+        # Dernières mesures (pour les logs et les métriques)
+        self.last_sample = {'throughput_mbs': 0.0, 'cpu_percent': 0.0, 'disk_queue': None}
+
+    # ------------------------------------------------------------------
+    # Interface utilisée par les workers
+    # ------------------------------------------------------------------
+
+    def acquire_slot(self, should_continue):
+        """Attend qu'un emplacement de worker actif soit libre; False si l'arrêt est demandé"""
+        with self._condition:
+            while self._busy >= self.active_workers:
+                if not should_continue():
+                    return False
+                self._condition.wait(timeout=0.1)
+            self._busy += 1
+            return True
+
+    def release_slot(self):
+        with self._condition:
+            self._busy -= 1
+            self._condition.notify()
+
+    def threads_per_process(self):
+        """Threads de chaque compression (-mmt): les cœurs répartis entre les workers actifs"""
+        return max(1, self.cpu_count // self.active_workers)
+
+    def report_progress(self, bytes_processed):
+        """Comptabilise les octets traités (appelé pour chaque fichier terminé)"""
+        with self._condition:
+            self._bytes_done += bytes_processed
+
+    # ------------------------------------------------------------------
+    # Boucle d'échantillonnage
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="controleur-concurrence", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        # CPU de tout le système, volontairement: des cœurs occupés par d'autres programmes (ou par
+        # les pipelines des autres disques) ne sont pas disponibles pour des workers supplémentaires
+        psutil.cpu_percent(interval=None)  # Le premier appel sert de référence
+        last_time = time.time()
+        last_bytes = 0
+        last_disk = _read_disk_queue_time(self.disk)
+
+        while not self._stop.wait(config.CONTROLLER_INTERVAL):
+            now = time.time()
+            elapsed = max(now - last_time, 1e-6)
+            with self._condition:
+                bytes_done = self._bytes_done
+
+            throughput = (bytes_done - last_bytes) / elapsed / (1024 * 1024)
+            cpu = psutil.cpu_percent(interval=None)
+            disk = _read_disk_queue_time(self.disk)
+            disk_queue = (disk - last_disk) / (elapsed * 1000) if disk is not None and last_disk is not None else None
+
+            last_time, last_bytes, last_disk = now, bytes_done, disk
+            self.last_sample = {'throughput_mbs': throughput, 'cpu_percent': cpu, 'disk_queue': disk_queue}
+            self._adjust(throughput, cpu, disk_queue)
+
+    def _adjust(self, throughput, cpu, disk_queue):
+        """Une étape de montée de gradient sur le débit, bornée par le CPU et le disque"""
+        previous = self.active_workers
+
+        if disk_queue is not None and disk_queue > config.CONTROLLER_DISK_QUEUE_HIGH:
+            # Disque saturé: ajouter des workers ne ferait qu'allonger la file d'attente
+            self._direction = -1
+        elif cpu >= config.CONTROLLER_CPU_HIGH:
+            self._direction = -1
+        elif self._last_throughput is not None and throughput < self._last_throughput * 0.95:
+            # Le dernier changement a dégradé le débit: repartir dans l'autre sens
+            self._direction = -self._direction
+        elif self._last_throughput is None or throughput > self._last_throughput * 1.05:
+            pass  # Le dernier changement a été bénéfique: continuer dans la même direction
+        else:
+            self._last_throughput = throughput
+            return  # Plateau: ne rien changer
+
+        self._last_throughput = throughput
+        target = min(self.max_workers, max(self.min_workers, self.active_workers + self._direction))
+        if target == previous:
+            return
+
+        with self._condition:
+            self.active_workers = target
+            self._condition.notify_all()
+
+        queue_text = f", file disque {disk_queue:.1f}" if disk_queue is not None else ""
+        self.log(f"⚙️ Concurrence ajustée: {previous} → {target} workers, -mmt={self.threads_per_process()} "
+                 f"({throughput:.1f} MB/s, CPU {cpu:.0f}%{queue_text})", "INFO")
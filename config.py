@@ -6,7 +6,7 @@ Configuration pour UltraCompression
 # Extensions de fichiers à ignorer (déjà compressés)
 IGNORE_EXTENSIONS = {
     '.7z', '.zip', '.rar', '.gz', '.bz2', '.xz', '.tar',
-    '.z', '.lz', '.lzma', '.cab', '.arj', '.ace'
+    '.z', '.lz', '.lzma', '.cab', '.arj', '.ace', '.zst'
 }
 
 # Extensions de fichiers système à éviter
@@ -50,3 +50,160 @@ SYSTEM_FOLDERS = {
     'Users\\Default',
     'Users\\All Users'
 }
+
+# Motifs d'exclusion de type .gitignore, relatifs à la racine du disque
+# ("*.bak", "node_modules/", "/Archives/**", "!garder.log": le dernier motif qui correspond l'emporte)
+EXCLUDE_PATTERNS = []
+IGNORE_FILE_NAME = ".ultracompressionignore"  # Motifs supplémentaires propres au disque (à sa racine)
+EXCLUSION_CACHE_SIZE = 100000                 # Verdicts de répertoires conservés en mémoire
+
+# Pipeline de compression (files bornées entre les étages: scan → filtre → ordonnanceur → compression → finalisation)
+PIPELINE_QUEUE_SIZE = 256      # Taille maximale de chaque file entre deux étages
+FILTER_WORKER_THREADS = 1      # Threads de l'étage de filtrage d'éligibilité
+FINALIZER_THREADS = 1          # Threads de l'étage de vérification/suppression
+SCHEDULER_WINDOW_SIZE = 512    # Nombre de fichiers ordonnés ensemble par l'ordonnanceur
+SCHEDULER_FLUSH_DELAY = 0.2    # Délai (s) sans nouveau fichier avant de libérer une fenêtre incomplète
+
+# Moteur de compression: "auto" (7z si installé, sinon xz intégré), "7z", "xz", "bz2" ou "zstd"
+# Les moteurs xz/bz2/zstd compressent dans le processus, sans lancer 7z pour chaque fichier
+COMPRESSION_BACKEND = "auto"
+
+# Taille des blocs lus/écrits par les moteurs intégrés (en octets)
+BACKEND_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# 7z: par défaut, 7z lit lui-même le fichier et conserve sa date de modification dans l'archive.
+# True: la source est lue par UltraCompression par grands blocs (posix_fadvise SEQUENTIAL, lecture
+# anticipée) et envoyée sur l'entrée standard de 7z (-si); 7z ne voit alors pas la date de la
+# source et l'archive porte la date de compression (l'original est supprimé ensuite)
+SEVEN_ZIP_STDIN = False
+SEVEN_ZIP_READ_BUFFER = 4 * 1024 * 1024  # Taille des lectures (arrondie à un multiple de la page)
+# Processus 7z des petits fichiers lancés à l'avance, en attente de leur source sur l'entrée standard:
+# nécessite SEVEN_ZIP_STDIN = True (en mode chemin, les petits fichiers sont compressés par lots, voir
+# SOLID_BATCH_ENABLED). Le lancement de chaque processus est avancé, pas supprimé.
+SEVEN_ZIP_WARM_POOL = False
+SEVEN_ZIP_WARM_MAX = 32                  # Processus préchauffés au maximum (taille recalculée d'après les mesures)
+
+# Arrêt: délai (s) laissé aux processus 7z après terminate() avant de les tuer
+CANCEL_GRACE_SECONDS = 0.5
+# Moteurs intégrés: l'arrêt est vérifié toutes les CANCEL_CHECK_BYTES octets compressés
+CANCEL_CHECK_BYTES = 64 * 1024
+
+# Vérification des archives avant la suppression des originaux
+# "crc": somme de contrôle de la source calculée pendant la compression et comparée à celle
+#        stockée dans l'archive avec la taille (xz, zstd avec xxhash; en-tête 7z), sans relire la source;
+#        7z ayant lu lui-même la source (hors SEVEN_ZIP_STDIN), l'archive est testée (7z t)
+# "full": décompression complète de l'archive (jamais de relecture de la source)
+# "none": l'archive doit seulement exister et ne pas être vide
+# Lots solides: noms et tailles comparés à ceux de la source, contenu testé (CRC32) dans les deux modes
+VERIFY_MODE = "crc"
+
+# Plusieurs disques compressés en même temps (JobManager): un pipeline par disque physique
+JOB_CPU_BUDGET = None       # Threads de compression simultanés, tous disques confondus (None: nombre de cœurs)
+JOB_REPORT_INTERVAL = 10.0  # Intervalle (s) des rapports de débit global et par disque
+
+# Lots solides: les petits fichiers d'un même répertoire sont regroupés dans une seule archive
+# (avec un manifeste JSON pour restaurer chaque fichier individuellement)
+# None: activés avec les moteurs qui lancent un processus par archive (7z): un seul 7z par lot,
+# avec la liste des fichiers passée en @listfile, au lieu d'un 7z par petit fichier
+SOLID_BATCH_ENABLED = None
+SOLID_BATCH_THRESHOLD = 64 * 1024          # Fichiers plus petits que 64KB regroupés en lots
+SOLID_BATCH_MAX_FILES = 1000               # Nombre maximum de fichiers par lot
+SOLID_BATCH_MAX_BYTES = 64 * 1024 * 1024   # Taille cumulée maximale d'un lot (64MB)
+SOLID_BATCH_PREFIX = "_ultracompression_lot_"  # Préfixe des archives de lot et de leurs manifestes
+
+# Dossier d'état créé à la racine du disque cible (index, journal...), jamais scanné
+STATE_DIR_NAME = ".ultracompression"
+
+# Index de scan persistant: les répertoires inchangés depuis le dernier passage complet sont ignorés
+SCAN_INDEX_ENABLED = True
+SCAN_INDEX_FILE = "index.sqlite"
+SCAN_INDEX_COMMIT_EVERY = 1000     # Écritures groupées par transaction
+SCAN_INDEX_COMMIT_INTERVAL = 2.0   # Délai maximum (s) entre deux commits
+
+# Listage parallèle des répertoires (disques à forte latence: HDD, partages réseau, montages FUSE)
+SCAN_WORKERS = None                # Threads de listage; None: SCAN_PARALLEL_WORKERS sur HDD/réseau/FUSE, 1 sinon
+SCAN_PARALLEL_WORKERS = 8
+SCAN_LISTING_WINDOW = 4            # Répertoires listés en avance par worker (borne la mémoire)
+SCAN_DETERMINISTIC = False         # Fichiers produits dans l'ordre du parcours séquentiel
+SCAN_INODE_ORDER = None            # Sous-répertoires lus par inode croissant; None: sur disque rotatif
+
+# Journal de reprise: états de chaque fichier écrits par lots dans le dossier d'état du disque
+JOURNAL_ENABLED = True
+JOURNAL_FILE = "journal.log"
+JOURNAL_PARTIAL_DIR = "partial"    # Archives en cours d'écriture (renommées une fois terminées)
+JOURNAL_FLUSH_EVERY = 256          # Entrées écrites par lot (un seul fsync par lot)
+JOURNAL_FLUSH_INTERVAL = 1.0       # Délai maximum (s) entre deux écritures du journal
+PARTIAL_SUFFIX = ".ucpart"
+
+# Concurrence adaptative: le nombre de workers actifs et les threads -mmt de 7z sont ajustés
+# pendant le passage selon le débit mesuré, l'utilisation CPU et la file d'attente disque
+ADAPTIVE_CONCURRENCY = True
+ADAPTIVE_MAX_WORKERS = None         # None: nombre de coeurs CPU
+CONTROLLER_INTERVAL = 2.0           # Période d'échantillonnage (secondes)
+CONTROLLER_CPU_HIGH = 90            # Utilisation CPU (%) au-delà de laquelle réduire les workers
+CONTROLLER_DISK_QUEUE_HIGH = 4.0    # Profondeur moyenne de file disque au-delà de laquelle réduire
+
+# Voies de compression selon la taille: les gros fichiers ont peu de workers multi-threads
+# (plus gros d'abord), les petits fichiers de nombreux workers mono-thread
+LARGE_FILE_THRESHOLD = 256 * 1024 * 1024   # Taille à partir de laquelle un fichier va dans la voie des gros
+LARGE_LANE_WORKERS = None                  # None: un worker par tranche de 4 coeurs CPU (un seul sur disque rotatif)
+
+# Échantillonnage avant compression: quelques blocs lus et compressés avec zlib niveau 1;
+# les fichiers dont le gain estimé est inférieur à MIN_EXPECTED_GAIN sont ignorés
+ENTROPY_SAMPLING_ENABLED = True
+MIN_EXPECTED_GAIN = 0.05           # Gain minimum attendu (5%)
+SAMPLE_CHUNK_SIZE = 16 * 1024      # Taille de chaque bloc lu (16KB)
+SAMPLE_CHUNKS = 4                  # Blocs lus par fichier (début, milieu..., fin)
+SAMPLE_CACHE_MIN_FILES = 8         # Fichiers d'un même type (extension + nombre magique) avant mise en cache du verdict
+SAMPLE_CACHE_MAX_KEYS = 4096       # Nombre maximum de types en cache
+
+# Déduplication par contenu (attend la fin du scan avant de compresser): les doublons ne sont
+# compressés qu'une fois puis remplacés par une référence dans le manifeste de leur répertoire
+DEDUP_ENABLED = False
+DEDUP_PARTIAL_SIZE = 64 * 1024           # Octets lus au début et à la fin pour l'empreinte partielle
+DEDUP_READ_BUFFER = 1024 * 1024          # Tampon de lecture pour l'empreinte complète (1MB)
+DEDUP_HASH_WORKERS = 4                   # Threads de calcul des empreintes
+DEDUP_MANIFEST_NAME = "_ultracompression_doublons.jsonl"
+
+# Métriques structurées (compteurs, jauges, histogrammes): un instantané JSON par période est
+# ajouté au fichier de métriques du dossier d'état, avec le débit des compteurs
+METRICS_ENABLED = True
+METRICS_FILE = "metrics.jsonl"
+METRICS_INTERVAL = 10.0             # Période d'export (secondes)
+METRICS_PROMETHEUS_PORT = None      # Port local (127.0.0.1) servant /metrics au format Prometheus; None: désactivé
+
+# Modèle de débit appris: temps de compression mesuré par moteur, niveau et classe d'extension,
+# conservé entre les passages dans le dossier d'état du disque pour estimer le temps restant
+THROUGHPUT_MODEL_FILE = "throughput.json"
+THROUGHPUT_CALIBRATION_SECONDS = 30.0   # Compression réelle avant de se fier aux mesures du passage
+THROUGHPUT_HISTORY_WEIGHT = 0.5         # Poids des mesures des passages précédents
+THROUGHPUT_MAX_HISTORY_SAMPLES = 1000   # Les passages précédents ne pèsent jamais plus que ce nombre de fichiers
+THROUGHPUT_ETA_INTERVAL = 5.0           # Période de mise à jour du temps restant (secondes)
+THROUGHPUT_SAVE_INTERVAL = 60.0         # Période d'enregistrement des vitesses apprises (secondes)
+
+# Classes d'extension du modèle de débit (les autres extensions forment la classe "autre")
+EXTENSION_CLASSES = {
+    'texte': {'.txt', '.csv', '.json', '.xml', '.html', '.htm', '.css', '.js', '.md', '.ini', '.cfg',
+              '.yaml', '.yml', '.sql', '.py', '.c', '.h', '.cpp', '.java', '.ts', '.svg'},
+    'document': {'.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.ods', '.pdf', '.rtf'},
+    'image': {'.bmp', '.tif', '.tiff', '.psd', '.raw', '.dng', '.png', '.jpg', '.jpeg', '.gif', '.webp'},
+    'audio_video': {'.wav', '.flac', '.mp3', '.aac', '.ogg', '.avi', '.mp4', '.mkv', '.mov', '.wmv'},
+    'binaire': {'.bin', '.dat', '.iso', '.img', '.vmdk', '.vhd', '.vhdx', '.db', '.sqlite', '.mdb', '.bak'},
+}
+
+# Détection du périphérique du disque cible: type SSD/HDD (/sys/block/*/queue/rotational sous Linux)
+# et courte mesure de lecture (O_DIRECT) de fichiers existants, qui règle les workers et l'ordre de lecture
+DEVICE_PROBE_ENABLED = True
+DEVICE_PROBE_SECONDS = 1.0          # Durée maximale de la mesure (moitié séquentielle, moitié aléatoire)
+DEVICE_PROBE_MAX_FILES = 64         # Fichiers existants utilisés pour les lectures aléatoires
+DEVICE_IOPS_PER_WORKER = 100        # IOPS aléatoires consommées par un worker de la voie des petits fichiers
+DEVICE_MBS_PER_LARGE_WORKER = 50    # Débit de lecture (MB/s) consommé par un worker de la voie des gros fichiers
+DEVICE_SSD_MIN_IOPS = 1000          # IOPS mesurées (sans cache) à partir desquelles le disque est un SSD
+
+# Interface: la progression est agrégée par le moteur et relevée à chaque rafraîchissement;
+# les logs sont conservés dans des tampons circulaires de cette taille (lignes affichées au maximum)
+UI_LOG_BUFFER_SIZE = 500            # Logs en temps réel
+UI_MESSAGE_BUFFER_SIZE = 1000       # Journal principal
+# Logs arrivés plus vite que l'interface ne les affiche: écrits dans ce fichier (dossier temporaire
+# du système) au lieu d'être perdus
+UI_OVERFLOW_LOG_NAME = "ultracompression_logs_non_affiches.log"
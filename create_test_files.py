@@ -161,11 +161,118 @@ def generate_binary_content(target_size):
     """Génère du contenu binaire"""
     return bytes([random.randint(0, 255) for _ in range(target_size)])
 
+# Profils de corpus pour les benchmarks (voir benchmark.py)
+# small_files: nombre de petits fichiers, small_size: tailles min/max (octets)
+# large_files / large_size_mb: gros fichiers, depth / breadth: forme de l'arborescence
+# entropy: proportion de données aléatoires (incompressibles)
+BENCHMARK_PROFILES = {
+    "rapide": {"small_files": 2000, "small_size": (1024, 16 * 1024), "large_files": 2,
+               "large_size_mb": 32, "depth": 3, "breadth": 4, "entropy": 0.3},
+    "petits_fichiers": {"small_files": 1000000, "small_size": (1024, 8 * 1024), "large_files": 0,
+                        "large_size_mb": 0, "depth": 4, "breadth": 10, "entropy": 0.2},
+    "gros_fichiers": {"small_files": 0, "small_size": (0, 0), "large_files": 4,
+                      "large_size_mb": 2048, "depth": 1, "breadth": 2, "entropy": 0.3},
+    "mixte": {"small_files": 100000, "small_size": (1024, 256 * 1024), "large_files": 8,
+              "large_size_mb": 512, "depth": 5, "breadth": 5, "entropy": 0.5},
+    "arborescence_profonde": {"small_files": 50000, "small_size": (1024, 16 * 1024), "large_files": 0,
+                              "large_size_mb": 0, "depth": 12, "breadth": 2, "entropy": 0.2},
+}
+
+# Taille des réserves de contenu dans lesquelles les fichiers sont découpés
+_POOL_SIZE = 4 * 1024 * 1024
+
+
+def _build_tree(base_path, depth, breadth):
+    """Crée une arborescence de profondeur et largeur données; retourne tous ses dossiers"""
+    directories = [base_path]
+    level = [base_path]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for b in range(breadth):
+                child = parent / f"niveau{d + 1}_{b + 1:02d}"
+                child.mkdir(exist_ok=True)
+                next_level.append(child)
+        directories.extend(next_level)
+        level = next_level
+    return directories
+
+
+def create_benchmark_corpus(base_path="bench_corpus", profile="rapide", seed=42, scale=1.0):
+    """
+    Génère un corpus reproductible (même graine = mêmes fichiers) pour les benchmarks.
+    scale multiplie le nombre de fichiers et la taille des gros fichiers.
+    Retourne (nombre de fichiers, taille totale en octets).
+    """
+    settings = BENCHMARK_PROFILES[profile]
+    random.seed(seed)  # Utilisé par les générateurs de contenu texte
+    rng = random.Random(seed)
+    base = Path(base_path)
+    base.mkdir(exist_ok=True)
+    
+    # Réserves de contenu: le découpage évite de générer chaque fichier octet par octet
+    text_pool = generate_text_content(_POOL_SIZE).encode('utf-8')
+    random_pool = rng.getrandbits(_POOL_SIZE * 8).to_bytes(_POOL_SIZE, "little")
+    
+    def content(size):
+        pool = random_pool if rng.random() < settings["entropy"] else text_pool
+        offset = rng.randrange(0, max(1, len(pool) - size))
+        return pool[offset:offset + size]
+    
+    directories = _build_tree(base, settings["depth"], settings["breadth"])
+    print(f"Création du corpus '{profile}' dans {base.absolute()} ({len(directories)} dossiers)")
+    
+    total_files = 0
+    total_size = 0
+    min_size, max_size = settings["small_size"]
+    small_files = int(settings["small_files"] * scale)
+    for i in range(small_files):
+        directory = directories[i % len(directories)]
+        size = rng.randint(min_size, max_size)
+        data = content(size)
+        extension = rng.choice([".txt", ".json", ".csv", ".xml", ".dat"])
+        with open(directory / f"fichier_{i:07d}{extension}", "wb") as f:
+            f.write(data)
+        total_files += 1
+        total_size += len(data)
+        if (i + 1) % 100000 == 0:
+            print(f"   {i + 1} / {small_files} petits fichiers")
+    
+    # Gros fichiers écrits par blocs (mémoire constante), alternance texte / aléatoire selon l'entropie
+    chunk_size = 1024 * 1024
+    large_size = int(settings["large_size_mb"] * scale) * 1024 * 1024
+    for i in range(settings["large_files"]):
+        directory = directories[(i * 7) % len(directories)]
+        with open(directory / f"gros_{i:03d}.bin", "wb") as f:
+            written = 0
+            while written < large_size:
+                data = content(min(chunk_size, large_size - written))
+                f.write(data)
+                written += len(data)
+        total_files += 1
+        total_size += large_size
+    
+    print(f"✅ Corpus créé: {total_files} fichiers ({total_size / (1024 * 1024):.1f} MB)")
+    return total_files, total_size
+
 def main():
     """Fonction principale"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Crée des fichiers de test pour UltraCompression")
+    parser.add_argument("--profil", choices=sorted(BENCHMARK_PROFILES),
+                        help="générer un corpus de benchmark au lieu du petit répertoire de test")
+    parser.add_argument("--chemin", default=None, help="dossier à créer")
+    parser.add_argument("--graine", type=int, default=42, help="graine aléatoire (corpus reproductible)")
+    parser.add_argument("--echelle", type=float, default=1.0, help="multiplie le nombre et la taille des fichiers")
+    args = parser.parse_args()
+    
+    if args.profil:
+        create_benchmark_corpus(args.chemin or "bench_corpus", args.profil, args.graine, args.echelle)
+        return
+    
     print("=== Création de fichiers de test pour UltraCompression ===\n")
     
-    test_path = create_test_directory()
+    test_path = create_test_directory(args.chemin or "test_drive")
     
     print("\n=== Instructions d'utilisation ===")
     print("1. Lancez UltraCompression: python ultra_compression.py")
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Déduplication par contenu avant compression
+Les fichiers identiques (copies de sauvegardes...) ne sont compressés qu'une fois:
+regroupement par taille, puis par empreinte partielle (début et fin du fichier),
+puis par empreinte complète (xxhash si installé, sinon BLAKE2), calculées en parallèle.
+
+Une fois l'original compressé, chaque doublon est supprimé et référencé dans le
+manifeste de doublons de son répertoire (une ligne JSON par doublon) qui indique
+l'archive et le fichier à extraire pour le restaurer.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from metrics import MetricsRegistry, STAT_CALLS
+
+try:
+    import xxhash
+except ImportError:  # Dépendance optionnelle
+    xxhash = None
+
+
+def _new_full_hasher():
+    """Empreinte complète: xxh3-128 (plus rapide) si disponible, sinon BLAKE2b-256"""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=32)
+
+
+def partial_hash(record):
+    """Empreinte du début et de la fin du fichier (élimine vite les faux candidats)"""
+    size = config.DEDUP_PARTIAL_SIZE
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(record.path, "rb") as f:
+        hasher.update(f.read(size))
+        if record.size > size:
+            f.seek(max(size, record.size - size))
+            hasher.update(f.read(size))
+    return hasher.hexdigest()
+
+
+def full_hash(record, cancelled=None):
+    """
+    Empreinte du fichier entier, lu par grands blocs dans un tampon réutilisé.
+    cancelled: threading.Event optionnel; retourne None dès qu'il est levé
+    """
+    hasher = _new_full_hasher()
+    buffer = bytearray(config.DEDUP_READ_BUFFER)
+    view = memoryview(buffer)
+    with open(record.path, "rb", buffering=0) as f:
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+    return hasher.hexdigest()
+
+
+def _bounded_map(executor, func, items, window):
+    """
+    Comme executor.map, mais au plus `window` tâches soumises à la fois
+    (executor.map crée immédiatement un Future par élément)
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Deduplicator:
+    """Détecte les doublons d'une liste de FileRecord et les remplace par des références"""
+
+    def __init__(self, metrics=None):
+        """metrics: MetricsRegistry où compter le stat de vérification de chaque doublon"""
+        # Chemin de l'original retenu -> liste des doublons (FileRecord, empreinte)
+        self._duplicates = {}
+        self._lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+
+        # Levé par cancel(): les empreintes en attente ne sont plus calculées
+        self.cancelled = threading.Event()
+
+        self.stats = {'groups': 0, 'duplicates': 0, 'duplicate_bytes': 0}
+        self._stat_calls = (metrics or MetricsRegistry()).counter(STAT_CALLS, "Appels stat du passage",
+                                                                  {"stage": "dedup"})
+
+    def cancel(self):
+        """Interrompt la recherche de doublons en cours (aucun doublon n'est alors retenu)"""
+        self.cancelled.set()
+
+    def clear(self):
+        """Oublie les doublons mémorisés (recherche en erreur: tous les fichiers sont compressés)"""
+        with self._lock:
+            self._duplicates = {}
+        self.stats = {'groups': 0, 'duplicates': 0, 'duplicate_bytes': 0}
+
+    # ------------------------------------------------------------------
+    # Détection
+    # ------------------------------------------------------------------
+
+    def deduplicate(self, plan):
+        """
+        Retourne l'ensemble des indices du plan (FilePlan) à ne pas compresser: les doublons,
+        mémorisés pour être traités après leur original. Seuls les fichiers dont la taille
+        n'est pas unique sont reconstruits en FileRecord.
+        """
+        size_counts = Counter(plan.sizes)
+        candidates = [(index, plan[index]) for index, size in enumerate(plan.sizes) if size_counts[size] > 1]
+        del size_counts
+        if not candidates:
+            return set()
+
+        with ThreadPoolExecutor(max_workers=config.DEDUP_HASH_WORKERS) as executor:
+            partial_groups = self._split(executor, candidates, partial_hash)
+            full_groups = self._split(executor, (item for group in partial_groups.values() for item in group),
+                                      lambda record: full_hash(record, self.cancelled))
+        if self.cancelled.is_set():
+            return set()
+
+        duplicate_indices = set()
+        for (size, digest), group in full_groups.items():
+            # Original: premier chemin dans l'ordre alphabétique (résultat reproductible)
+            group.sort(key=lambda item: item[1].path)
+            (_, original), duplicates = group[0], group[1:]
+            self._duplicates[original.path] = [(record, digest) for _, record in duplicates]
+            duplicate_indices.update(index for index, _ in duplicates)
+            self.stats['groups'] += 1
+            self.stats['duplicates'] += len(duplicates)
+            self.stats['duplicate_bytes'] += size * len(duplicates)
+
+        return duplicate_indices
+
+    def _split(self, executor, items, hash_func):
+        """
+        Sous-groupes de (indice, FileRecord) de même taille et même empreinte, calculées en parallèle
+        par fenêtres bornées (hashlib et xxhash libèrent le GIL). Les fichiers illisibles sont uniques,
+        comme tous les fichiers restants après cancel().
+        """
+        items = list(items)
+
+        def safe_hash(item):
+            if self.cancelled.is_set():
+                return None
+            try:
+                return hash_func(item[1])
+            except OSError:
+                return None
+
+        by_digest = defaultdict(list)
+        digests = _bounded_map(executor, safe_hash, items, config.DEDUP_HASH_WORKERS * 4)
+        for item, digest in zip(items, digests):
+            if digest is not None:
+                by_digest[(item[1].size, digest)].append(item)
+
+        return {key: group for key, group in by_digest.items() if len(group) > 1}
+
+    # ------------------------------------------------------------------
+    # Remplacement par des références (appelé par le finaliseur)
+    # ------------------------------------------------------------------
+
+    def pop_duplicates(self, record):
+        """Doublons (FileRecord, empreinte) d'un original qui vient d'être traité"""
+        with self._lock:
+            return self._duplicates.pop(record.path, [])
+
+    def replace_with_reference(self, duplicate, digest, original_result, journal=None):
+        """
+        Référence le doublon dans le manifeste de son répertoire puis le supprime.
+        Retourne (succès, message)
+        """
+        filename = os.path.basename(duplicate.path)
+        original = original_result.record
+
+        # Le doublon ne doit pas avoir changé depuis le calcul de son empreinte
+        try:
+            self._stat_calls.inc()
+            stat = os.stat(duplicate.path)
+        except OSError as e:
+            return False, f"Doublon inaccessible {filename}: {e}"
+        if stat.st_size != duplicate.size or stat.st_mtime != duplicate.mtime:
+            return False, f"Doublon modifié depuis l'analyse: {filename}"
+
+        directory = os.path.dirname(duplicate.path)
+        entry = {
+            "name": filename,
+            "size": duplicate.size,
+            "mtime": duplicate.mtime,
+            "hash": digest,
+            "original": os.path.relpath(original.path, directory),
+            "archive": os.path.relpath(original_result.archive_path, directory),
+            "member": os.path.basename(original.path),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        try:
+            self._append_reference(directory, entry)
+        except OSError as e:
+            # Sans référence, on ne supprime pas le doublon
+            return False, f"Erreur écriture du manifeste de doublons: {e}"
+
+        if journal is not None:
+            journal.verified(duplicate, original_result.archive_path)
+        try:
+            os.remove(duplicate.path)
+        except OSError as e:
+            return False, f"Erreur suppression {filename}: {e}"
+
+        return True, f"Doublon de {os.path.basename(original.path)}: {filename} remplacé par une référence"
+
+    def _append_reference(self, directory, entry):
+        manifest_path = os.path.join(directory, config.DEDUP_MANIFEST_NAME)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._manifest_lock:
+            with open(manifest_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Détection du périphérique qui porte le disque cible
+- Point de montage et système de fichiers: table des montages (psutil)
+- Type SSD/HDD: /sys/block/<périphérique>/queue/rotational sous Linux (partitions,
+  device-mapper et RAID logiciel résolus jusqu'aux disques physiques)
+- Mesure optionnelle: courte lecture séquentielle puis aléatoire de fichiers existants
+  du disque, en O_DIRECT quand c'est possible (sans passer par le cache du système)
+
+Le débit et les IOPS mesurés servent à régler le nombre de workers et l'ordre de lecture.
+"""
+
+import mmap
+import os
+import random
+import time
+from collections import namedtuple
+
+import psutil
+
+import config
+
+# Périphérique du disque cible. kind: "SSD", "HDD" ou "inconnu";
+# read_mbs / read_iops: mesures de lecture (None sans mesure)
+DeviceInfo = namedtuple(
+    "DeviceInfo",
+    ["kind", "device", "mount_point", "filesystem", "rotational", "read_mbs", "read_iops", "direct_io"],
+    defaults=(None, None, None, None, None, None, False),
+)
+
+# Alignement des lectures O_DIRECT (taille de bloc logique la plus courante)
+_ALIGNMENT = 4096
+_SEQUENTIAL_BLOCK = 1024 * 1024
+
+
+def find_mount(path):
+    """(périphérique, point de montage, système de fichiers) du montage le plus spécifique contenant path"""
+    path = os.path.realpath(path)
+    best = None
+    try:
+        partitions = psutil.disk_partitions(all=True)
+    except (OSError, RuntimeError):
+        return None, None, None
+    for partition in partitions:
+        mount_point = partition.mountpoint
+        prefix = mount_point if mount_point.endswith(os.sep) else mount_point + os.sep
+        if path == mount_point or path.startswith(prefix):
+            if best is None or len(mount_point) > len(best.mountpoint):
+                best = partition
+    if best is None:
+        return None, None, None
+    return best.device, best.mountpoint, best.fstype
+
+
+def _sys_block_dir(path, device):
+    """Répertoire /sys/class/block du périphérique de path (numéro de périphérique, puis table des montages)"""
+    try:
+        st_dev = os.stat(path).st_dev
+        sys_dir = f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+        if os.path.exists(sys_dir):
+            return os.path.realpath(sys_dir)
+    except (OSError, AttributeError):
+        pass
+    if device and device.startswith("/dev/"):
+        sys_dir = os.path.join("/sys/class/block", os.path.basename(os.path.realpath(device)))
+        if os.path.exists(sys_dir):
+            return os.path.realpath(sys_dir)
+    return None
+
+
+def _disk_name(path, device):
+    """Nom noyau du disque entier (partition remontée à son disque), None hors Linux"""
+    sys_dir = _sys_block_dir(path, device)
+    if sys_dir is None:
+        return None
+    if os.path.exists(os.path.join(sys_dir, "partition")):
+        sys_dir = os.path.dirname(sys_dir)
+    return os.path.basename(sys_dir)
+
+
+def disk_name(path):
+    """Nom du disque entier qui porte path, tel qu'il apparaît dans /proc/diskstats (None si inconnu)"""
+    return _disk_name(path, find_mount(path)[0])
+
+
+def physical_device(path):
+    """
+    Identifiant du disque physique qui porte path: deux dossiers sur des partitions d'un même
+    disque ont le même identifiant (nom du disque sous Linux, sinon périphérique monté ou lettre de lecteur)
+    """
+    device, mount_point, _ = find_mount(path)
+    disk = _disk_name(path, device)
+    if disk is not None:
+        return disk
+    if device:
+        return device
+    drive = os.path.splitdrive(os.path.realpath(path))[0]
+    return drive or mount_point or os.path.realpath(path)
+
+
+def _rotational(sys_dir, depth=0):
+    """
+    Valeur de queue/rotational d'un périphérique bloc (True, False ou None si inconnue).
+    Une partition remonte à son disque; un volume logique ou RAID est rotatif si l'un de ses disques l'est.
+    """
+    if sys_dir is None or depth > 8:
+        return None
+    if os.path.exists(os.path.join(sys_dir, "partition")):
+        sys_dir = os.path.dirname(sys_dir)
+
+    slaves_dir = os.path.join(sys_dir, "slaves")
+    slaves = os.listdir(slaves_dir) if os.path.isdir(slaves_dir) else []
+    if slaves:
+        values = [_rotational(os.path.realpath(os.path.join(slaves_dir, name)), depth + 1) for name in slaves]
+        if any(values):
+            return True
+        return False if all(value is False for value in values) else None
+
+    try:
+        with open(os.path.join(sys_dir, "queue", "rotational")) as f:
+            return f.read().strip() == "1"
+    except OSError:
+        return None
+
+
+def _sample_files(root_path, max_files):
+    """Fichiers existants d'au moins un bloc sur le disque (parcours borné, dossier d'état exclu)"""
+    files = []
+    pending = [root_path]
+    visited = 0
+    while pending and len(files) < max_files and visited < max_files * 50:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    visited += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != config.STATE_DIR_NAME:
+                                pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size = entry.stat().st_size
+                            if size >= 16 * _ALIGNMENT:
+                                files.append((entry.path, size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files
+
+
+def _open_direct(path):
+    """Ouvre en lecture sans cache (O_DIRECT sous Linux, F_NOCACHE sous macOS); retourne (fd, direct)"""
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    if hasattr(os, "O_DIRECT"):
+        try:
+            return os.open(path, flags | os.O_DIRECT), True
+        except OSError:
+            pass  # Système de fichiers sans O_DIRECT (tmpfs...)
+    fd = os.open(path, flags)
+    if hasattr(os, "F_NOCACHE"):
+        import fcntl
+        try:
+            fcntl.fcntl(fd, os.F_NOCACHE, 1)
+            return fd, True
+        except OSError:
+            pass
+    return fd, False
+
+
+def _read_block(fd, buffer, offset):
+    """Lecture positionnelle dans un tampon aligné (requis par O_DIRECT)"""
+    if hasattr(os, "preadv"):
+        return os.preadv(fd, [buffer], offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return len(os.read(fd, len(buffer)))
+
+
+def probe_read(root_path, duration=None, max_files=None):
+    """
+    Mesure le débit séquentiel (MB/s) et les IOPS aléatoires (blocs de 4KB) en lisant des
+    fichiers existants de root_path pendant au plus `duration` secondes (moitié chacun).
+    Retourne (read_mbs, read_iops, direct_io) ou (None, None, False) sans fichier exploitable.
+    """
+    duration = duration or config.DEVICE_PROBE_SECONDS
+    files = _sample_files(root_path, max_files or config.DEVICE_PROBE_MAX_FILES)
+    if not files:
+        return None, None, False
+
+    # Tampons anonymes mmap: alignés sur une page, comme l'exige O_DIRECT
+    sequential_buffer = mmap.mmap(-1, _SEQUENTIAL_BLOCK)
+    random_buffer = mmap.mmap(-1, _ALIGNMENT)
+    rng = random.Random(0)
+    direct_io = True
+    try:
+        # Lecture séquentielle du plus gros fichier
+        path, size = max(files, key=lambda item: item[1])
+        fd, direct = _open_direct(path)
+        direct_io &= direct
+        read_bytes, offset = 0, 0
+        deadline = time.perf_counter() + duration / 2
+        start = time.perf_counter()
+        try:
+            while offset < size and time.perf_counter() < deadline:
+                read = _read_block(fd, sequential_buffer, offset)
+                if not read:
+                    break
+                read_bytes += read
+                offset += _SEQUENTIAL_BLOCK
+        finally:
+            os.close(fd)
+        read_mbs = read_bytes / (1024 * 1024) / max(time.perf_counter() - start, 1e-6)
+
+        # Lectures aléatoires de 4KB réparties sur tous les fichiers
+        descriptors = []
+        try:
+            for path, size in files:
+                try:
+                    fd, direct = _open_direct(path)
+                except OSError:
+                    continue
+                direct_io &= direct
+                descriptors.append((fd, size))
+            reads = 0
+            deadline = time.perf_counter() + duration / 2
+            start = time.perf_counter()
+            while descriptors and time.perf_counter() < deadline:
+                fd, size = rng.choice(descriptors)
+                offset = rng.randrange(size // _ALIGNMENT) * _ALIGNMENT
+                _read_block(fd, random_buffer, offset)
+                reads += 1
+            read_iops = reads / max(time.perf_counter() - start, 1e-6) if reads else None
+        finally:
+            for fd, _ in descriptors:
+                os.close(fd)
+    except OSError:
+        return None, None, False
+    finally:
+        sequential_buffer.close()
+        random_buffer.close()
+
+    return read_mbs, read_iops, direct_io
+
+
+def detect_device(path, probe=None):
+    """
+    DeviceInfo du disque qui contient path.
+    probe: mesurer le débit et les IOPS (config.DEVICE_PROBE_ENABLED par défaut)
+    """
+    probe = config.DEVICE_PROBE_ENABLED if probe is None else probe
+    device, mount_point, filesystem = find_mount(path)
+    rotational = _rotational(_sys_block_dir(path, device))
+
+    read_mbs = read_iops = None
+    direct_io = False
+    if probe:
+        read_mbs, read_iops, direct_io = probe_read(path)
+
+    if read_iops is not None and direct_io:
+        # Une mesure sans cache prime sur l'indicateur du système, souvent faux pour les disques
+        # virtuels et les boîtiers USB (HDD: quelques centaines d'IOPS aléatoires au plus)
+        kind = "SSD" if read_iops >= config.DEVICE_SSD_MIN_IOPS else "HDD"
+    elif rotational is not None:
+        kind = "HDD" if rotational else "SSD"
+    else:
+        kind = "inconnu"
+
+    return DeviceInfo(kind, device, mount_point, filesystem, rotational, read_mbs, read_iops, direct_io)
+
+
+def describe(info):
+    """Description lisible pour les logs"""
+    text = f"{info.kind}"
+    if info.device:
+        text += f" ({info.device}, {info.filesystem or '?'} monté sur {info.mount_point})"
+    if info.read_mbs is not None:
+        cache = "" if info.direct_io else ", avec cache"
+        iops = f", {info.read_iops:.0f} IOPS" if info.read_iops is not None else ""
+        text += f" - lecture {info.read_mbs:.0f} MB/s{iops}{cache}"
+    return text
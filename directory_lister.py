@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Listage parallèle des répertoires pour les disques à forte latence (USB, NAS, montages FUSE)
+Avec os.walk, chaque répertoire attend l'aller-retour du précédent; ici plusieurs workers
+listent des répertoires en même temps.
+
+Chaque worker a sa propre file de répertoires (deque): il prend les plus prioritaires à la fin
+de la sienne et, quand elle est vide, vole les moins prioritaires au début de celle d'un autre.
+Les sous-répertoires d'un listage retournent dans la file du worker qui l'a produit (localité).
+
+Les listages sont consommés par un seul thread (le scanner), soit dans l'ordre où ils sont
+prêts (next_ready), soit un répertoire précis à la fois (take, ordre déterministe): un
+répertoire demandé qui n'a pas encore commencé est alors listé par le consommateur lui-même.
+Le nombre de listages en cours ou en attente de consommation est borné (window).
+"""
+
+import threading
+from collections import deque
+
+
+class DirectoryLister:
+    """Pool de workers qui listent des répertoires avec vol de travail"""
+
+    def __init__(self, list_directory, workers, window):
+        """
+        list_directory: fonction(chemin) -> listage (appelée dans les workers, ne doit pas lever)
+        workers: nombre de threads de listage
+        window: listages en cours ou prêts au maximum (borne la mémoire si le consommateur est lent)
+        Les éléments soumis sont des tuples dont le premier champ est le chemin du répertoire.
+        """
+        self._list = list_directory
+        self.workers = max(1, workers)
+        self.window = max(self.workers, window)
+
+        self._condition = threading.Condition()
+        self._queues = [deque() for _ in range(self.workers)]
+        self._queued = {}    # chemin -> index de la file qui contient le répertoire
+        self._running = set()
+        self._results = {}   # chemin -> (élément, listage, worker)
+        self._ready = deque()
+        self._next_queue = 0
+        self._closed = False
+
+        self._threads = [threading.Thread(target=self._work, args=(index,), name=f"listage-{index}", daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # ------------------------------------------------------------------
+    # Interface du consommateur
+    # ------------------------------------------------------------------
+
+    def submit(self, items, worker=None):
+        """Ajoute des répertoires, du plus prioritaire au moins prioritaire, à la file d'un worker"""
+        if not items:
+            return
+        with self._condition:
+            if worker is None:
+                worker = self._next_queue
+                self._next_queue = (self._next_queue + 1) % self.workers
+            queue = self._queues[worker]
+            for item in reversed(items):
+                queue.append(item)
+                self._queued[item[0]] = worker
+            self._condition.notify_all()
+
+    def next_ready(self, should_continue):
+        """
+        Prochain listage terminé (élément, listage, worker), dans l'ordre où ils sont prêts.
+        None quand tout est listé ou que l'arrêt est demandé.
+        """
+        with self._condition:
+            while not self._ready:
+                if not should_continue() or not (self._queued or self._running):
+                    return None
+                self._condition.wait(timeout=0.1)
+            return self._pop_result(self._ready.popleft())
+
+    def take(self, item, should_continue):
+        """
+        Listage d'un répertoire précis: attendu s'il est en cours, listé directement
+        s'il n'a pas encore commencé. None si l'arrêt est demandé pendant l'attente.
+        """
+        path = item[0]
+        with self._condition:
+            while path in self._running:
+                if not should_continue():
+                    return None
+                self._condition.wait(timeout=0.1)
+            if path in self._results:
+                self._ready.remove(path)
+                return self._pop_result(path)[1]
+            self._unqueue(path)
+        return self._list(path)
+
+    def discard(self, path):
+        """Oublie un répertoire soumis dont le listage n'est plus nécessaire"""
+        with self._condition:
+            self._unqueue(path)
+            if path in self._results:
+                self._ready.remove(path)
+                self._pop_result(path)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def _pop_result(self, path):
+        result = self._results.pop(path)
+        self._condition.notify_all()  # Une place se libère dans la fenêtre
+        return result
+
+    def _unqueue(self, path):
+        worker = self._queued.pop(path, None)
+        if worker is not None:
+            self._queues[worker].remove(self._find(self._queues[worker], path))
+
+    @staticmethod
+    def _find(queue, path):
+        # Le répertoire demandé est presque toujours en fin de file (dernier soumis)
+        for item in reversed(queue):
+            if item[0] == path:
+                return item
+        raise KeyError(path)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _steal(self, index):
+        """Répertoire suivant: fin de sa propre file, sinon début de la file d'un autre worker"""
+        if self._queues[index]:
+            return self._queues[index].pop()
+        for offset in range(1, self.workers):
+            queue = self._queues[(index + offset) % self.workers]
+            if queue:
+                return queue.popleft()
+        return None
+
+    def _work(self, index):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    if len(self._running) + len(self._results) < self.window:
+                        item = self._steal(index)
+                        if item is not None:
+                            break
+                    self._condition.wait(timeout=0.1)
+                path = item[0]
+                del self._queued[path]
+                self._running.add(path)
+
+            listing = self._list(path)
+
+            with self._condition:
+                self._running.discard(path)
+                self._results[path] = (item, listing, index)
+                self._ready.append(path)
+                self._condition.notify_all()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Échantillonnage avant compression
+Lit quelques petits blocs répartis dans le fichier et estime le gain de compression
+avec zlib niveau 1 (très rapide). Les fichiers incompressibles (JPEG, vidéos, données
+chiffrées, archives à extension inhabituelle...) sont écartés au lieu de passer par 7z
+pour un gain nul, puis d'être supprimés pour rien.
+
+La décision est mise en cache par (extension, nombre magique): une fois que suffisamment
+de fichiers d'un même type ont donné le même verdict, les suivants ne sont plus lus.
+"""
+
+import os
+import threading
+import zlib
+
+import config
+
+# Octets de début de fichier utilisés comme nombre magique
+MAGIC_SIZE = 4
+
+
+def _read_at(fd, size, offset):
+    """Lecture positionnelle (pread si disponible, sinon seek + read sous Windows)"""
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def estimate_gain(data):
+    """Gain estimé (0 à 1) d'un échantillon compressé avec zlib niveau 1"""
+    if not data:
+        return 0.0
+    return 1 - len(zlib.compress(data, 1)) / len(data)
+
+
+class EntropySampler:
+    """Filtre du pipeline qui écarte les fichiers dont le gain estimé est trop faible"""
+
+    def __init__(self, min_expected_gain=None, index=None):
+        self.min_expected_gain = (config.MIN_EXPECTED_GAIN if min_expected_gain is None
+                                  else min_expected_gain)
+        # Index de scan optionnel: les fichiers écartés y sont marqués "skipped"
+        # pour ne pas être relus au prochain passage tant qu'ils ne changent pas
+        self.index = index
+
+        # (extension, nombre magique) -> [fichiers échantillonnés, fichiers écartés, somme des gains]
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'sampled': 0, 'cache_hits': 0, 'skipped': 0, 'skipped_bytes': 0}
+
+    def filter_record(self, record):
+        """Filtre du pipeline: retourne une raison d'exclusion, ou None si le fichier vaut la peine"""
+        try:
+            gain = self._sample(record)
+        except OSError:
+            return None  # Illisible ici: la compression signalera l'erreur
+
+        if gain >= self.min_expected_gain:
+            return None
+
+        with self._lock:
+            self.stats['skipped'] += 1
+            self.stats['skipped_bytes'] += record.size
+        if self.index is not None:
+            self.index.record_file(record, "skipped")
+        return f"incompressible (gain estimé {gain * 100:.1f}%)"
+
+    def _sample(self, record):
+        """Gain estimé du fichier (gain moyen de son type si la décision est en cache)"""
+        fd = os.open(record.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            chunk_size = config.SAMPLE_CHUNK_SIZE
+            head = _read_at(fd, chunk_size, 0)
+            key = (record.ext, head[:MAGIC_SIZE])
+
+            cached = self._cached_decision(key)
+            if cached is not None:
+                return cached
+
+            # Blocs répartis régulièrement dans le reste du fichier
+            chunks = [head]
+            count = config.SAMPLE_CHUNKS
+            if record.size > chunk_size and count > 1:
+                last_offset = record.size - chunk_size
+                for i in range(1, count):
+                    offset = max(chunk_size, last_offset * i // (count - 1))
+                    chunks.append(_read_at(fd, chunk_size, offset))
+        finally:
+            os.close(fd)
+
+        gain = sum(estimate_gain(chunk) * len(chunk) for chunk in chunks) / max(1, sum(map(len, chunks)))
+        self._remember(key, gain)
+        return gain
+
+    def _cached_decision(self, key):
+        """Gain moyen du type si tous ses fichiers échantillonnés ont eu le même verdict, sinon None"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < config.SAMPLE_CACHE_MIN_FILES:
+                return None
+            sampled, skipped, gain_sum = entry
+            if skipped not in (0, sampled):
+                return None  # Verdicts mélangés: continuer à échantillonner ce type
+            self.stats['cache_hits'] += 1
+            return gain_sum / sampled
+
+    def _remember(self, key, gain):
+        with self._lock:
+            self.stats['sampled'] += 1
+            entry = self._cache.get(key)
+            if entry is None:
+                if len(self._cache) >= config.SAMPLE_CACHE_MAX_KEYS:
+                    return
+                entry = self._cache[key] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += int(gain < self.min_expected_gain)
+            entry[2] += gain
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Règles d'exclusion compilées (dossiers système et motifs de type .gitignore)
+- Dossiers système (config.SYSTEM_FOLDERS): comparés composant par composant du chemin
+  (arbre de préfixes, sans distinction de casse): 'Windows' exclut C:\\Windows mais plus
+  D:\\MyWindowsBackups; 'Users\\Default' exige les deux composants consécutifs.
+- Motifs (config.EXCLUDE_PATTERNS puis le fichier config.IGNORE_FILE_NAME à la racine du
+  disque): syntaxe .gitignore ("*.bak", "node_modules/", "/Archives/**", "!garder.log"),
+  compilés en deux expressions régulières (motifs sur le nom, motifs sur le chemin relatif);
+  le dernier motif qui correspond l'emporte.
+
+Le verdict de chaque répertoire est mis en cache et hérité par son contenu: un dossier
+exclu est élagué avant d'être parcouru, et un fichier ne coûte qu'une recherche dans le
+cache plus une seule expression régulière, quel que soit le nombre de règles.
+"""
+
+import os
+import re
+
+import config
+
+# Raison d'exclusion des dossiers système (affichée dans les logs)
+SYSTEM_REASON = "dossier système"
+
+# Séparateurs acceptés dans les règles (les chemins Windows de config utilisent '\\')
+_RULE_SEPARATORS = re.compile(r"[\\/]+")
+
+
+def load_patterns(root_path=None):
+    """Motifs d'exclusion: config.EXCLUDE_PATTERNS puis le fichier d'exclusion de la racine"""
+    patterns = list(config.EXCLUDE_PATTERNS)
+    if root_path:
+        try:
+            with open(os.path.join(root_path, config.IGNORE_FILE_NAME), encoding="utf-8") as f:
+                patterns.extend(line.rstrip("\n") for line in f)
+        except OSError:
+            pass
+    return [pattern.strip() for pattern in patterns if pattern.strip() and not pattern.lstrip().startswith("#")]
+
+
+def _translate(pattern):
+    """
+    Motif .gitignore -> (expression régulière, négation, dossiers seulement, ancré).
+    Sans '/' (hors '/' final), le motif porte sur le nom seul, à n'importe quelle profondeur;
+    sinon (ancré) sur le chemin relatif à la racine, avec '/' comme séparateur.
+    """
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    directory_only = pattern.endswith("/")
+    pattern = pattern.strip("/") if directory_only else pattern
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            content = pattern[i + 1:end].replace("\\", "\\\\")
+            regex.append("[^" + content[1:] + "]" if content.startswith("!") else "[" + content + "]")
+            i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+
+    return "".join(regex), negate, directory_only, anchored
+
+
+class _PatternSet:
+    """
+    Motifs compilés en une expression régulière pour les noms et une pour les chemins relatifs.
+    Dans chacune, les alternatives sont en ordre inverse: la première qui correspond est le
+    dernier motif; entre les deux, le motif le plus récent (rang) l'emporte.
+    """
+
+    def __init__(self, rules):
+        # rules: [(rang, motif, expression, négation, ancré)]
+        self._name_regex, self._name_groups = self._compile([rule for rule in rules if not rule[4]])
+        self._path_regex, self._path_groups = self._compile([rule for rule in rules if rule[4]])
+
+    @staticmethod
+    def _compile(rules):
+        if not rules:
+            return None, {}
+        ordered = list(reversed(rules))
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        regex = re.compile("|".join(f"({rule[2]})" for rule in ordered), flags)
+        return regex, {index: rule for index, rule in enumerate(ordered, start=1)}
+
+    def verdict(self, rel_path, name):
+        """Raison d'exclusion par les motifs, ou None (aucun motif, ou négation la plus récente)"""
+        winner = None
+        if self._name_regex is not None:
+            match = self._name_regex.fullmatch(name)
+            if match is not None:
+                winner = self._name_groups[match.lastindex]
+        if self._path_regex is not None:
+            match = self._path_regex.fullmatch(rel_path)
+            if match is not None:
+                rule = self._path_groups[match.lastindex]
+                if winner is None or rule[0] > winner[0]:
+                    winner = rule
+        if winner is None or winner[3]:
+            return None
+        return f"motif {winner[1]}"
+
+
+class ExclusionRules:
+    """Verdicts d'exclusion des répertoires (mis en cache) et des fichiers d'un disque"""
+
+    def __init__(self, root_path=None, system_folders=None, patterns=None):
+        self.root_path = os.path.abspath(root_path) if root_path else None
+
+        # Arbre de préfixes des dossiers système: composant en minuscules -> noeud; None: fin d'une règle
+        self._trie = {}
+        for folder in config.SYSTEM_FOLDERS if system_folders is None else system_folders:
+            node = self._trie
+            for component in _RULE_SEPARATORS.split(folder.strip("\\/")):
+                node = node.setdefault(component.lower(), {})
+            node[None] = True
+
+        self.patterns = list(config.EXCLUDE_PATTERNS if patterns is None else patterns)
+        translated = [(rank, pattern) + _translate(pattern) for rank, pattern in enumerate(self.patterns)]
+        # (rang, motif, expression, négation, ancré); les motifs terminés par '/' ne visent que les dossiers
+        self._directory_patterns = _PatternSet([rule[:4] + rule[5:] for rule in translated])
+        self._file_patterns = _PatternSet([rule[:4] + rule[5:] for rule in translated if not rule[4]])
+
+        # Chemin du répertoire -> (raison ou None, noeuds de l'arbre en cours, chemin relatif à la racine)
+        self._cache = {}
+
+    @classmethod
+    def for_root(cls, root_path):
+        """Règles de config et du fichier d'exclusion du disque"""
+        return cls(root_path, patterns=load_patterns(root_path))
+
+    def directory_reason(self, directory):
+        """Raison d'exclusion d'un répertoire (héritée de ses parents), ou None"""
+        return self._directory(directory)[0]
+
+    def file_reason(self, path):
+        """Raison d'exclusion d'un fichier: verdict de son répertoire puis motifs sur son chemin"""
+        directory, name = os.path.split(path)
+        reason, _, rel_dir = self._directory(directory)
+        if reason is not None:
+            return reason
+        if rel_dir is None:
+            return None
+        return self._file_patterns.verdict(f"{rel_dir}/{name}" if rel_dir else name, name)
+
+    def _directory(self, directory):
+        cached = self._cache.get(directory)
+        if cached is not None:
+            return cached
+
+        parent, name = os.path.split(directory)
+        if not name or parent == directory:
+            # Racine du système de fichiers (chemin relatif '' si c'est aussi la racine du disque)
+            at_root = self.root_path is None or os.path.abspath(directory) == self.root_path
+            cached = (None, (), "" if at_root else None)
+        else:
+            parent_reason, parent_states, parent_rel = self._directory(parent)
+            if parent_reason is not None:
+                cached = (parent_reason, (), None)
+            else:
+                cached = self._evaluate(directory, name, parent_states, parent_rel)
+
+        if len(self._cache) >= config.EXCLUSION_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[directory] = cached
+        return cached
+
+    def _evaluate(self, directory, name, parent_states, parent_rel):
+        """Verdict d'un répertoire dont le parent n'est pas exclu"""
+        key = name.lower()
+        states = []
+        for node in (self._trie,) + parent_states:
+            child = node.get(key)
+            if child is not None:
+                if None in child:
+                    return SYSTEM_REASON, (), None
+                states.append(child)
+
+        # Chemin relatif à la racine du disque ('' pour la racine, None au-dessus)
+        if parent_rel is not None:
+            rel_path = f"{parent_rel}/{name}" if parent_rel else name
+        elif os.path.abspath(directory) == self.root_path:
+            rel_path = ""
+        else:
+            rel_path = None
+
+        if rel_path:
+            reason = self._directory_patterns.verdict(rel_path, name)
+            if reason is not None:
+                return reason, (), None
+        return None, tuple(states), rel_path
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Plan de fichiers compact pour les disques de plusieurs millions de fichiers
+Les étages qui doivent conserver tous les fichiers (déduplication, benchmarks) stockent
+une table des répertoires et des tableaux typés (taille, date, répertoire, inode, nom)
+au lieu d'un FileRecord par fichier: une quarantaine d'octets plus le nom, contre
+plusieurs centaines d'octets d'objets Python (tuple, chemin complet, entiers, flottant).
+
+Les FileRecord sont reconstruits à la demande (plan[i], itération).
+"""
+
+import os
+from array import array
+
+from file_scanner import FileRecord
+
+# Encodage des noms: les caractères non décodables des noms de fichiers (surrogates) sont conservés
+_NAME_ENCODING = "utf-8"
+_NAME_ERRORS = "surrogatepass"
+
+
+class FilePlan:
+    """Suite de FileRecord stockée en colonnes (table des répertoires + tableaux typés)"""
+
+    def __init__(self, records=()):
+        self.directories = []        # identifiant -> chemin du répertoire
+        self._directory_ids = {}     # chemin du répertoire -> identifiant
+
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.inodes = array("Q")
+        self.dir_ids = array("I")
+        self._names = bytearray()
+        self._name_offsets = array("Q", [0])
+
+        for record in records:
+            self.append(record)
+
+    def append(self, record):
+        directory, name = os.path.split(record.path)
+        dir_id = self._directory_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._directory_ids[directory] = len(self.directories)
+            self.directories.append(directory)
+
+        self.sizes.append(record.size)
+        self.mtimes.append(record.mtime)
+        self.inodes.append(record.inode)
+        self.dir_ids.append(dir_id)
+        self._names += name.encode(_NAME_ENCODING, _NAME_ERRORS)
+        self._name_offsets.append(len(self._names))
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def name(self, index):
+        start, end = self._name_offsets[index], self._name_offsets[index + 1]
+        return self._names[start:end].decode(_NAME_ENCODING, _NAME_ERRORS)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        name = self.name(index)
+        return FileRecord(os.path.join(self.directories[self.dir_ids[index]], name),
+                          self.sizes[index], self.mtimes[index],
+                          os.path.splitext(name)[1].lower(), self.inodes[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def nbytes(self):
+        """Mémoire approximative occupée par le plan (octets)"""
+        columns = (self.sizes, self.mtimes, self.inodes, self.dir_ids, self._name_offsets)
+        return (sum(column.itemsize * len(column) for column in columns) + len(self._names)
+                + sum(len(directory) + 100 for directory in self.directories))
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+Scanner de fichiers en un seul passage
+Parcourt le disque une seule fois avec os.scandir et produit un flux d'enregistrements
+(chemin, taille, date de modification, extension) réutilisables par tout le pipeline
+
+Sur les disques à forte latence (HDD, partages réseau, montages FUSE), les répertoires sont
+listés par plusieurs workers (DirectoryLister) et le flux est produit au fil des listages,
+ou dans l'ordre du parcours séquentiel si l'ordre déterministe est demandé.
+"""
+
+import os
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+
+import config
+from directory_lister import DirectoryLister
+from metrics import MetricsRegistry, STAT_CALLS
+
+# Enregistrement produit par le scanner: le stat est fait une seule fois ici
+FileRecord = namedtuple("FileRecord", ["path", "size", "mtime", "ext", "inode"], defaults=(0,))
+
+# Sous Windows, DirEntry.stat() réutilise les informations du listage: aucun appel système
+_DIRENTRY_STAT_IS_FREE = os.name == "nt"
+
+# Systèmes de fichiers distants: chaque listage de répertoire coûte un aller-retour réseau
+_REMOTE_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "sshfs", "davfs", "9p", "afpfs", "ncpfs"}
+
+
+def _is_remote(filesystem):
+    filesystem = (filesystem or "").lower()
+    return filesystem in _REMOTE_FILESYSTEMS or filesystem.startswith("fuse")
+
+
+class ScanStats:
+    """Statistiques construites au fil du scan (compteurs, histogramme des types, taille totale)"""
+
+    def __init__(self):
+        self.files_found = 0
+        self.eligible_files = 0
+        self.ignored_files = 0
+        self.ignored_dirs = 0
+        self.unchanged_dirs = 0
+        self.errors = 0
+        self.total_size = 0
+        self.file_types = {}
+        self.type_sizes = {}
+        self.stat_calls = 0
+
+    def add_eligible(self, record):
+        """Comptabilise un fichier éligible"""
+        self.eligible_files += 1
+        self.total_size += record.size
+        ext = record.ext or "sans_extension"
+        self.file_types[ext] = self.file_types.get(ext, 0) + 1
+        self.type_sizes[ext] = self.type_sizes.get(ext, 0) + record.size
+
+    def top_file_types(self, limit=10):
+        """Retourne les types de fichiers les plus fréquents"""
+        return sorted(self.file_types.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+class FileScanner:
+    """Parcourt récursivement un disque et produit les fichiers éligibles au fil de l'eau"""
+
+    def __init__(self, optimizer, log_callback=None, should_continue=None, apply_file_rules=True,
+                 index=None, metrics=None, workers=None, deterministic=None):
+        """
+        apply_file_rules: si False, tous les fichiers sont produits et l'éligibilité est
+        décidée en aval (étage de filtrage du pipeline), seuls les dossiers système sont élagués
+        index: ScanIndex optionnel; les répertoires inchangés depuis le dernier passage ne sont pas relus
+        metrics: MetricsRegistry où publier le nombre de fichiers trouvés et la durée des stat
+        workers: threads de listage des répertoires (config.SCAN_WORKERS; None: selon le disque)
+        deterministic: produire les fichiers dans l'ordre du parcours séquentiel (config.SCAN_DETERMINISTIC)
+        """
+        self.optimizer = optimizer
+        self.apply_file_rules = apply_file_rules
+        self.index = index
+        self.workers = config.SCAN_WORKERS if workers is None else workers
+        self.deterministic = config.SCAN_DETERMINISTIC if deterministic is None else deterministic
+        self.log = log_callback or (lambda message, level="INFO": None)
+        self.should_continue = should_continue or (lambda: True)
+        self.stats = ScanStats()
+        self._inode_order = False
+
+        metrics = metrics or MetricsRegistry()
+        self._files_scanned = metrics.counter("ultracompression_files_scanned_total", "Fichiers trouvés par le scan")
+        self._dirs_scanned = metrics.counter("ultracompression_dirs_scanned_total", "Répertoires listés par le scan")
+        self._stat_seconds = metrics.histogram("ultracompression_stat_seconds", "Durée du stat de chaque fichier")
+        self._stat_calls = metrics.counter(STAT_CALLS, "Appels stat du passage", {"stage": "scan"})
+        self._index_stat_calls = metrics.counter(STAT_CALLS, "Appels stat du passage", {"stage": "index"})
+
+    def _count_stat(self, counter, free=False):
+        if not free:
+            self.stats.stat_calls += 1
+            counter.inc()
+
+    def scan(self, root_path):
+        """
+        Générateur: produit un FileRecord par fichier éligible dès qu'il est découvert.
+        Les statistiques (self.stats) sont complètes une fois le générateur épuisé
+        (avec apply_file_rules=False, les compteurs d'éligibilité sont tenus par l'appelant).
+        """
+        self.stats = ScanStats()
+        self.log(f"📂 Début du scan récursif de: {root_path}", "ANALYSIS")
+
+        device = getattr(self.optimizer, "device", None)
+        slow_device = device is not None and (device.kind == "HDD" or _is_remote(device.filesystem))
+        workers = max(1, self.workers or (config.SCAN_PARALLEL_WORKERS if slow_device else 1))
+        inode_order = config.SCAN_INODE_ORDER
+        self._inode_order = device is not None and device.kind == "HDD" if inode_order is None else inode_order
+
+        lister = None
+        if workers > 1:
+            lister = DirectoryLister(self._list_directory, workers, workers * config.SCAN_LISTING_WINDOW)
+            order = "ordre déterministe" if self.deterministic else "ordre des listages"
+            self.log(f"🧵 Listage parallèle des répertoires: {workers} workers ({order})", "ANALYSIS")
+        try:
+            if lister is not None and not self.deterministic:
+                completed = yield from self._walk_unordered(root_path, lister)
+            else:
+                completed = yield from self._walk(root_path, lister)
+        finally:
+            if lister is not None:
+                lister.close()
+
+        if not completed:
+            self.log("⏹️ Scan interrompu par l'utilisateur", "WARNING")
+            return
+        if self.apply_file_rules:
+            self.log_summary()
+
+    def _walk(self, root_path, lister=None):
+        """
+        Parcours en profondeur dans le même ordre que os.walk (top-down); avec un lister, les
+        répertoires à venir sont listés en avance par ses workers. Retourne False si interrompu.
+        """
+        # Chaque entrée: (chemin, date de modification si connue, répertoire parent, inode)
+        pending_dirs = [(root_path, None, None, 0)]
+        while pending_dirs:
+            if not self.should_continue():
+                return False
+
+            item = pending_dirs.pop()
+            directory, mtime, parent, _ = item
+            subdirs = []
+            if self.index is not None and self._skip_unchanged(directory, mtime, subdirs):
+                if lister is not None:
+                    lister.discard(directory)
+                self._push(pending_dirs, subdirs, lister)
+                continue
+
+            entries = None
+            if lister is not None:
+                entries = lister.take(item, self.should_continue)
+                if entries is None:
+                    return False
+
+            if self.index is not None:
+                self.index.record_directory(directory, parent)
+            yield from self._scan_directory(root_path, directory, subdirs, entries)
+            self._push(pending_dirs, subdirs, lister)
+        return True
+
+    def _push(self, pending_dirs, subdirs, lister):
+        """Empile les sous-répertoires (le premier sera parcouru en premier) et les soumet au lister"""
+        self._order_subdirs(subdirs)
+        pending_dirs.extend(reversed(subdirs))
+        if lister is not None:
+            lister.submit([item for item in subdirs if self.index is None
+                           or not self.index.directory_unchanged(item[0], item[1])])
+
+    def _walk_unordered(self, root_path, lister):
+        """Parcours dans l'ordre où les listages sont prêts. Retourne False si interrompu."""
+        self._expand([(root_path, None, None, 0)], lister)
+        while True:
+            ready = lister.next_ready(self.should_continue)
+            if ready is None:
+                return self.should_continue()
+
+            (directory, _, parent, _), entries, worker = ready
+            subdirs = []
+            if self.index is not None:
+                self.index.record_directory(directory, parent)
+            yield from self._scan_directory(root_path, directory, subdirs, entries)
+            self._expand(subdirs, lister, worker)
+
+    def _expand(self, subdirs, lister, worker=None):
+        """Soumet les sous-répertoires au lister; ceux inchangés d'après l'index sont remplacés par leurs enfants"""
+        self._order_subdirs(subdirs)
+        to_list = []
+        to_visit = list(reversed(subdirs))
+        while to_visit:
+            directory, mtime, _, _ = item = to_visit.pop()
+            children = []
+            if self.index is not None and self._skip_unchanged(directory, mtime, children):
+                self._order_subdirs(children)
+                to_visit.extend(reversed(children))
+            else:
+                to_list.append(item)
+        lister.submit(to_list, worker)
+
+    def _order_subdirs(self, subdirs):
+        # Disque rotatif: les répertoires proches sur le disque (inodes voisins) sont lus à la suite
+        if self._inode_order:
+            subdirs.sort(key=lambda item: item[3])
+
+    def _list_directory(self, directory):
+        """
+        Listage d'un répertoire par un worker du lister: entrées (DirEntry) dont le stat est déjà
+        fait et mis en cache, ou l'erreur d'accès au répertoire
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            return e
+        self._dirs_scanned.inc()
+
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if entry.is_symlink():
+                        continue
+                    if self.index is not None:
+                        entry.stat()
+                    if self._inode_order:
+                        entry.inode()
+                else:
+                    start = time.perf_counter()
+                    entry.stat()
+                    self._stat_seconds.observe(time.perf_counter() - start)
+            except OSError:
+                pass  # Refait et signalé par le scanner
+        return entries
+
+    def _skip_unchanged(self, directory, mtime, subdirs):
+        """
+        Si le répertoire est inchangé d'après l'index, remplit subdirs avec ses
+        sous-répertoires connus (un stat par répertoire, aucun par fichier) et retourne True
+        """
+        try:
+            if mtime is None:
+                self._count_stat(self._index_stat_calls)
+                mtime = os.stat(directory).st_mtime
+        except OSError:
+            return False
+
+        if not self.index.directory_unchanged(directory, mtime):
+            return False
+
+        self.stats.unchanged_dirs += 1
+        for child in self.index.child_directories(directory):
+            try:
+                self._count_stat(self._index_stat_calls)
+                stat = os.stat(child)
+                subdirs.append((child, stat.st_mtime, directory, stat.st_ino))
+            except OSError:
+                # Sous-répertoire supprimé depuis le dernier passage
+                self.index.forget_directory(child)
+        return True
+
+    def _scan_directory(self, root_path, directory, subdirs, entries=None):
+        """
+        Liste un répertoire, remplit subdirs et produit ses fichiers éligibles.
+        entries: listage déjà fait par un worker du lister (liste de DirEntry ou erreur d'accès)
+        """
+        rel_path = os.path.relpath(directory, root_path)
+        if rel_path != ".":
+            self.log(f"📁 Scan: {rel_path}", "ANALYSIS")
+
+        listed = entries is not None
+        try:
+            if isinstance(entries, OSError):
+                raise entries
+            entries = nullcontext(entries) if listed else os.scandir(directory)
+        except OSError as e:
+            self.stats.errors += 1
+            self.log(f"❌ Erreur d'accès au dossier {rel_path}: {e}", "ERROR")
+            self._directory_failed(directory)
+            return
+        if not listed:
+            self._dirs_scanned.inc()
+
+        files_in_dir = 0
+        eligible_in_dir = 0
+        ignored_in_dir = 0
+        error_in_dir = 0
+
+        with entries as iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir():
+                        # Comme os.walk: les liens symboliques vers des dossiers ne sont pas suivis
+                        if entry.is_symlink() or entry.name == config.STATE_DIR_NAME:
+                            continue
+                        # Dossier exclu: élagué sans être parcouru
+                        reason = self.optimizer.rules.directory_reason(entry.path)
+                        if reason is not None:
+                            self.stats.ignored_dirs += 1
+                            self.log(f"🚫 Dossier ignoré: {entry.name} ({reason})", "WARNING")
+                        else:
+                            mtime = None
+                            if self.index is not None:
+                                self._count_stat(self._stat_calls, _DIRENTRY_STAT_IS_FREE)
+                                mtime = entry.stat().st_mtime
+                            inode = 0
+                            if self._inode_order:
+                                # DirEntry.inode() est lu dans le listage, sauf sous Windows
+                                self._count_stat(self._stat_calls, os.name != "nt")
+                                inode = entry.inode()
+                            subdirs.append((entry.path, mtime, directory, inode))
+                        continue
+
+                    files_in_dir += 1
+                    self.stats.files_found += 1
+                    self._files_scanned.inc()
+
+                    # Un seul stat par fichier (gratuit sous Windows, mis en cache par DirEntry;
+                    # déjà fait et mesuré par le worker si le répertoire a été listé en parallèle)
+                    start = time.perf_counter()
+                    self._count_stat(self._stat_calls, _DIRENTRY_STAT_IS_FREE)
+                    stat = entry.stat()
+                    if not listed:
+                        self._stat_seconds.observe(time.perf_counter() - start)
+                    record = FileRecord(entry.path, stat.st_size, stat.st_mtime,
+                                        os.path.splitext(entry.name)[1].lower(), stat.st_ino)
+
+                except OSError as e:
+                    error_in_dir += 1
+                    self.stats.errors += 1
+                    if error_in_dir == 1:
+                        self._directory_failed(directory)
+                    if error_in_dir <= 2:
+                        self.log(f"❌ Erreur d'accès: {entry.name} ({e})", "ERROR")
+                    continue
+
+                if not self.apply_file_rules:
+                    yield record
+                    continue
+
+                reason = self.optimizer.get_exclusion_reason(record.path, record.ext, record.size)
+                if reason is None:
+                    eligible_in_dir += 1
+                    self.stats.add_eligible(record)
+                    yield record
+                else:
+                    ignored_in_dir += 1
+                    self.stats.ignored_files += 1
+                    # Logger seulement quelques exemples pour éviter la surcharge
+                    if ignored_in_dir <= 3:
+                        self.log(f"⚠️ Fichier ignoré: {entry.name} ({reason})", "WARNING")
+
+        if ignored_in_dir > 3:
+            self.log(f"⚠️ ... et {ignored_in_dir - 3} autres fichiers ignorés", "WARNING")
+
+        if error_in_dir > 2:
+            self.log(f"⚠️ {error_in_dir} erreurs d'accès dans ce répertoire", "WARNING")
+
+        # Résumé pour ce répertoire
+        if files_in_dir and self.apply_file_rules:
+            dir_name = os.path.basename(directory) if rel_path != "." else "racine"
+            self.log(f"📊 {dir_name}: {eligible_in_dir}/{files_in_dir} fichiers éligibles", "ANALYSIS")
+
+    def _directory_failed(self, directory):
+        """Répertoire lu en partie seulement: à relire au prochain passage, même inchangé"""
+        if self.index is not None:
+            self.index.mark_directory_failed(directory)
+
+    def log_summary(self):
+        """Résumé final de l'analyse"""
+        self.log("✅ Analyse terminée:", "ANALYSIS")
+        self.log(f"   📁 Fichiers trouvés: {self.stats.files_found}", "ANALYSIS")
+        self.log(f"   ✅ Fichiers éligibles: {self.stats.eligible_files}", "ANALYSIS")
+        self.log(f"   ⚠️ Fichiers ignorés: {self.stats.ignored_files}", "ANALYSIS")
+        self.log(f"   🚫 Dossiers ignorés: {self.stats.ignored_dirs}", "ANALYSIS")
+        if self.stats.unchanged_dirs:
+            self.log(f"   ⏭️ Dossiers inchangés (index): {self.stats.unchanged_dirs}", "ANALYSIS")
+        self.log(f"   🧮 Appels stat: {self.stats.stat_calls}", "ANALYSIS")
+        if self.stats.errors:
+            self.log(f"   ❌ Erreurs d'accès: {self.stats.errors}", "ANALYSIS")
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Compression de plusieurs disques en un seul passage
+Les dossiers demandés sont regroupés par disque physique: chaque disque a son propre moteur
+(scan, pipeline, journal, index) et ses dossiers sont traités l'un après l'autre, pour que
+deux dossiers d'un même disque dur ne se disputent pas la tête de lecture. Les disques
+différents sont compressés en parallèle et partagent un budget de threads (CpuBudget).
+
+Le débit global et celui de chaque disque sont publiés pendant le passage et dans le résumé.
+"""
+
+import os
+import threading
+import time
+
+import config
+from compression_engine import CompressionEngine
+from concurrency_controller import CpuBudget
+from device_probe import physical_device
+
+# Clés additionnées dans le résumé global (mêmes clés que le résumé d'un pipeline)
+_SUMMARY_KEYS = ('discovered', 'processed', 'succeeded', 'failed', 'stage_errors', 'bytes_in', 'bytes_out')
+
+
+class DriveJob:
+    """Dossiers d'un même disque physique, compressés l'un après l'autre par un moteur dédié"""
+
+    def __init__(self, device, roots):
+        self.device = device
+        self.roots = list(roots)
+        self.engine = None
+        self.summary = dict.fromkeys(_SUMMARY_KEYS, 0)
+        self.error = None
+        self.started = None
+        self.finished = None
+
+        # Progression des dossiers déjà terminés + dossier en cours (événements du moteur)
+        self._done = dict.fromkeys(('total', 'processed', 'bytes_in'), 0)
+        self.total = 0
+        self.processed = 0
+        self.bytes_in = 0
+
+    def elapsed(self, now=None):
+        if self.started is None:
+            return 0.0
+        return (self.finished or now or time.time()) - self.started
+
+    def throughput_mbs(self, now=None):
+        """Débit moyen (MB de fichiers compressés par seconde) depuis le début du disque"""
+        elapsed = self.elapsed(now)
+        return self.bytes_in / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+
+class JobManager:
+    """Compresse plusieurs dossiers: un pipeline par disque physique, un budget de threads commun"""
+
+    def __init__(self, log_callback=None, event_callback=None, should_continue=None,
+                 backend_name=None, cpu_budget=None):
+        """
+        Mêmes rappels que CompressionEngine; les messages de chaque disque sont préfixés par son nom.
+        cpu_budget: threads de compression simultanés, tous disques confondus
+                    (config.JOB_CPU_BUDGET, ou le nombre de cœurs par défaut)
+        """
+        self.log = log_callback or (lambda message, level="INFO": None)
+        self.emit = event_callback or (lambda *event: None)
+        self.should_continue = should_continue or (lambda: True)
+        self.backend_name = backend_name
+        self.cpu_budget = CpuBudget(cpu_budget or config.JOB_CPU_BUDGET or os.cpu_count() or 1)
+
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def group_by_device(roots):
+        """Liste de DriveJob: un par disque physique, dans l'ordre des dossiers demandés"""
+        jobs = {}
+        for root in roots:
+            device = physical_device(root)
+            if device not in jobs:
+                jobs[device] = DriveJob(device, [])
+            jobs[device].roots.append(root)
+        return list(jobs.values())
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    def run(self, roots, compression_level):
+        """
+        Compresse tous les dossiers et bloque jusqu'à la fin (ou l'arrêt).
+        Retourne le résumé global (clés d'un résumé de pipeline, plus 'seconds', 'throughput_mbs'
+        et 'drives': résumé de chaque disque). Lève RuntimeError si le moteur est indisponible.
+        """
+        invalid = [root for root in roots if not os.path.exists(root)]
+        if invalid:
+            self.emit("error", f"Dossiers introuvables: {', '.join(invalid)}")
+            return None
+
+        self.jobs = self.group_by_device(roots)
+        for job in self.jobs:
+            job.engine = CompressionEngine(
+                lambda message, level="INFO", job=job: self.log(f"[{job.device}] {message}", level),
+                lambda event_type, *data, job=job: self._on_event(job, event_type, *data),
+                self.should_continue, backend_name=self.backend_name)
+            job.engine.cpu_budget = self.cpu_budget
+
+        self.log(f"🖴 {len(self.jobs)} disque(s) en parallèle, {self.cpu_budget.slots} threads de compression "
+                 "au total:", "INFO")
+        for job in self.jobs:
+            self.log(f"   🖴 {job.device}: {', '.join(job.roots)}", "INFO")
+        self.emit("status", f"Compression de {len(self.jobs)} disque(s) en cours...")
+
+        started = time.time()
+        threads = [threading.Thread(target=self._run_job, args=(job, compression_level),
+                                    name=f"disque-{job.device}", daemon=True) for job in self.jobs]
+        for thread in threads:
+            thread.start()
+
+        # Rapport périodique du débit global et par disque
+        last_report = time.time()
+        last_bytes = {job.device: 0 for job in self.jobs}
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+                if time.time() - last_report >= config.JOB_REPORT_INTERVAL:
+                    last_report = self._report_throughput(last_report, last_bytes)
+
+        summary = self._summarize(time.time() - started)
+        self._log_summary(summary)
+
+        if not self.should_continue():
+            self.emit("stopped", "Compression arrêtée par l'utilisateur")
+        elif any(job.error for job in self.jobs):
+            self.emit("error", "; ".join(f"{job.device}: {job.error}" for job in self.jobs if job.error))
+        else:
+            self.emit("complete", f"Compression terminée! {summary['processed']} fichiers traités "
+                                  f"sur {len(self.jobs)} disque(s)")
+        return summary
+
+    def _run_job(self, job, compression_level):
+        job.started = time.time()
+        try:
+            for root in job.roots:
+                if not self.should_continue():
+                    break
+                result = job.engine.compress(root, compression_level)
+                if result is None:
+                    job.error = job.error or f"échec de {root}"
+                    continue
+                with self._lock:
+                    for key in _SUMMARY_KEYS:
+                        job.summary[key] += result[key]
+                    job._done.update(total=job.total, processed=job.processed, bytes_in=job.bytes_in)
+        except Exception as e:
+            job.error = str(e)
+            self.log(f"[{job.device}] 💥 Erreur critique: {e}", "ERROR")
+        finally:
+            job.finished = time.time()
+
+    def _on_event(self, job, event_type, *data):
+        """Événements du moteur d'un disque: progression additionnée, messages préfixés"""
+        if event_type == "total":
+            with self._lock:
+                job.total = job._done['total'] + data[0]
+                total = sum(other.total for other in self.jobs)
+            self.emit("total", total)
+        elif event_type == "progress":
+            with self._lock:
+                job.processed = job._done['processed'] + data[0]
+                if len(data) > 2:
+                    job.bytes_in = job._done['bytes_in'] + data[2]
+                processed = sum(other.processed for other in self.jobs)
+                bytes_in = sum(other.bytes_in for other in self.jobs)
+            self.emit("progress", processed, f"[{job.device}] {data[1]}", bytes_in)
+        elif event_type in ("log", "error_log", "status", "time_estimate", "optimizations"):
+            self.emit(event_type, f"[{job.device}] {data[0]}")
+        elif event_type == "error":
+            # Fin d'un dossier: le gestionnaire publie lui-même la fin du passage
+            self.log(f"[{job.device}] ❌ {data[0]}", "ERROR")
+
+    # ------------------------------------------------------------------
+    # Débits
+    # ------------------------------------------------------------------
+
+    def _report_throughput(self, last_report, last_bytes):
+        """Débit de chaque disque depuis le rapport précédent; retourne l'instant du rapport"""
+        now = time.time()
+        elapsed = max(now - last_report, 1e-6)
+        parts = []
+        total_mb = 0.0
+        with self._lock:
+            for job in self.jobs:
+                mb = (job.bytes_in - last_bytes[job.device]) / (1024 * 1024)
+                last_bytes[job.device] = job.bytes_in
+                total_mb += mb
+                state = " (terminé)" if job.finished else ""
+                parts.append(f"{job.device}: {mb / elapsed:.1f} MB/s{state}")
+        self.log(f"📊 Débit global {total_mb / elapsed:.1f} MB/s, budget {self.cpu_budget.busy}/"
+                 f"{self.cpu_budget.slots} threads | {' | '.join(parts)}", "INFO")
+        return now
+
+    def _summarize(self, seconds):
+        summary = dict.fromkeys(_SUMMARY_KEYS, 0)
+        drives = {}
+        for job in self.jobs:
+            for key in _SUMMARY_KEYS:
+                summary[key] += job.summary[key]
+            drives[job.device] = dict(job.summary, roots=job.roots, seconds=job.elapsed(),
+                                      throughput_mbs=job.throughput_mbs(), error=job.error)
+        summary['seconds'] = seconds
+        summary['throughput_mbs'] = summary['bytes_in'] / (1024 * 1024) / seconds if seconds > 0 else 0.0
+        summary['drives'] = drives
+        return summary
+
+    def _log_summary(self, summary):
+        self.log("📊 Résumé par disque:", "INFO")
+        for device, drive in summary['drives'].items():
+            self.log(f"   🖴 {device}: {drive['processed']} fichiers, {drive['bytes_in'] / (1024 * 1024):.1f} MB "
+                     f"en {drive['seconds']:.1f} s ({drive['throughput_mbs']:.1f} MB/s)", "INFO")
+        self.log(f"   🌐 Total: {summary['processed']} fichiers, {summary['bytes_in'] / (1024 * 1024):.1f} MB "
+                 f"en {summary['seconds']:.1f} s ({summary['throughput_mbs']:.1f} MB/s)", "INFO")
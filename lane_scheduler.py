@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Ordonnanceur à voies selon la taille des fichiers
+- Voie des gros fichiers: peu de workers, chacun avec tous les threads de compression,
+  plus gros fichier en attente traité en premier (LPT: longest processing time first)
+  pour qu'un fichier énorme ne monopolise pas un worker à la toute fin du passage
+- Voie des petits fichiers: nombreux workers mono-thread, fichiers groupés par répertoire
+"""
+
+import heapq
+import itertools
+import queue
+from collections import namedtuple
+
+import config
+
+# Voie de compression: nombre de workers et threads par processus de compression
+Lane = namedtuple("Lane", ["name", "workers", "threads"])
+
+
+class LargeFileQueue(queue.Queue):
+    """
+    File à priorité sur la taille: get() retourne le plus gros fichier en attente.
+    Tout objet sans taille (marqueur de fin de flux) sort après les fichiers.
+    """
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._counter = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        size = getattr(item, "size", None)
+        key = -size if size is not None else float("inf")
+        heapq.heappush(self.queue, (key, next(self._counter), item))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+
+class LaneScheduler:
+    """Répartit les fichiers entre la voie des gros fichiers et celle des petits"""
+
+    def __init__(self, optimizer, small_workers, large_workers=None, threshold=None):
+        cpu_count = max(1, optimizer.cpu_count)
+        self.optimizer = optimizer
+        self.threshold = threshold or config.LARGE_FILE_THRESHOLD
+
+        large_workers = large_workers or config.LARGE_LANE_WORKERS or optimizer.get_large_lane_workers()
+        self.large = Lane("gros", large_workers, max(1, cpu_count // large_workers))
+        self.small = Lane("petits", max(1, small_workers), 1)
+
+        # File sans limite de taille: les gros fichiers doivent pouvoir s'accumuler pour être
+        # triés (leur nombre reste faible, chaque entrée représente au moins `threshold` octets)
+        self.large_queue = LargeFileQueue()
+
+    def is_large(self, record):
+        return record.size >= self.threshold
+
+    def order_small(self, records):
+        """Ordre d'une fenêtre de petits fichiers (un seul tri, voir order_small_records)"""
+        return self.optimizer.order_small_records(records)
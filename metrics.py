@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Métriques structurées du passage de compression
+Compteurs, jauges et histogrammes partagés par tous les étages (scan, compression,
+vérification, suppression), exportés périodiquement en JSON lines dans le dossier d'état
+du disque et, en option, au format texte Prometheus sur un port local.
+
+Les noms suivent les conventions Prometheus (suffixes _total, _seconds, _bytes).
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+# Appels stat du passage, par étage (scan, index, archive, dedup): chaque fichier n'est lu qu'une fois
+STAT_CALLS = "ultracompression_stat_calls_total"
+
+# Bornes (secondes) des histogrammes de latence: du stat (~µs) à la compression d'un gros fichier
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Counter:
+    """Valeur cumulée qui ne fait qu'augmenter"""
+
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Valeur instantanée, fixée par set() ou lue à l'export par une fonction"""
+
+    kind = "gauge"
+
+    def __init__(self, func=None):
+        self.value = 0
+        self._func = func
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        if self._func is not None:
+            try:
+                return self._func()
+            except Exception:
+                return None
+        return self.value
+
+
+class Histogram:
+    """Distribution d'une durée (ou d'une taille) par compteurs de seaux cumulables"""
+
+    kind = "histogram"
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Dernier seau: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Mesure la durée du bloc with"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, fraction, counts=None, count=None):
+        """Quantile approché: borne supérieure du seau qui le contient"""
+        counts = self.counts if counts is None else counts
+        count = self.count if count is None else count
+        if not count:
+            return 0.0
+        rank = fraction * count
+        cumulated = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulated += bucket_count
+            if cumulated >= rank:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0,
+            'p50': self.quantile(0.50, counts, count),
+            'p99': self.quantile(0.99, counts, count),
+            'buckets': counts,
+        }
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'un passage; une série par (nom, étiquettes)"""
+
+    def __init__(self):
+        self._metrics = {}   # (nom, étiquettes triées) -> métrique
+        self._help = {}      # nom -> (type, description)
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _get_or_create(self, factory, name, help_text, labels):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = factory()
+                self._help.setdefault(name, (metric.kind, help_text))
+            return metric
+
+    def counter(self, name, help_text="", labels=None):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=None, func=None):
+        """Jauge; avec func, la valeur est lue à chaque export (profondeur d'une file...)"""
+        return self._get_or_create(lambda: Gauge(func), name, help_text, labels)
+
+    def histogram(self, name, help_text="", labels=None, buckets=LATENCY_BUCKETS):
+        return self._get_or_create(lambda: Histogram(buckets), name, help_text, labels)
+
+    def snapshot(self):
+        """Valeurs courantes: {nom ou nom{étiquettes}: valeur}"""
+        with self._lock:
+            items = list(self._metrics.items())
+        return {name + _format_labels(labels): metric.snapshot() for (name, labels), metric in items}
+
+    def total(self, name):
+        """Somme d'un compteur sur toutes ses étiquettes"""
+        with self._lock:
+            counters = [metric for (metric_name, _), metric in self._metrics.items()
+                        if metric_name == name and metric.kind == "counter"]
+        return sum(counter.value for counter in counters)
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus (version 0.0.4)"""
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+            help_texts = dict(self._help)
+
+        lines = []
+        current_name = None
+        for (name, labels), metric in items:
+            if name != current_name:
+                current_name = name
+                kind, help_text = help_texts[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            value = metric.snapshot()
+            if metric.kind != "histogram":
+                if value is not None:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+
+            cumulated = 0
+            for bound, bucket_count in zip(metric.buckets + ("+Inf",), value['buckets']):
+                cumulated += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulated}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Écrit périodiquement un instantané des métriques (une ligne JSON) avec le débit des compteurs"""
+
+    def __init__(self, registry, path, interval=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval or config.METRICS_INTERVAL
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_values = {}
+        self._last_time = time.time()
+
+    @classmethod
+    def open(cls, registry, root_path, log_callback=None):
+        """Exporteur vers le dossier d'état du disque, ou None s'il est inaccessible"""
+        state_dir = os.path.join(root_path, config.STATE_DIR_NAME)
+        try:
+            os.makedirs(state_dir, exist_ok=True)
+            path = os.path.join(state_dir, config.METRICS_FILE)
+            with open(path, "a", encoding="utf-8"):
+                pass
+        except OSError as e:
+            if log_callback:
+                log_callback(f"⚠️ Export des métriques impossible: {e}", "WARNING")
+            return None
+        return cls(registry, path)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="export-metriques", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'export et écrit un dernier instantané"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.write_snapshot()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        now = time.time()
+        values = self.registry.snapshot()
+        elapsed = max(now - self._last_time, 1e-6)
+
+        # Débit par seconde des compteurs depuis le dernier instantané (fichiers/s, octets/s...)
+        rates = {}
+        for name, value in values.items():
+            if isinstance(value, (int, float)) and name in self._last_values:
+                rates[name] = (value - self._last_values[name]) / elapsed
+        self._last_values = {name: value for name, value in values.items()
+                             if isinstance(value, (int, float)) and "_total" in name}
+        self._last_time = now
+
+        line = json.dumps({
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'uptime_seconds': now - self.registry.started,
+            'metrics': values,
+            'rates': rates,
+        }, ensure_ascii=False)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass  # Les métriques ne doivent jamais interrompre la compression
+
+
+class PrometheusEndpoint:
+    """Sert /metrics au format texte Prometheus sur 127.0.0.1 (thread dédié)"""
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_ref.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Pas de log HTTP dans la console
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metriques-prometheus",
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
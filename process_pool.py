@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Processus 7z préchauffés pour la voie des petits fichiers
+7z ne sait pas écrire plusieurs archives depuis un même processus: chaque fichier garde son
+processus, mais celui-ci est lancé à l'avance par un thread dédié dès que le fichier entre
+dans la file de sa voie. Le processus attend sa source sur l'entrée standard (7z -si): quand
+un worker prend le fichier, le lancement et l'initialisation de 7z sont déjà faits et il ne
+reste qu'à envoyer les données.
+
+Taille du pool (processus prêts à l'avance): un par worker, plus ceux qui couvrent le démarrage
+de 7z (mesuré à l'ouverture du pool) pendant la durée mesurée d'une compression préchauffée,
+bornée par config.SEVEN_ZIP_WARM_MAX.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+# Poids des nouvelles mesures dans les moyennes glissantes des durées
+_SMOOTHING = 0.2
+
+
+class WarmProcessPool:
+    """Lance à l'avance les processus des fichiers annoncés et les remet aux workers"""
+
+    def __init__(self, spawn, discard, workers, cancelled, startup_seconds=0.0, metrics=None):
+        """
+        spawn: fonction(cmd) -> processus lancé, en attente sur son entrée standard
+        discard: fonction(processus, archive) qui arrête un processus inutilisé et supprime son archive
+        workers: workers qui consomment les processus (voie des petits fichiers)
+        cancelled: threading.Event de l'arrêt du moteur (plus aucun lancement)
+        startup_seconds: durée mesurée d'un processus 7z qui démarre et se termine sans rien faire
+        """
+        self._spawn = spawn
+        self._discard = discard
+        self.workers = max(1, workers)
+        self.cancelled = cancelled
+        self.startup_seconds = startup_seconds
+        self.size = min(config.SEVEN_ZIP_WARM_MAX, self.workers + 1)
+
+        self._condition = threading.Condition()
+        self._hints = OrderedDict()  # source -> (commande, archive), dans l'ordre de la file
+        self._warm = {}              # source -> (commande, archive, processus)
+        self._spawning = None
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.spawn_seconds = 0.0
+        self.service_seconds = 0.0
+
+        if metrics is not None:
+            self._results = {result: metrics.counter("ultracompression_7z_warm_total",
+                                                     "Fichiers compressés par un processus 7z préchauffé ou non",
+                                                     {"result": result})
+                             for result in ("hit", "miss")}
+            metrics.gauge("ultracompression_7z_warm_pool_size", "Processus 7z préchauffés visés",
+                          func=lambda: self.size)
+            metrics.gauge("ultracompression_7z_warm_ready", "Processus 7z préchauffés en attente",
+                          func=lambda: len(self._warm))
+        else:
+            self._results = None
+
+        self._thread = threading.Thread(target=self._run, name="prechauffage-7z", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Interface du moteur
+    # ------------------------------------------------------------------
+
+    def hint(self, source_path, cmd, archive_path):
+        """Annonce un fichier à venir et la commande qui le compressera"""
+        with self._condition:
+            if not self._closed:
+                self._hints[source_path] = (cmd, archive_path)
+                self._condition.notify_all()
+
+    def take(self, source_path, cmd):
+        """Processus préchauffé pour ce fichier (même commande), ou None s'il faut le lancer"""
+        with self._condition:
+            self._hints.pop(source_path, None)
+            while self._spawning == source_path:
+                self._condition.wait(timeout=0.1)
+            entry = self._warm.pop(source_path, None)
+            self._condition.notify_all()  # Une place se libère dans le pool
+
+        if entry is not None and entry[0] != cmd:
+            # Paramètres changés depuis l'annonce: ce processus écrirait une autre archive
+            self._discard(entry[2], entry[1])
+            entry = None
+        self._count("hit" if entry is not None else "miss")
+        return entry[2] if entry is not None else None
+
+    def observe(self, seconds):
+        """Durée d'une compression par un processus préchauffé: recalcule la taille du pool"""
+        with self._condition:
+            self.service_seconds = _smooth(self.service_seconds, seconds)
+            if self.service_seconds > 0:
+                startup = max(self.startup_seconds, self.spawn_seconds)
+                covered = math.ceil(self.workers * startup / self.service_seconds)
+                self.size = max(1, min(config.SEVEN_ZIP_WARM_MAX, self.workers + covered))
+            self._condition.notify_all()
+
+    def close(self):
+        """Arrête le préchauffage et les processus jamais utilisés; retourne les statistiques du pool"""
+        with self._condition:
+            self._closed = True
+            self._hints.clear()
+            self._condition.notify_all()
+        self._thread.join(timeout=1.0)
+
+        with self._condition:
+            unused = list(self._warm.values())
+            self._warm.clear()
+        for _, archive_path, process in unused:
+            self._discard(process, archive_path)
+        return self.stats()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'startup_seconds': self.startup_seconds,
+            'spawn_seconds': self.spawn_seconds,
+            'service_seconds': self.service_seconds,
+        }
+
+    def _count(self, result):
+        with self._condition:
+            if result == "hit":
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self._results is not None:
+            self._results[result].inc()
+
+    # ------------------------------------------------------------------
+    # Thread de préchauffage
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and not (self._hints and len(self._warm) < self.size):
+                    self._condition.wait(timeout=0.1)
+                if self._closed:
+                    return
+                source_path, (cmd, archive_path) = self._hints.popitem(last=False)
+                if self.cancelled.is_set():
+                    continue
+                self._spawning = source_path
+
+            process = None
+            start = time.perf_counter()
+            try:
+                process = self._spawn(cmd)
+            except OSError:
+                pass  # Le worker lancera 7z lui-même (et signalera l'erreur)
+            elapsed = time.perf_counter() - start
+
+            with self._condition:
+                self._spawning = None
+                closed = self._closed
+                if process is not None and not closed:
+                    self.spawn_seconds = _smooth(self.spawn_seconds, elapsed)
+                    self._warm[source_path] = (cmd, archive_path, process)
+                self._condition.notify_all()
+            if process is not None and closed:
+                self._discard(process, archive_path)
+
+
+def _smooth(average, value):
+    return value if average == 0 else average + _SMOOTHING * (value - average)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Canal de progression entre le moteur de compression et l'interface
+Les threads de travail ne produisent plus un message par fichier: la progression est
+agrégée dans un instantané (compteurs, octets, fichier en cours) et les logs vont dans
+des tampons circulaires. L'interface relève le tout une fois par rafraîchissement
+(drain) et l'applique en une seule insertion: son coût ne dépend plus du nombre de fichiers.
+
+Quand les logs arrivent plus vite que l'interface ne les affiche, les plus anciens sont
+écrits dans un fichier de débordement (aucune ligne n'est perdue) et comptés: l'interface
+indique combien de lignes n'ont pas été affichées et où les retrouver.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+
+import config
+
+# Relevé d'un rafraîchissement de l'interface
+# snapshot: dictionnaire de progression, ou None si rien n'a changé depuis le dernier relevé
+# logs: [(horodatage, niveau, message)] des logs détaillés; logs_dropped: logs non affichés
+# messages: [(horodatage, message, erreur)] du journal principal; messages_dropped: idem
+# events: événements de fin de passage ("complete", "stopped", "error"), jamais écrasés
+# overflow_path: fichier où les lignes non affichées ont été écrites (None s'il n'a pas pu l'être)
+ProgressUpdate = namedtuple(
+    "ProgressUpdate", ["snapshot", "logs", "logs_dropped", "messages", "messages_dropped", "events",
+                       "overflow_path"]
+)
+
+# Événements qui terminent le passage: transmis un par un à l'interface
+_FINAL_EVENTS = {"complete", "stopped", "error"}
+
+
+class ProgressChannel:
+    """Point de rencontre thread-safe entre le moteur (log_callback, event_callback) et l'interface (drain)"""
+
+    def __init__(self, log_capacity=None, message_capacity=None, overflow_path=None):
+        self._lock = threading.Lock()
+        self.overflow_path = overflow_path or os.path.join(tempfile.gettempdir(), config.UI_OVERFLOW_LOG_NAME)
+        self._overflow = None  # Ouvert à la première ligne non affichée
+        self._logs = deque(maxlen=log_capacity or config.UI_LOG_BUFFER_SIZE)
+        self._messages = deque(maxlen=message_capacity or config.UI_MESSAGE_BUFFER_SIZE)
+        self._logs_dropped = 0
+        self._messages_dropped = 0
+        self._overflow_failed = False
+        self._events = []
+        self._snapshot = {
+            'status': None,
+            'total': 0,
+            'processed': 0,
+            'bytes_in': 0,
+            'current_file': None,
+            'time_estimate': None,
+            'optimizations': None,
+        }
+        self._changed = False
+
+    def reset(self):
+        """Remet la progression à zéro avant un nouveau passage (les logs en attente sont conservés)"""
+        with self._lock:
+            self._snapshot.update(total=0, processed=0, bytes_in=0, current_file=None, time_estimate=None)
+            self._changed = True
+
+    # ------------------------------------------------------------------
+    # Côté moteur (threads de travail)
+    # ------------------------------------------------------------------
+
+    def log(self, message, level="INFO"):
+        """log_callback du moteur"""
+        entry = (time.time(), level, message)
+        with self._lock:
+            if len(self._logs) == self._logs.maxlen:
+                created, old_level, old_message = self._logs[0]
+                self._write_overflow(created, f"{old_level} {old_message}")
+                self._logs_dropped += 1
+            self._logs.append(entry)
+
+    def event(self, event_type, *data):
+        """event_callback du moteur: les événements de progression sont fusionnés dans l'instantané"""
+        with self._lock:
+            snapshot = self._snapshot
+            if event_type == "progress":
+                snapshot['processed'] = data[0]
+                snapshot['current_file'] = data[1]
+                if len(data) > 2:
+                    snapshot['bytes_in'] = data[2]
+            elif event_type == "total":
+                snapshot['total'] = data[0]
+            elif event_type in ("status", "time_estimate", "optimizations"):
+                snapshot[event_type] = data[0]
+            elif event_type in ("log", "error_log"):
+                if len(self._messages) == self._messages.maxlen:
+                    created, old_message, is_error = self._messages[0]
+                    self._write_overflow(created, f"{'ERREUR: ' if is_error else ''}{old_message}")
+                    self._messages_dropped += 1
+                self._messages.append((time.time(), data[0], event_type == "error_log"))
+                return
+            elif event_type in _FINAL_EVENTS:
+                self._events.append((event_type,) + data)
+                return
+            else:
+                return
+            self._changed = True
+
+    def close(self):
+        """Ferme le fichier de débordement (lignes non affichées écrites sur le disque)"""
+        with self._lock:
+            if self._overflow is not None:
+                self._overflow.close()
+                self._overflow = None
+
+    def _write_overflow(self, created, text):
+        """Écrit une ligne écartée du tampon dans le fichier de débordement (appelé sous le verrou)"""
+        if self._overflow_failed:
+            return  # Nouvel essai au prochain relevé
+        try:
+            if self._overflow is None:
+                self._overflow = open(self.overflow_path, "a", encoding="utf-8")
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+            self._overflow.write(f"[{timestamp}] {text}\n")
+        except OSError:
+            self._overflow_failed = True
+
+    # ------------------------------------------------------------------
+    # Côté interface (un relevé par rafraîchissement)
+    # ------------------------------------------------------------------
+
+    def drain(self):
+        """Relève tout ce qui est arrivé depuis le dernier appel (ProgressUpdate)"""
+        with self._lock:
+            if self._overflow is not None:
+                try:
+                    self._overflow.flush()
+                except OSError:
+                    self._overflow_failed = True
+            update = ProgressUpdate(
+                dict(self._snapshot) if self._changed else None,
+                list(self._logs), self._logs_dropped,
+                list(self._messages), self._messages_dropped,
+                self._events,
+                None if self._overflow_failed else self.overflow_path,
+            )
+            self._logs.clear()
+            self._messages.clear()
+            self._logs_dropped = self._messages_dropped = 0
+            self._overflow_failed = False
+            self._events = []
+            self._changed = False
+        return update
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Index persistant du scan (SQLite) stocké sur le disque cible
+Permet les passages incrémentaux: un répertoire dont la date de modification n'a pas changé
+depuis la fin du dernier passage complet n'est ni relu ni re-stat'é.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import config
+from exclusion_rules import load_patterns
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL,              -- NULL: répertoire à revérifier au prochain passage
+    failed INTEGER DEFAULT 0 -- 1: au moins un fichier en échec dans ce répertoire
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    inode INTEGER,
+    status TEXT              -- compressed, failed, skipped
+);
+"""
+
+
+def _rules_fingerprint(root_path=None):
+    """Empreinte des règles d'éligibilité: si elles changent, tous les répertoires sont relus"""
+    rules = (
+        sorted(config.IGNORE_EXTENSIONS),
+        sorted(config.SYSTEM_EXTENSIONS),
+        sorted(config.SYSTEM_FOLDERS),
+        load_patterns(root_path),
+        config.MIN_FILE_SIZE,
+        config.SOLID_BATCH_PREFIX,
+        config.DEDUP_MANIFEST_NAME,
+        config.ENTROPY_SAMPLING_ENABLED,
+        config.MIN_EXPECTED_GAIN,
+    )
+    return hashlib.sha1(repr(rules).encode("utf-8")).hexdigest()
+
+
+class ScanIndex:
+    """Index des répertoires et fichiers déjà traités sur un disque"""
+
+    def __init__(self, root_path):
+        self.root_path = root_path
+        state_dir = os.path.join(root_path, config.STATE_DIR_NAME)
+        os.makedirs(state_dir, exist_ok=True)
+        self.db_path = os.path.join(state_dir, config.SCAN_INDEX_FILE)
+
+        # Connexion partagée entre le scanner et le finaliseur (protégée par un verrou)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._last_commit = time.time()
+
+        self._check_rules()
+
+    @classmethod
+    def open(cls, root_path, log_callback=None):
+        """Ouvre l'index du disque, ou retourne None s'il est inaccessible (disque en lecture seule...)"""
+        try:
+            return cls(root_path)
+        except (OSError, sqlite3.Error) as e:
+            if log_callback:
+                log_callback(f"⚠️ Index de scan indisponible, scan complet: {e}", "WARNING")
+            return None
+
+    def _check_rules(self):
+        fingerprint = _rules_fingerprint(self.root_path)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if row is None or row[0] != fingerprint:
+            self._conn.execute("DELETE FROM dirs")
+            # Les fichiers écartés l'ont été selon les anciennes règles
+            self._conn.execute("DELETE FROM files WHERE status = 'skipped'")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rules', ?)", (fingerprint,))
+            self._conn.commit()
+
+    def _write(self, sql, params):
+        """Écriture groupée: commit toutes les N écritures ou toutes les quelques secondes"""
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._pending_writes += 1
+            now = time.time()
+            if (self._pending_writes >= config.SCAN_INDEX_COMMIT_EVERY
+                    or now - self._last_commit >= config.SCAN_INDEX_COMMIT_INTERVAL):
+                self._conn.commit()
+                self._pending_writes = 0
+                self._last_commit = now
+
+    # ------------------------------------------------------------------
+    # Répertoires (utilisé par le scanner)
+    # ------------------------------------------------------------------
+
+    def directory_unchanged(self, path, mtime):
+        """Vrai si le répertoire n'a pas changé depuis la fin du dernier passage complet"""
+        with self._lock:
+            row = self._conn.execute("SELECT mtime, failed FROM dirs WHERE path = ?", (path,)).fetchone()
+        return row is not None and row[0] == mtime and not row[1]
+
+    def child_directories(self, path):
+        """Sous-répertoires connus d'un répertoire inchangé"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM dirs WHERE parent = ?", (path,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record_directory(self, path, parent):
+        """Enregistre un répertoire relu pendant ce passage (à revérifier en fin de passage)"""
+        self._write("INSERT OR REPLACE INTO dirs (path, parent, mtime, failed) VALUES (?, ?, NULL, 0)",
+                    (path, parent))
+
+    def mark_directory_failed(self, path):
+        """Répertoire à relire au prochain passage (erreur de listage, fichier en échec)"""
+        self._write("UPDATE dirs SET failed = 1 WHERE path = ?", (path,))
+
+    def forget_directory(self, path):
+        """Oublie un répertoire disparu et toute son arborescence"""
+        prefix = os.path.join(path, "")
+        self._write("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, prefix, prefix + "\uffff"))
+
+    # ------------------------------------------------------------------
+    # Fichiers (utilisé par le pipeline)
+    # ------------------------------------------------------------------
+
+    def filter_record(self, record):
+        """Filtre du pipeline: ignore les fichiers inchangés déjà écartés lors d'un passage précédent"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, inode, status FROM files WHERE path = ?", (record.path,)).fetchone()
+        if row is not None and row[3] == "skipped" and row[:3] == (record.size, record.mtime, record.inode):
+            return "inchangé depuis le dernier passage"
+        return None
+
+    def record_file(self, record, status):
+        """Enregistre le statut de compression d'un fichier"""
+        self._write("INSERT OR REPLACE INTO files (path, size, mtime, inode, status) VALUES (?, ?, ?, ?, ?)",
+                    (record.path, record.size, record.mtime, record.inode, status))
+
+    def record_result(self, result, success):
+        """Écouteur du finaliseur: statut du fichier, répertoire à relire en cas d'échec"""
+        self.record_file(result.record, "compressed" if success else "failed")
+        if not success:
+            self.mark_directory_failed(os.path.dirname(result.record.path))
+
+    # ------------------------------------------------------------------
+    # Fin de passage
+    # ------------------------------------------------------------------
+
+    def finish_run(self, completed):
+        """
+        Termine le passage. S'il est allé au bout, les répertoires relus reçoivent leur date
+        de modification actuelle (après compression) et seront ignorés au prochain passage.
+        Un passage interrompu les laisse à revérifier.
+        """
+        with self._lock:
+            if completed:
+                rows = self._conn.execute("SELECT path FROM dirs WHERE mtime IS NULL AND failed = 0").fetchall()
+                updates = []
+                for (path,) in rows:
+                    try:
+                        updates.append((os.stat(path).st_mtime, path))
+                    except OSError:
+                        continue
+                self._conn.executemany("UPDATE dirs SET mtime = ? WHERE path = ?", updates)
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Lots d'archives solides pour les petits fichiers
+Les petits fichiers d'un même répertoire sont regroupés dans une seule archive solide
+(un seul processus 7z, un seul en-tête d'archive) accompagnée d'un manifeste JSON
+qui permet de restaurer chaque fichier individuellement.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import config
+
+# Lot de petits fichiers d'un même répertoire
+SolidBatch = namedtuple("SolidBatch", ["directory", "records"])
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Noms d'archives déjà attribués (plusieurs lots d'un même répertoire peuvent être compressés en parallèle)
+_reserved_paths = set()
+_reserved_lock = threading.Lock()
+
+
+def split_into_batches(records):
+    """
+    Découpe une liste de FileRecord déjà groupée par répertoire
+    (order_small_records) en lots solides et fichiers individuels.
+    Retourne une liste d'éléments FileRecord ou SolidBatch, dans le même ordre.
+    """
+    items = []
+    current_dir = None
+    current = []
+    current_bytes = 0
+
+    def flush():
+        if len(current) == 1:
+            items.append(current[0])  # Un lot d'un seul fichier n'apporte rien
+        elif current:
+            items.append(SolidBatch(current_dir, list(current)))
+
+    for record in records:
+        if record.size >= config.SOLID_BATCH_THRESHOLD:
+            items.append(record)
+            continue
+
+        directory = os.path.dirname(record.path)
+        if (directory != current_dir
+                or len(current) >= config.SOLID_BATCH_MAX_FILES
+                or current_bytes + record.size > config.SOLID_BATCH_MAX_BYTES):
+            flush()
+            current_dir = directory
+            current = []
+            current_bytes = 0
+
+        current.append(record)
+        current_bytes += record.size
+
+    flush()
+    return items
+
+
+def _new_archive_path(directory, extension):
+    """Trouve un nom d'archive de lot libre dans le répertoire"""
+    index = 1
+    with _reserved_lock:
+        while True:
+            archive_path = os.path.join(directory, f"{config.SOLID_BATCH_PREFIX}{index:04d}{extension}")
+            if (archive_path not in _reserved_paths
+                    and not os.path.exists(archive_path)
+                    and not os.path.exists(archive_path + MANIFEST_SUFFIX)):
+                _reserved_paths.add(archive_path)
+                return archive_path
+            index += 1
+
+
+def write_solid_batch(backend, batch, compression_level, journal=None, threads=None):
+    """
+    Compresse un lot dans une archive solide et écrit son manifeste.
+    Avec un journal, l'archive est écrite sous un nom temporaire puis renommée.
+    threads: threads par processus de compression (contrôleur de concurrence), si applicable.
+    Retourne (succès, chemin de l'archive, taille compressée, message d'erreur)
+    """
+    archive_path = _new_archive_path(batch.directory, backend.batch_extension)
+    names = [os.path.basename(record.path) for record in batch.records]
+    sizes = [record.size for record in batch.records]
+    target_path = journal.partial_path(archive_path) if journal is not None else archive_path
+
+    success, compressed_size, error = backend.compress_batch(
+        batch.directory, names, target_path, compression_level, threads, sizes)
+    if not success:
+        return False, archive_path, 0, error
+
+    manifest = {
+        "archive": os.path.basename(archive_path),
+        "backend": backend.name,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": [
+            {"name": name, "size": record.size, "mtime": record.mtime}
+            for name, record in zip(names, batch.records)
+        ],
+    }
+    try:
+        with open(archive_path + MANIFEST_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+    except OSError as e:
+        # Sans manifeste, on ne supprime pas les originaux
+        try:
+            os.remove(target_path)
+        except OSError:
+            pass
+        return False, archive_path, 0, f"Erreur écriture du manifeste: {e}"
+
+    if journal is not None:
+        journal.commit_archive(target_path, archive_path)
+
+    return True, archive_path, compressed_size, ""
+
+
+def restore_from_batch(backend, manifest_path, file_name, output_dir=None):
+    """Restaure un fichier d'un lot à partir de son manifeste"""
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if not any(entry["name"] == file_name for entry in manifest["files"]):
+        raise KeyError(f"{file_name} absent du lot {manifest['archive']}")
+
+    directory = os.path.dirname(manifest_path)
+    archive_path = os.path.join(directory, manifest["archive"])
+    return backend.extract_member(archive_path, file_name, output_dir or directory)
@@ -68,6 +68,28 @@ def test_file_structure():
     required_files = [
         "ultra_compression.py",
         "compression_optimizer.py",
+        "file_scanner.py",
+        "directory_lister.py",
+        "exclusion_rules.py",
+        "compression_pipeline.py",
+        "compression_backends.py",
+        "process_pool.py",
+        "solid_batches.py",
+        "scan_index.py",
+        "compression_journal.py",
+        "concurrency_controller.py",
+        "lane_scheduler.py",
+        "entropy_sampler.py",
+        "deduplication.py",
+        "compression_engine.py",
+        "job_manager.py",
+        "ultracompression_cli.py",
+        "benchmark.py",
+        "metrics.py",
+        "throughput_model.py",
+        "device_probe.py",
+        "progress_channel.py",
+        "file_plan.py",
         "config.py",
         "requirements.txt"
     ]
@@ -92,6 +114,9 @@ def test_imports():
         import config
         print("✅ config")
         
+        from compression_engine import CompressionEngine
+        print("✅ CompressionEngine")
+        
         # Test de base de l'optimiseur
         optimizer = CompressionOptimizer()
         print(f"✅ Optimiseur initialisé (CPU: {optimizer.cpu_count}, Disque: {optimizer.disk_type})")
@@ -121,6 +146,968 @@ def test_gui_basic():
         print(f"❌ Erreur interface graphique: {e}")
         return False
 
+def _write_file(path, size, fill=b"ultra compression "):
+    """Crée un fichier compressible de la taille demandée (et ses dossiers)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write((fill * (size // len(fill) + 1))[:size])
+
+def _make_tree(root):
+    """Arborescence de test: 6 fichiers éligibles répartis en 3 dossiers, 2 fichiers écartés"""
+    for rel_path, size in [("a/un.txt", 4000), ("a/deux.txt", 5000), ("a/b/trois.csv", 3000),
+                           ("a/b/quatre.txt", 6000), ("c/cinq.json", 2500), ("c/six.txt", 7000),
+                           ("c/petit.txt", 100), ("c/journal.log", 4000)]:
+        _write_file(os.path.join(root, *rel_path.split("/")), size)
+
+def _scan_paths(root, **scanner_options):
+    from compression_optimizer import CompressionOptimizer
+    from exclusion_rules import ExclusionRules
+    from file_scanner import FileScanner
+
+    optimizer = CompressionOptimizer()
+    optimizer.rules = ExclusionRules.for_root(root)
+    scanner = FileScanner(optimizer, **scanner_options)
+    return [record.path for record in scanner.scan(root)], scanner.stats
+
+def test_scanner_counts():
+    """Le scanner compte fichiers trouvés, éligibles et écartés, et l'histogramme des types"""
+    import tempfile
+    print("Test des compteurs du scanner...")
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        paths, stats = _scan_paths(root, workers=1)
+
+        assert len(paths) == 6
+        assert (stats.files_found, stats.eligible_files, stats.ignored_files) == (8, 6, 2)
+        assert stats.total_size == 4000 + 5000 + 3000 + 6000 + 2500 + 7000
+        assert stats.file_types == {".txt": 4, ".csv": 1, ".json": 1}
+        assert stats.top_file_types(1) == [(".txt", 4)]
+    print("✅ Compteurs et histogramme des types")
+    return True
+
+def test_parallel_scan_order():
+    """Le listage parallèle en ordre déterministe produit exactement l'ordre séquentiel"""
+    import tempfile
+    print("Test du listage parallèle des répertoires...")
+    with tempfile.TemporaryDirectory() as root:
+        for index in range(40):
+            _write_file(os.path.join(root, f"d{index % 5}", f"s{index % 3}", f"f{index}.txt"), 2000)
+        sequential, _ = _scan_paths(root, workers=1)
+        deterministic, _ = _scan_paths(root, workers=4, deterministic=True)
+        unordered, stats = _scan_paths(root, workers=4, deterministic=False)
+
+        assert len(sequential) == 40
+        assert deterministic == sequential
+        assert sorted(unordered) == sorted(sequential)
+        assert stats.eligible_files == 40
+    print("✅ Ordre déterministe identique au parcours séquentiel")
+    return True
+
+def test_exclusion_rules():
+    """Motifs de type .gitignore, dossiers système et élagage des dossiers exclus"""
+    import tempfile
+    from exclusion_rules import ExclusionRules
+    print("Test des règles d'exclusion...")
+    with tempfile.TemporaryDirectory() as root:
+        rules = ExclusionRules(root, system_folders={"Windows", "Users\\Default"},
+                               patterns=["*.bak", "node_modules/", "/Archives/**", "!garder.bak"])
+        path = lambda rel_path: os.path.join(root, *rel_path.split("/"))
+
+        assert rules.file_reason(path("x.bak")) is not None
+        assert rules.file_reason(path("s/garder.bak")) is None           # Négation plus récente
+        assert rules.directory_reason(path("s/node_modules")) is not None
+        assert rules.file_reason(path("s/node_modules")) is None         # Motif réservé aux dossiers
+        assert rules.file_reason(path("Archives/a/b.txt")) is not None
+        assert rules.file_reason(path("s/Archives/b.txt")) is None       # Motif ancré à la racine
+        assert rules.directory_reason(path("Windows")) is not None
+        assert rules.directory_reason(path("MyWindowsBackups")) is None
+        assert rules.directory_reason(path("Users/Default/x")) is not None
+        assert rules.directory_reason(path("Users")) is None
+
+        # Un dossier exclu est élagué: son contenu n'est jamais listé
+        _make_tree(root)
+        _write_file(path("a/node_modules/module.txt"), 3000)
+        with open(path(".ultracompressionignore"), "w", encoding="utf-8") as f:
+            f.write("node_modules/\n")
+        paths, stats = _scan_paths(root, workers=1)
+        assert stats.ignored_dirs == 1
+        assert not any("node_modules" in p for p in paths)
+    print("✅ Sémantique .gitignore et élagage")
+    return True
+
+def test_pipeline_and_solid_batches():
+    """Passage complet avec xz: fin du pipeline, originaux remplacés, lots solides restaurables"""
+    import tempfile
+    import threading
+    import config
+    from compression_engine import CompressionEngine
+    from solid_batches import MANIFEST_SUFFIX, restore_from_batch
+    print("Test du pipeline complet et des lots solides...")
+    saved = config.SOLID_BATCH_ENABLED
+    config.SOLID_BATCH_ENABLED = True
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root)
+            engine = CompressionEngine(backend_name="xz")
+            summaries = []
+            runner = threading.Thread(target=lambda: summaries.append(engine.compress(root, 5)), daemon=True)
+            runner.start()
+            runner.join(timeout=60)
+            assert not runner.is_alive(), "le pipeline ne s'est pas arrêté"
+
+            summary = summaries[0]
+            assert summary["discovered"] == summary["processed"] == summary["succeeded"] == 6
+            assert (summary["failed"], summary["stage_errors"]) == (0, 0)
+            assert not any(thread.name.startswith(("compression-", "finalisation-", "scan-"))
+                           for thread in threading.enumerate())
+
+            # Originaux éligibles supprimés, fichiers écartés conservés
+            assert not os.path.exists(os.path.join(root, "a", "un.txt"))
+            assert os.path.exists(os.path.join(root, "c", "petit.txt"))
+
+            manifests = [os.path.join(directory, name) for directory, _, names in os.walk(root)
+                         for name in names if name.endswith(MANIFEST_SUFFIX)]
+            assert len(manifests) == 3
+            output = tempfile.mkdtemp(dir=root)
+            restored = restore_from_batch(engine.backend, os.path.join(root, "a", [
+                name for name in os.listdir(os.path.join(root, "a")) if name.endswith(MANIFEST_SUFFIX)][0]),
+                "deux.txt", output)
+            with open(restored, "rb") as f:
+                assert f.read() == (b"ultra compression " * 300)[:5000]
+            assert not os.listdir(os.path.join(root, config.STATE_DIR_NAME, config.JOURNAL_PARTIAL_DIR))
+    finally:
+        config.SOLID_BATCH_ENABLED = saved
+    print("✅ Pipeline terminé, lots et manifestes restaurables")
+    return True
+
+def test_scan_index():
+    """Répertoires inchangés ignorés après un passage complet, relus si les règles changent"""
+    import tempfile
+    import config
+    from scan_index import ScanIndex
+    print("Test de l'index de scan...")
+    saved = list(config.EXCLUDE_PATTERNS)
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root)
+
+            def scan_pass(completed=True):
+                # Un index par passage, comme le moteur (finish_run ferme la base)
+                index = ScanIndex(root)
+                paths, stats = _scan_paths(root, workers=1, index=index)
+                index.finish_run(completed=completed)
+                return sorted(os.path.basename(p) for p in paths), stats
+
+            assert len(scan_pass(completed=False)[0]) == 6
+            assert len(scan_pass()[0]) == 6              # Passage interrompu: tout est relu
+
+            paths, stats = scan_pass()
+            assert paths == [] and stats.files_found == 0 and stats.unchanged_dirs >= 1
+
+            _write_file(os.path.join(root, "c", "nouveau.txt"), 3000)
+            assert scan_pass()[0] == ["cinq.json", "nouveau.txt", "six.txt"]
+
+            config.EXCLUDE_PATTERNS = ["*.json"]         # Règles changées: index des répertoires vidé
+            paths, _ = scan_pass()
+            assert len(paths) == 6 and "cinq.json" not in paths
+    finally:
+        config.EXCLUDE_PATTERNS = saved
+    print("✅ Saut des répertoires inchangés et invalidation par les règles")
+    return True
+
+def test_journal_recovery():
+    """La reprise supprime les archives partielles et termine les suppressions vérifiées"""
+    import tempfile
+    from compression_journal import CompressionJournal
+    from file_scanner import FileRecord
+    print("Test de la reprise du journal...")
+    with tempfile.TemporaryDirectory() as root:
+        journal = CompressionJournal(root)
+        journal.recover()
+        done, pending = os.path.join(root, "fait.txt"), os.path.join(root, "en_cours.txt")
+        for path in (done, pending):
+            _write_file(path, 2000)
+        _write_file(done + ".xz", 100)
+        partial = journal.partial_path(pending + ".xz")
+        _write_file(partial, 50)
+
+        journal.compressing(FileRecord(pending, 2000, 0, ".txt"))
+        journal.verified(FileRecord(done, 2000, 0, ".txt"), done + ".xz")
+        journal.flush()  # Plantage: le journal n'est jamais fermé
+
+        stats = CompressionJournal(root).recover()
+        assert stats == {'partials_removed': 1, 'deletions_resumed': 1, 'interrupted': 1, 'completed': 1}
+        assert not os.path.exists(done) and os.path.exists(done + ".xz")
+        assert os.path.exists(pending) and not os.path.exists(partial)
+    print("✅ Archives partielles supprimées, suppressions reprises")
+    return True
+
+def test_crc_mismatch():
+    """Une archive qui ne correspond pas à sa source est rejetée et supprimée"""
+    import tempfile
+    import config
+    from compression_backends import ArchiveVerificationError, LzmaBackend, _Crc32
+    print("Test du rejet des archives incorrectes...")
+    saved = config.VERIFY_MODE
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "source.txt")
+            _write_file(source, 20000)
+            backend = LzmaBackend()
+            for mode in ("crc", "full"):
+                config.VERIFY_MODE = mode
+                success, _, error = backend.compress(source, source + ".xz", 5)
+                assert success, error
+                wrong = _Crc32()
+                wrong.update(b"autre contenu")
+                for checksum, size in ((wrong, 20000), (_Crc32(), 19999)):
+                    try:
+                        backend.verify(source + ".xz", checksum, size)
+                        assert False, f"archive acceptée en mode {mode}"
+                    except ArchiveVerificationError:
+                        pass
+
+            # Lot solide: un membre différent de sa source fait échouer la vérification
+            config.VERIFY_MODE = "crc"
+            names = ["un.txt", "deux.txt"]
+            for name in names:
+                _write_file(os.path.join(root, name), 3000)
+            archive = os.path.join(root, "lot.tar.xz")
+            success, _, error = backend.compress_batch(root, names, archive, 5)
+            assert success, error
+            try:
+                backend.verify_batch(archive, [("un.txt", 3000, 0), ("deux.txt", 3000, 0)])
+                assert False, "lot accepté avec des CRC différents"
+            except ArchiveVerificationError:
+                pass
+
+            # Taille différente de celle relevée par le scanner: lot rejeté et supprimé
+            success, _, error = backend.compress_batch(root, names, archive + "3", 5, sizes=[3000, 3000])
+            assert success, error
+            success, _, _ = backend.compress_batch(root, names, archive + "4", 5, sizes=[3000, 2999])
+            assert not success and not os.path.exists(archive + "4")
+
+            # Archive illisible: compress échoue et ne laisse rien à côté de la source
+            os.remove(os.path.join(root, "deux.txt"))
+            success, _, _ = backend.compress_batch(root, names, archive + "2", 5)
+            assert not success and not os.path.exists(archive + "2")
+    finally:
+        config.VERIFY_MODE = saved
+    print("✅ Sommes de contrôle différentes rejetées")
+    return True
+
+def test_warm_process_pool():
+    """Processus préchauffés: remis au worker du fichier annoncé, arrêtés s'ils ne servent pas"""
+    import threading
+    import time
+    from process_pool import WarmProcessPool
+    print("Test des processus 7z préchauffés...")
+    spawned, discarded = [], []
+    pool = WarmProcessPool(lambda cmd: spawned.append(cmd) or ("processus", cmd),
+                           lambda process, archive: discarded.append(archive),
+                           workers=2, cancelled=threading.Event(), startup_seconds=0.01)
+    try:
+        pool.hint("a.txt", ["7z", "a"], "a.7z")
+        deadline = time.time() + 5
+        while not spawned and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.take("a.txt", ["7z", "a"]) == ("processus", ["7z", "a"])   # Préchauffé
+        assert pool.take("b.txt", ["7z", "b"]) is None                          # Jamais annoncé
+
+        # Commande changée depuis l'annonce: le processus préparé écrirait une autre archive
+        pool.hint("c.txt", ["7z", "c"], "c.7z")
+        while len(spawned) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.take("c.txt", ["7z", "c", "-mmt=2"]) is None
+        assert discarded == ["c.7z"]
+
+        # Taille: un processus par worker + ceux qui couvrent le démarrage (2 × 10 ms / 1 ms)
+        pool.observe(0.001)
+        assert pool.size == 2 + 20
+
+        pool.hint("d.txt", ["7z", "d"], "d.7z")
+        while len(spawned) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        stats = pool.close()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert discarded == ["c.7z", "d.7z"]                # Processus inutilisé arrêté à la fermeture
+    print("✅ Processus remis, remplacés ou arrêtés, taille mesurée")
+    return True
+
+def test_solid_batches_by_default_for_7z():
+    """Sans réglage, les petits fichiers sont compressés par lots avec 7z (un processus par lot)"""
+    import config
+    from compression_backends import SevenZipBackend
+    from compression_engine import CompressionEngine
+    print("Test des lots solides par défaut avec 7z...")
+    saved = config.SOLID_BATCH_ENABLED
+    try:
+        engine = CompressionEngine(backend_name="xz")
+        config.SOLID_BATCH_ENABLED = None
+        assert not engine.solid_batches_enabled()        # Moteur intégré: aucun processus par fichier
+        engine.backend = SevenZipBackend(engine.optimizer, "7z")
+        assert engine.solid_batches_enabled()
+        config.SOLID_BATCH_ENABLED = False
+        assert not engine.solid_batches_enabled()
+    finally:
+        config.SOLID_BATCH_ENABLED = saved
+    print("✅ Lots @listfile activés automatiquement pour 7z")
+    return True
+
+def _run_engine(root, backend_name="xz", **engine_options):
+    """Passage complet du moteur dans un thread (borné à 60 s); retourne (moteur, résumé)"""
+    import threading
+    from compression_engine import CompressionEngine
+    engine = CompressionEngine(backend_name=backend_name, **engine_options)
+    summaries = []
+    runner = threading.Thread(target=lambda: summaries.append(engine.compress(root, 5)), daemon=True)
+    runner.start()
+    runner.join(timeout=60)
+    assert not runner.is_alive(), "le pipeline ne s'est pas arrêté"
+    return engine, summaries[0]
+
+def test_deduplication():
+    """Doublons remplacés par des références; en cas d'erreur, chaque fichier compressé une seule fois"""
+    import json
+    import tempfile
+    import config
+    from deduplication import Deduplicator
+    print("Test de la déduplication...")
+    saved = config.DEDUP_ENABLED, Deduplicator.deduplicate
+    config.DEDUP_ENABLED = True
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root)
+            _write_file(os.path.join(root, "c", "copie.txt"), 4000)  # Même contenu que a/un.txt
+            _, summary = _run_engine(root)
+            assert summary["discovered"] == summary["processed"] == summary["succeeded"] == 7
+            with open(os.path.join(root, "c", config.DEDUP_MANIFEST_NAME), encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f]
+            assert [(entry["name"], entry["member"]) for entry in entries] == [("copie.txt", "un.txt")]
+            assert not os.path.exists(os.path.join(root, "c", "copie.txt"))
+
+        # Recherche en erreur: tous les fichiers sont compressés, aucun deux fois
+        def failing(self, plan):
+            self._duplicates["inconnu"] = []
+            raise OSError("disque indisponible")
+        Deduplicator.deduplicate = failing
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root)
+            _write_file(os.path.join(root, "c", "copie.txt"), 4000)
+            engine, summary = _run_engine(root)
+            assert summary["discovered"] == summary["processed"] == summary["succeeded"] == 7
+            assert summary["stage_errors"] == 0
+            assert not os.path.exists(os.path.join(root, "c", config.DEDUP_MANIFEST_NAME))
+    finally:
+        config.DEDUP_ENABLED, Deduplicator.deduplicate = saved
+    print("✅ Doublons référencés, repli sans double compression")
+    return True
+
+def test_scan_index_failed_directories():
+    """Un répertoire illisible, ou dont un fichier n'a pas pu être lu, est relu au passage suivant"""
+    import tempfile
+    from contextlib import contextmanager
+    from scan_index import ScanIndex
+    print("Test des répertoires en erreur dans l'index de scan...")
+    real_scandir = os.scandir
+    failing = {}
+
+    class FailingEntry:
+        def __init__(self, entry):
+            self._entry = entry
+            self.name, self.path = entry.name, entry.path
+
+        def __getattr__(self, name):
+            return getattr(self._entry, name)
+
+        def stat(self, **kwargs):
+            if self.name in failing.get("stat", ()):
+                raise PermissionError(13, "accès refusé", self.path)
+            return self._entry.stat(**kwargs)
+
+    @contextmanager
+    def listing(directory):
+        with real_scandir(directory) as entries:
+            yield [FailingEntry(entry) for entry in entries]
+
+    def scandir(directory):
+        if os.path.basename(directory) in failing.get("scandir", ()):
+            raise PermissionError(13, "accès refusé", directory)
+        return listing(directory)
+
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+
+        def scan_pass(**failures):
+            failing.clear()
+            failing.update(failures)
+            index = ScanIndex(root)
+            paths, stats = _scan_paths(root, workers=1, index=index)
+            index.finish_run(completed=True)
+            return sorted(os.path.basename(p) for p in paths), stats
+
+        os.scandir = scandir
+        try:
+            paths, stats = scan_pass(scandir={"b"})
+            assert stats.errors == 1 and "trois.csv" not in paths
+            assert scan_pass()[0] == ["quatre.txt", "trois.csv"]   # Seul le dossier illisible est relu
+            assert scan_pass()[0] == []
+
+            _write_file(os.path.join(root, "c", "nouveau.txt"), 3000)
+            paths, stats = scan_pass(stat={"six.txt"})
+            assert stats.errors == 1 and paths == ["cinq.json", "nouveau.txt"]
+            assert scan_pass()[0] == ["cinq.json", "nouveau.txt", "six.txt"]
+        finally:
+            os.scandir = real_scandir
+    print("✅ Répertoires en erreur relus au passage suivant")
+    return True
+
+def test_adaptive_concurrency():
+    """Contrôleur adaptatif: file d'attente du seul disque cible, montée de gradient bornée"""
+    import tempfile
+    import concurrency_controller
+    from concurrency_controller import AdaptiveConcurrencyController, _read_disk_queue_time
+    print("Test du contrôleur de concurrence adaptatif...")
+    saved = concurrency_controller._DISKSTATS
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            concurrency_controller._DISKSTATS = os.path.join(root, "diskstats")
+            with open(concurrency_controller._DISKSTATS, "w") as f:
+                f.write("   8       0 sda 1 0 0 0 0 0 0 0 0 0 500 0 0 0 0 0 0\n"
+                        "   8       1 sda1 1 0 0 0 0 0 0 0 0 0 400 0 0 0 0 0 0\n"
+                        "   8      16 sdb 1 0 0 0 0 0 0 0 0 0 900 0 0 0 0 0 0\n")
+            # Ni les partitions (comptées en double) ni les autres disques
+            assert _read_disk_queue_time("sda") == 500
+            assert _read_disk_queue_time("sdc") is None and _read_disk_queue_time(None) is None
+    finally:
+        concurrency_controller._DISKSTATS = saved
+
+    controller = AdaptiveConcurrencyController(8, 2, 4)
+    assert controller.threads_per_process() == 4
+    controller._adjust(10.0, 20, None)                  # Première mesure: un worker de plus
+    controller._adjust(20.0, 20, None)                  # Débit amélioré: on continue
+    assert controller.active_workers == 4 and controller.threads_per_process() == 2
+    controller._adjust(30.0, 20, None)                  # Borné par max_workers
+    assert controller.active_workers == 4
+    controller._adjust(30.0, 95, None)                  # CPU saturé: un worker de moins
+    assert controller.active_workers == 3
+    controller._adjust(30.0, 20, 10.0)                  # Disque saturé: un de moins
+    assert controller.active_workers == 2
+    controller._adjust(30.5, 20, None)                  # Plateau: inchangé
+    assert controller.active_workers == 2
+    print("✅ File d'attente du disque cible et ajustements bornés")
+    return True
+
+def test_progress_channel():
+    """Progression agrégée en un instantané; aucune ligne de log perdue quand le tampon déborde"""
+    import tempfile
+    from progress_channel import ProgressChannel
+    print("Test du canal de progression...")
+    with tempfile.TemporaryDirectory() as root:
+        overflow = os.path.join(root, "debordement.log")
+        channel = ProgressChannel(log_capacity=3, message_capacity=2, overflow_path=overflow)
+        channel.event("total", 10)
+        for index in range(5):
+            channel.event("progress", index + 1, f"f{index}.txt", (index + 1) * 100)
+            channel.log(f"ligne {index}", "INFO")
+        channel.event("log", "message 1")
+        channel.event("error_log", "message 2")
+        channel.event("log", "message 3")
+        channel.event("complete", "Terminé")
+
+        update = channel.drain()
+        assert update.snapshot["total"] == 10 and update.snapshot["processed"] == 5
+        assert (update.snapshot["current_file"], update.snapshot["bytes_in"]) == ("f4.txt", 500)
+        assert [entry[2] for entry in update.logs] == ["ligne 2", "ligne 3", "ligne 4"]
+        assert update.logs_dropped == 2 and update.messages_dropped == 1
+        assert update.events == [("complete", "Terminé")] and update.overflow_path == overflow
+        with open(overflow, encoding="utf-8") as f:
+            spilled = f.read()
+        assert "INFO ligne 0" in spilled and "INFO ligne 1" in spilled and "message 1" in spilled
+
+        # Rien de nouveau: ni instantané ni lignes
+        update = channel.drain()
+        assert update.snapshot is None and not update.logs and not update.events and not update.logs_dropped
+        channel.close()
+    print("✅ Instantané fusionné, débordement écrit dans un fichier")
+    return True
+
+def test_benchmark_report():
+    """Rapport du benchmark: phases, et compression, vérification et suppression séparées"""
+    import tempfile
+    import config
+    import benchmark
+    print("Test du rapport de benchmark...")
+    saved = config.LARGE_FILE_THRESHOLD
+    config.LARGE_FILE_THRESHOLD = 1024 * 1024
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root)
+            _write_file(os.path.join(root, "d", "grand.txt"), 2 * 1024 * 1024)
+            report = benchmark.run_benchmark(root, "xz", 1)
+
+            assert report['phases']['scan']['files'] == 7
+            assert report['phases']['pipeline']['processed'] == 7
+            steps = report['steps']
+            compressed = steps['compress']['petits']['count'] + steps['compress']['gros']['count']
+            assert steps['compress']['gros']['count'] == 1
+            assert steps['verify']['count'] == compressed          # Une vérification par archive
+            assert steps['delete']['count'] == 7                   # Un original supprimé par fichier
+            assert steps['verify']['seconds'] > 0 and steps['delete']['seconds'] > 0
+            assert report['processes']['spawned'] == 0             # Moteur intégré: aucun processus
+    finally:
+        config.LARGE_FILE_THRESHOLD = saved
+    print("✅ Durées de compression, vérification et suppression séparées")
+    return True
+
+def test_stat_call_counts():
+    """Un seul stat par fichier, compté par étage; aucun stat de fichier pour un arbre inchangé"""
+    import tempfile
+    print("Test du comptage des appels stat...")
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        _, stats = _scan_paths(root, workers=1)
+        if os.name != "nt":                        # Sous Windows, DirEntry.stat() est gratuit
+            assert stats.stat_calls == stats.files_found == 8
+
+            # Passage complet: 8 fichiers et 3 sous-dossiers (date pour l'index), racine relue par l'index
+            engine, summary = _run_engine(root)
+            counts = engine.metrics.snapshot()
+            assert summary['stat_calls'] == 12 and 'stat_calls_saved' not in summary
+            assert counts['ultracompression_stat_calls_total{stage="scan"}'] == 11
+            assert counts['ultracompression_stat_calls_total{stage="index"}'] == 1
+            assert not any(name.startswith("ultracompression_stat_calls_saved") for name in counts)
+
+            # Arbre inchangé: seuls les 4 dossiers sont relus par l'index
+            _, summary = _run_engine(root)
+            assert summary['stat_calls'] == 4
+    print("✅ Appels stat comptés par étage")
+    return True
+
+def test_throughput_model():
+    """Vitesses apprises par classe, conservées entre les passages; estimation nulle sans erreur"""
+    import tempfile
+    import time
+    from compression_engine import CompressionEngine
+    from file_scanner import FileRecord, ScanStats
+    from throughput_model import ThroughputModel
+    print("Test du modèle de débit...")
+    MB = 1024 * 1024
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "debit.json")
+        model = ThroughputModel("xz", 5, 10.0, 2, path)
+        records = [FileRecord(os.path.join(root, f"f{i}.txt"), 10 * MB, 0.0, ".txt") for i in range(2)]
+        for record in records:
+            model.add(record)
+        assert abs(model.estimate() - 2.0) < 1e-9            # 20 MB à 10 MB/s par worker, 2 workers
+
+        # 0,5 s par MB mesurées (avant calibrage: 2 workers supposés), 20 MB restants
+        started = time.perf_counter()
+        model.observe([FileRecord("a.txt", 1 * MB, 0.0, ".txt")], 0.5, started)
+        model.observe([FileRecord("b.txt", 4 * MB, 0.0, ".txt")], 2.0, started)
+        assert abs(model.estimate() - 5.0) < 1e-6
+        model.done(records[0])
+        assert abs(model.estimate() - 2.5) < 1e-6
+        model.save()
+
+        # Passage suivant: vitesses reprises du fichier, avant toute mesure
+        stats = ScanStats()
+        stats.add_eligible(FileRecord("c.txt", 8 * MB, 0.0, ".txt"))
+        estimation = ThroughputModel.open(root, "xz", 5, 10.0, 2).estimate_scan(stats)  # Autre dossier: défaut
+        assert abs(estimation['estimated_seconds'] - 0.8) < 1e-6
+        reloaded = ThroughputModel("xz", 5, 10.0, 2, path)
+        reloaded.load()
+        assert abs(reloaded.estimate_scan(stats)['estimated_seconds'] - 2.0) < 1e-6
+
+        # Estimation nulle (fichiers vides): le résumé du scan ne divise pas par zéro
+        engine = CompressionEngine(backend_name="xz")
+        engine.sampler = None
+        engine.throughput_model = ThroughputModel("xz", 5, 10.0, 2)
+        empty = ScanStats()
+        empty.add_eligible(FileRecord("vide.txt", 0, 0.0, ".txt"))
+        engine._on_scan_complete(empty)
+    print("✅ Vitesses apprises et estimation nulle")
+    return True
+
+def test_in_process_backends():
+    """Moteurs intégrés: aller-retour sans perte, choix automatique, annulation sans archive partielle"""
+    import tempfile
+    from compression_backends import BACKENDS, get_backend
+    from compression_optimizer import CompressionOptimizer
+    print("Test des moteurs de compression intégrés...")
+    optimizer = CompressionOptimizer()
+    assert get_backend(optimizer, "auto") is not None
+    assert get_backend(optimizer, "inexistant") is None
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "source.txt")
+        _write_file(source, 300 * 1024)
+        with open(source, "rb") as f:
+            original = f.read()
+        tested = []
+        for name in ("xz", "bz2", "zstd"):
+            backend = get_backend(optimizer, name)
+            if backend is None:
+                assert not BACKENDS[name]().is_available()    # zstandard non installé
+                continue
+            archive = source + backend.extension
+            success, size, error = backend.compress(source, archive, 5, len(original))
+            assert success, error
+            assert 0 < size < len(original) and size == os.path.getsize(archive)
+            with backend._open_decompressed(archive) as reader:
+                assert reader.read() == original
+
+            # Arrêt demandé: compression refusée, aucune archive laissée à côté de la source
+            backend.cancel()
+            success, _, error = backend.compress(source, archive + "2", 5, len(original))
+            assert not success and "annulée" in error and not os.path.exists(archive + "2")
+            backend.reset()
+            assert backend.compress(source, archive + "3", 5, len(original))[0]
+            tested.append(name)
+        assert "xz" in tested and "bz2" in tested
+    print(f"✅ Moteurs intégrés: {', '.join(tested)}")
+    return True
+
+def test_size_lanes():
+    """Voies par taille: plus gros fichier d'abord (LPT), fin de flux en dernier, petits groupés par dossier"""
+    from compression_optimizer import CompressionOptimizer
+    from file_scanner import FileRecord
+    from lane_scheduler import LaneScheduler
+    print("Test de l'ordonnanceur à voies...")
+    optimizer = CompressionOptimizer()
+    optimizer.cpu_count = 8
+    lanes = LaneScheduler(optimizer, small_workers=6, large_workers=2, threshold=1000)
+    assert (lanes.large.workers, lanes.large.threads) == (2, 4)      # Tous les cœurs répartis
+    assert (lanes.small.workers, lanes.small.threads) == (6, 1)
+    assert lanes.is_large(FileRecord("g", 1000, 0.0, ".txt"))
+    assert not lanes.is_large(FileRecord("p", 999, 0.0, ".txt"))
+
+    end = object()  # Marqueur de fin de flux: sans taille
+    for size in (3000, 9000, 1000):
+        lanes.large_queue.put(FileRecord(f"f{size}", size, 0.0, ".txt"))
+    lanes.large_queue.put(end)
+    lanes.large_queue.put(FileRecord("f5000", 5000, 0.0, ".txt"))
+    order = [lanes.large_queue.get() for _ in range(5)]
+    assert [record.size for record in order[:4]] == [9000, 5000, 3000, 1000] and order[4] is end
+
+    # Petits fichiers: groupés par répertoire (celui du plus petit fichier d'abord), puis par taille
+    optimizer.disk_type = "SSD"
+    records = [FileRecord(os.path.join("a", "x.txt"), 300, 0.0, ".txt"),
+               FileRecord(os.path.join("b", "y.txt"), 100, 0.0, ".txt"),
+               FileRecord(os.path.join("a", "z.txt"), 200, 0.0, ".txt")]
+    ordered = [os.path.basename(record.path) for record in lanes.order_small(records)]
+    assert ordered == ["y.txt", "z.txt", "x.txt"]
+    print("✅ Ordre LPT des gros fichiers et groupement des petits")
+    return True
+
+def test_entropy_sampler():
+    """Fichiers incompressibles écartés, compressibles conservés, verdict mis en cache par type"""
+    import random
+    import tempfile
+    import config
+    from entropy_sampler import EntropySampler
+    from file_scanner import FileRecord
+    print("Test de l'échantillonnage avant compression...")
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as root:
+        def record(name, data):
+            path = os.path.join(root, name)
+            with open(path, "wb") as f:
+                f.write(data)
+            return FileRecord(path, len(data), 0.0, os.path.splitext(name)[1])
+
+        sampler = EntropySampler()
+        assert sampler.filter_record(record("texte.txt", b"ultra compression " * 20000)) is None
+        noise = [record(f"bruit{i}.bin", b"RND0" + rng.getrandbits(8 * 200000).to_bytes(200000, "little"))
+                 for i in range(config.SAMPLE_CACHE_MIN_FILES + 2)]
+        reasons = [sampler.filter_record(item) for item in noise]
+        assert all(reason is not None and "incompressible" in reason for reason in reasons)
+        assert sampler.stats['skipped'] == len(noise)
+        assert sampler.stats['skipped_bytes'] == sum(item.size for item in noise)
+        # Même extension et même nombre magique: les derniers ne sont plus lus
+        assert sampler.stats['cache_hits'] == 2
+        assert sampler.stats['sampled'] == 1 + config.SAMPLE_CACHE_MIN_FILES
+
+        # Fichier disparu: laissé à la compression, qui signalera l'erreur
+        assert sampler.filter_record(FileRecord(os.path.join(root, "absent.txt"), 10, 0.0, ".txt")) is None
+    print("✅ Fichiers incompressibles écartés, verdicts en cache")
+    return True
+
+def test_metrics_export():
+    """Compteurs, jauges et histogrammes: instantané, export JSON lines et format Prometheus"""
+    import json
+    import tempfile
+    import urllib.request
+    from metrics import MetricsExporter, MetricsRegistry, PrometheusEndpoint
+    print("Test de l'export des métriques...")
+    registry = MetricsRegistry()
+    registry.counter("test_fichiers_total", "Fichiers", {"voie": "petits"}).inc(3)
+    registry.counter("test_fichiers_total", "Fichiers", {"voie": "gros"}).inc()
+    registry.gauge("test_file", "Profondeur", func=lambda: 7)
+    histogram = registry.histogram("test_duree_seconds", "Durée", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+
+    snapshot = registry.snapshot()
+    assert snapshot['test_fichiers_total{voie="petits"}'] == 3 and registry.total("test_fichiers_total") == 4
+    assert snapshot["test_file"] == 7
+    assert snapshot["test_duree_seconds"]["count"] == 4 and snapshot["test_duree_seconds"]["buckets"] == [1, 2, 1]
+    assert snapshot["test_duree_seconds"]["p50"] == 1                # Borne du seau de la médiane
+
+    text = registry.to_prometheus()
+    assert "# TYPE test_duree_seconds histogram" in text
+    assert 'test_duree_seconds_bucket{le="1"} 3' in text and 'test_duree_seconds_bucket{le="+Inf"} 4' in text
+    assert 'test_fichiers_total{voie="gros"} 1' in text
+
+    with tempfile.TemporaryDirectory() as root:
+        exporter = MetricsExporter.open(registry, root)
+        exporter.write_snapshot()
+        registry.counter("test_fichiers_total", "Fichiers", {"voie": "petits"}).inc(2)
+        exporter.write_snapshot()
+        with open(exporter.path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 2 and lines[1]["metrics"]['test_fichiers_total{voie="petits"}'] == 5
+        assert lines[1]["rates"]['test_fichiers_total{voie="petits"}'] > 0
+
+    endpoint = PrometheusEndpoint(registry, 0)
+    endpoint.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{endpoint.port}/metrics", timeout=5) as response:
+            assert response.read().decode("utf-8") == registry.to_prometheus()
+    finally:
+        endpoint.stop()
+    print("✅ Instantané, JSON lines et Prometheus")
+    return True
+
+def test_device_probe():
+    """Détection du disque: montage, mesure de lecture sans cache, SSD/HDD d'après les IOPS mesurées"""
+    import tempfile
+    import device_probe
+    from compression_optimizer import CompressionOptimizer
+    print("Test de la détection du disque...")
+    with tempfile.TemporaryDirectory() as root:
+        assert device_probe.probe_read(root, duration=0.2) == (None, None, False)   # Aucun fichier à lire
+        _write_file(os.path.join(root, "d", "donnees.bin"), 4 * 1024 * 1024)
+        read_mbs, read_iops, _ = device_probe.probe_read(root, duration=0.2)
+        assert read_mbs > 0 and read_iops > 0
+
+        device, mount_point, _ = device_probe.find_mount(root)
+        assert mount_point is not None and os.path.realpath(root).startswith(mount_point)
+        assert device_probe.detect_device(root, probe=False).kind in ("SSD", "HDD", "inconnu")
+        if device_probe.disk_name(root) is not None:
+            assert device_probe.physical_device(root) == device_probe.disk_name(root)
+
+        # Une mesure sans cache prime sur l'indicateur du système
+        saved = device_probe.probe_read
+        try:
+            device_probe.probe_read = lambda path: (400.0, 150.0, True)
+            info = device_probe.detect_device(root, probe=True)
+            assert info.kind == "HDD"
+            optimizer = CompressionOptimizer()
+            optimizer.device = info
+            assert optimizer.max_io_workers() == 1                  # 150 IOPS: un seul worker
+            device_probe.probe_read = lambda path: (900.0, 50000.0, True)
+            assert device_probe.detect_device(root, probe=True).kind == "SSD"
+        finally:
+            device_probe.probe_read = saved
+    print("✅ Montage, mesure de lecture et type de disque")
+    return True
+
+def test_file_plan():
+    """Plan compact: FileRecord reconstruits à l'identique, noms non décodables conservés, mémoire bornée"""
+    from file_plan import FilePlan
+    from file_scanner import FileRecord
+    print("Test du plan de fichiers compact...")
+    records = [FileRecord(os.path.join("racine", f"dossier{i % 10}", f"fichier{i}.Txt"), i * 1000, 1700000000.5 + i,
+                          ".txt", 1000 + i) for i in range(5000)]
+    records.append(FileRecord(os.path.join("racine", "caf\udce9.csv"), 42, 1.25, ".csv", 7))  # Nom non UTF-8
+    plan = FilePlan(records)
+
+    assert len(plan) == len(records) and len(plan.directories) == 11
+    assert list(plan) == records
+    assert plan[-1] == records[-1] and plan[123] == records[123]
+    assert list(plan.sizes[:3]) == [0, 1000, 2000]
+
+    # Bien moins de mémoire qu'une liste de FileRecord
+    as_records = sum(sys.getsizeof(record) + sys.getsizeof(record.path) for record in records)
+    assert plan.nbytes() < as_records / 3
+    print(f"✅ Plan de {len(plan)} fichiers: {plan.nbytes() // 1024} KB")
+    return True
+
+def test_cancellation():
+    """Arrêt: compression en cours interrompue entre deux tranches, doublons abandonnés, aucune archive partielle"""
+    import tempfile
+    import threading
+    import config
+    from compression_backends import CompressionCancelled, _compress_cancellable
+    from deduplication import Deduplicator
+    from file_plan import FilePlan
+    from file_scanner import FileRecord
+    print("Test de l'annulation des compressions en cours...")
+
+    # Annulation levée pendant la première tranche: la suivante n'est pas compressée
+    cancelled = threading.Event()
+
+    class SlowCompressor:
+        calls = 0
+
+        def compress(self, data):
+            SlowCompressor.calls += 1
+            cancelled.set()
+            return bytes(data)
+
+    data = b"x" * (config.CANCEL_CHECK_BYTES * 4)
+    try:
+        _compress_cancellable(SlowCompressor(), data, cancelled)
+        assert False, "compression non interrompue"
+    except CompressionCancelled:
+        pass
+    assert SlowCompressor.calls == 1
+
+    with tempfile.TemporaryDirectory() as root:
+        # Déduplication annulée: aucun doublon retenu, tous les fichiers restent compressés
+        for name in ("un.txt", "deux.txt"):
+            _write_file(os.path.join(root, name), 4000)
+        plan = FilePlan(FileRecord(os.path.join(root, name), 4000, 0.0, ".txt") for name in ("un.txt", "deux.txt"))
+        deduplicator = Deduplicator()
+        deduplicator.cancel()
+        assert deduplicator.deduplicate(plan) == set()
+
+        # Arrêt demandé dès le premier fichier terminé: les autres restent intacts, sans archive partielle
+        tree = os.path.join(root, "arbre")
+        _make_tree(tree)
+        stop = threading.Event()
+        engine, summary = _run_engine(tree, should_continue=lambda: not stop.is_set(),
+                                      event_callback=lambda kind, *data: kind == "progress" and stop.set())
+        assert engine.backend.cancelled.is_set()    # Listener d'arrêt appelé
+        assert 1 <= summary['processed'] < 6
+        assert not os.listdir(os.path.join(tree, ".ultracompression", "partial"))
+        for rel_path in ("a/un.txt", "a/deux.txt", "a/b/trois.csv", "a/b/quatre.txt", "c/cinq.json", "c/six.txt"):
+            path = os.path.join(tree, *rel_path.split("/"))
+            archive = path + engine.backend.extension
+            assert os.path.exists(path) or os.path.exists(archive)    # Original supprimé après son archive
+            if os.path.exists(archive):
+                # Archive complète (l'original est conservé si l'arrêt précède sa suppression)
+                with engine.backend._open_decompressed(archive) as reader:
+                    assert reader.read().startswith(b"ultra compression ")
+    print("✅ Annulation: tranche en cours terminée, doublons abandonnés, aucune archive partielle")
+    return True
+
+def test_job_manager():
+    """Plusieurs disques: dossiers regroupés par disque physique, budget de threads commun, résumé additionné"""
+    import tempfile
+    import threading
+    import job_manager
+    from concurrency_controller import CpuBudget
+    print("Test du gestionnaire de disques et du budget de threads...")
+
+    # Budget: unités bornées au total, attente interrompue par l'arrêt
+    budget = CpuBudget(4)
+    assert budget.acquire(3, lambda: True) and budget.busy == 3
+    assert not budget.acquire(2, lambda: False) and budget.busy == 3
+    waiter = threading.Thread(target=budget.acquire, args=(2, lambda: True), daemon=True)
+    waiter.start()
+    waiter.join(timeout=0.3)
+    assert waiter.is_alive()                        # Bloqué tant que 3 + 2 > 4
+    budget.release(3)
+    waiter.join(timeout=5)
+    assert not waiter.is_alive() and budget.busy == 2
+    budget.release(2)
+    assert budget.acquire(16, lambda: True) and budget.busy == 4    # Plafonné au budget total
+    budget.release(16)
+    assert budget.busy == 0
+
+    saved = job_manager.physical_device
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            roots = [os.path.join(root, name) for name in ("sda_un", "sdb_un", "sda_deux")]
+            for path in roots:
+                _make_tree(path)
+            job_manager.physical_device = lambda path: os.path.basename(path).split("_")[0]
+            jobs = job_manager.JobManager.group_by_device(roots)
+            assert [(job.device, job.roots) for job in jobs] == [("sda", [roots[0], roots[2]]), ("sdb", [roots[1]])]
+
+            # Budget d'un seul thread partagé par les deux disques
+            manager = job_manager.JobManager(backend_name="xz", cpu_budget=1)
+            busiest = []
+            acquire = manager.cpu_budget.acquire
+
+            def tracking_acquire(threads, should_continue):
+                acquired = acquire(threads, should_continue)
+                busiest.append(manager.cpu_budget.busy)
+                return acquired
+
+            manager.cpu_budget.acquire = tracking_acquire
+            summary = manager.run(roots, 5)
+            assert busiest and max(busiest) == 1
+            assert summary['processed'] == summary['succeeded'] == 18
+            assert summary['drives']['sda']['processed'] == 12 and summary['drives']['sdb']['processed'] == 6
+            assert summary['drives']['sda']['roots'] == [roots[0], roots[2]]
+            assert summary['bytes_in'] == sum(drive['bytes_in'] for drive in summary['drives'].values())
+    finally:
+        job_manager.physical_device = saved
+    print("✅ Disques regroupés, budget de threads respecté, résumé par disque")
+    return True
+
+def test_stdin_feeder():
+    """Mode entrée standard: lecture séquentielle complète, taille et CRC32 envoyés à 7z, commande -si<nom>"""
+    import io
+    import tempfile
+    import threading
+    import zlib
+    import config
+    from compression_backends import SevenZipBackend, _read_sequential, _StdinFeeder
+    from compression_optimizer import CompressionOptimizer
+    print("Test de l'envoi des sources sur l'entrée standard de 7z...")
+
+    class Pipe(io.BytesIO):
+        def close(self):
+            self.received = self.getvalue()
+            super().close()
+
+    class BrokenPipe(Pipe):
+        def write(self, data):
+            raise BrokenPipeError()
+
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "source.txt")
+        _write_file(source, 3 * 4096 + 123)    # Pas un multiple de la taille de page
+        with open(source, "rb") as f:
+            original = f.read()
+        assert b"".join(bytes(chunk) for chunk in _read_sequential(source, 4096)) == original
+
+        saved = config.SEVEN_ZIP_READ_BUFFER, config.SEVEN_ZIP_STDIN
+        config.SEVEN_ZIP_READ_BUFFER = 4096
+        try:
+            feeder = _StdinFeeder(source, threading.Event())
+            pipe = Pipe()
+            feeder(pipe)
+            assert pipe.closed and pipe.received == original and feeder.error is None
+            assert feeder.size == len(original) and feeder.checksum.value == zlib.crc32(original)
+
+            # 7z arrêté: pas d'erreur d'envoi (son code de retour l'explique); arrêt demandé: erreur
+            feeder = _StdinFeeder(source, threading.Event())
+            pipe = BrokenPipe()
+            feeder(pipe)
+            assert pipe.closed and feeder.error is None
+            cancelled = threading.Event()
+            cancelled.set()
+            feeder = _StdinFeeder(source, cancelled)
+            pipe = Pipe()
+            feeder(pipe)
+            assert pipe.closed and pipe.received == b"" and "annulée" in str(feeder.error)
+
+            backend = SevenZipBackend(CompressionOptimizer(), seven_zip_path="7z")
+            archive = os.path.join(root, "partial", "source.txt.7z")
+            config.SEVEN_ZIP_STDIN = True
+            assert backend._command(source, archive, 5, len(original), 1)[-2:] == ["-sisource.txt", archive]
+            config.SEVEN_ZIP_STDIN = False
+            assert backend._command(source, archive, 5, len(original), 1)[-2:] == [archive, source]
+        finally:
+            config.SEVEN_ZIP_READ_BUFFER, config.SEVEN_ZIP_STDIN = saved
+    print("✅ Source envoyée en entier, CRC32 calculé au passage, commande -si<nom>")
+    return True
+
 def main():
     """Fonction principale de test"""
     print("=== Test d'UltraCompression ===\n")
@@ -131,7 +1118,32 @@ def main():
         test_dependencies,
         test_7zip_installation,
         test_imports,
-        test_gui_basic
+        test_gui_basic,
+        test_scanner_counts,
+        test_parallel_scan_order,
+        test_exclusion_rules,
+        test_pipeline_and_solid_batches,
+        test_scan_index,
+        test_journal_recovery,
+        test_crc_mismatch,
+        test_warm_process_pool,
+        test_solid_batches_by_default_for_7z,
+        test_deduplication,
+        test_scan_index_failed_directories,
+        test_adaptive_concurrency,
+        test_progress_channel,
+        test_benchmark_report,
+        test_stat_call_counts,
+        test_throughput_model,
+        test_in_process_backends,
+        test_size_lanes,
+        test_entropy_sampler,
+        test_metrics_export,
+        test_device_probe,
+        test_file_plan,
+        test_cancellation,
+        test_job_manager,
+        test_stdin_feeder
     ]
     
     results = []
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Modèle de débit appris pour l'estimation du temps de compression
+Le temps de compression de chaque fichier est mesuré pendant le passage et modélisé,
+par moteur, niveau et classe d'extension, par une droite temps = coût fixe + coût par octet
+(moindres carrés incrémentaux: le coût fixe couvre le lancement de 7z pour les petits fichiers).
+
+Les mesures sont conservées entre les passages dans le dossier d'état du disque: le passage
+suivant démarre avec les vitesses apprises au lieu d'une estimation fixe. Le temps restant
+est recalculé en continu à partir des tailles produites par le scanner (aucun nouveau stat).
+"""
+
+import json
+import os
+import threading
+import time
+
+import config
+
+# Classe utilisée pour les extensions absentes de config.EXTENSION_CLASSES
+DEFAULT_CLASS = "autre"
+
+_CLASS_BY_EXTENSION = {ext: name for name, extensions in config.EXTENSION_CLASSES.items() for ext in extensions}
+
+
+def extension_class(ext):
+    """Classe d'extension d'un fichier (texte, document, image...)"""
+    return _CLASS_BY_EXTENSION.get(ext, DEFAULT_CLASS)
+
+
+class _RateFit:
+    """Régression linéaire incrémentale du temps de compression (secondes) sur la taille (MB)"""
+
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self, n=0.0, sx=0.0, sy=0.0, sxx=0.0, sxy=0.0):
+        self.n, self.sx, self.sy, self.sxx, self.sxy = n, sx, sy, sxx, sxy
+
+    def add(self, size_mb, seconds, weight=1.0):
+        self.n += weight
+        self.sx += weight * size_mb
+        self.sy += weight * seconds
+        self.sxx += weight * size_mb * size_mb
+        self.sxy += weight * size_mb * seconds
+
+    def merged(self, other):
+        return _RateFit(self.n + other.n, self.sx + other.sx, self.sy + other.sy,
+                        self.sxx + other.sxx, self.sxy + other.sxy)
+
+    def scaled(self, factor):
+        return _RateFit(self.n * factor, self.sx * factor, self.sy * factor, self.sxx * factor, self.sxy * factor)
+
+    def coefficients(self):
+        """(secondes par fichier, secondes par MB), ou None sans mesure"""
+        if self.n <= 0 or self.sx <= 0:
+            return None
+        variance = self.n * self.sxx - self.sx * self.sx
+        if variance > 1e-9 * self.n * self.sxx:
+            slope = (self.n * self.sxy - self.sx * self.sy) / variance
+            intercept = (self.sy - slope * self.sx) / self.n
+            if slope > 0 and intercept >= 0:
+                return intercept, slope
+        # Tailles trop semblables ou droite incohérente: coût proportionnel à la taille
+        return 0.0, self.sy / self.sx
+
+    def to_list(self):
+        return [self.n, self.sx, self.sy, self.sxx, self.sxy]
+
+
+class ThroughputModel:
+    """
+    Vitesses de compression apprises et temps restant d'un passage.
+    add() est appelé pour chaque fichier éligible, observe() avec la durée de sa compression
+    et done() quand il est terminé (compressé, en échec ou remplacé par une référence).
+    """
+
+    def __init__(self, backend_name, compression_level, default_speed_mbs, workers, path=None):
+        """
+        default_speed_mbs: débit global supposé tant qu'aucune mesure n'existe pour une classe
+        workers: nombre de compressions simultanées supposé avant calibrage
+        path: fichier JSON des vitesses apprises (None: rien n'est conservé)
+        """
+        self.prefix = f"{backend_name}:{compression_level}:"
+        self.default_speed_mbs = max(default_speed_mbs, 1e-6)
+        self.workers = max(1, workers)
+        self.path = path
+
+        self._history = {}   # classe -> _RateFit des passages précédents (pondéré)
+        self._current = {}   # classe -> _RateFit de ce passage
+        self._others = {}    # Mesures des autres moteurs/niveaux, conservées telles quelles
+        self._pending = {}   # classe -> [fichiers restants, MB restants]
+        self._lock = threading.Lock()
+
+        # Parallélisme effectif: temps de compression cumulé / temps écoulé depuis la première compression
+        self._busy_seconds = 0.0
+        self._first_start = None
+
+    @classmethod
+    def open(cls, root_path, backend_name, compression_level, default_speed_mbs, workers, log_callback=None):
+        """Modèle associé au dossier d'état du disque, avec les vitesses des passages précédents"""
+        path = os.path.join(root_path, config.STATE_DIR_NAME, config.THROUGHPUT_MODEL_FILE)
+        model = cls(backend_name, compression_level, default_speed_mbs, workers, path)
+        try:
+            model.load()
+        except (OSError, ValueError) as e:
+            if log_callback and os.path.exists(path):
+                log_callback(f"⚠️ Vitesses apprises illisibles, estimation par défaut: {e}", "WARNING")
+        return model
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for key, values in data.get("rates", {}).items():
+            fit = _RateFit(*values)
+            if not key.startswith(self.prefix):
+                self._others[key] = fit
+                continue
+            # Les passages précédents comptent moins que les mesures de ce passage
+            weight = config.THROUGHPUT_HISTORY_WEIGHT
+            if fit.n * weight > config.THROUGHPUT_MAX_HISTORY_SAMPLES:
+                weight = config.THROUGHPUT_MAX_HISTORY_SAMPLES / fit.n
+            self._history[key[len(self.prefix):]] = fit.scaled(weight)
+
+    def save(self):
+        """Enregistre les vitesses (historique + ce passage) par remplacement atomique du fichier"""
+        if self.path is None:
+            return
+        with self._lock:
+            rates = {key: fit.to_list() for key, fit in self._others.items()}
+            for name in set(self._history) | set(self._current):
+                fit = self._history.get(name, _RateFit()).merged(self._current.get(name, _RateFit()))
+                rates[self.prefix + name] = fit.to_list()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "rates": rates}, f)
+        os.replace(temp_path, self.path)
+
+    # ------------------------------------------------------------------
+    # Mesures du passage
+    # ------------------------------------------------------------------
+
+    def add(self, record):
+        """Fichier éligible à compresser (taille issue du scanner)"""
+        with self._lock:
+            pending = self._pending.setdefault(extension_class(record.ext), [0, 0.0])
+            pending[0] += 1
+            pending[1] += record.size / (1024 * 1024)
+
+    def done(self, record):
+        """Fichier terminé: il ne compte plus dans le temps restant"""
+        with self._lock:
+            pending = self._pending.get(extension_class(record.ext))
+            if pending is not None:
+                pending[0] = max(0, pending[0] - 1)
+                pending[1] = max(0.0, pending[1] - record.size / (1024 * 1024))
+
+    def observe(self, records, seconds, started):
+        """
+        Durée de compression d'un fichier (ou d'un lot, répartie au prorata des tailles)
+        started: instant (time.perf_counter) du début de la compression
+        """
+        total_size = sum(record.size for record in records) or 1
+        with self._lock:
+            if self._first_start is None or started < self._first_start:
+                self._first_start = started
+            self._busy_seconds += seconds
+            for record in records:
+                fit = self._current.setdefault(extension_class(record.ext), _RateFit())
+                fit.add(record.size / (1024 * 1024), seconds * record.size / total_size)
+
+    @property
+    def calibrated(self):
+        """Vrai après THROUGHPUT_CALIBRATION_SECONDS de compression réelle dans ce passage"""
+        with self._lock:
+            return self._is_calibrated(time.perf_counter())
+
+    def _is_calibrated(self, now):
+        return (self._first_start is not None
+                and now - self._first_start >= config.THROUGHPUT_CALIBRATION_SECONDS)
+
+    # ------------------------------------------------------------------
+    # Estimation
+    # ------------------------------------------------------------------
+
+    def estimate(self, files_by_class=None, mb_by_class=None):
+        """
+        Temps estimé en secondes pour les fichiers restants du passage, ou pour les totaux
+        donnés par classe (analyse sans compression)
+        """
+        with self._lock:
+            now = time.perf_counter()
+            if files_by_class is None:
+                pending = {name: tuple(values) for name, values in self._pending.items()}
+            else:
+                pending = {name: (files_by_class.get(name, 0), mb_by_class.get(name, 0.0))
+                           for name in set(files_by_class) | set(mb_by_class)}
+
+            # Avant calibrage: autant de compressions simultanées que de workers
+            parallelism = self.workers
+            if files_by_class is None and self._is_calibrated(now):
+                parallelism = max(self._busy_seconds / (now - self._first_start), 0.1)
+
+            work_seconds = 0.0
+            for name, (files, size_mb) in pending.items():
+                fit = self._history.get(name, _RateFit())
+                if name in self._current and (self._is_calibrated(now) or not fit.n):
+                    fit = fit.merged(self._current[name])
+                coefficients = fit.coefficients()
+                if coefficients is None:
+                    # Aucune mesure pour cette classe: débit global par défaut
+                    work_seconds += size_mb / self.default_speed_mbs * self.workers
+                else:
+                    per_file, per_mb = coefficients
+                    work_seconds += files * per_file + size_mb * per_mb
+
+        return work_seconds / parallelism
+
+    def estimate_scan(self, scan_stats):
+        """Estimation à partir des statistiques d'un scan (total_files, total_size_mb, estimated_seconds/minutes)"""
+        files_by_class, mb_by_class = {}, {}
+        for ext, count in scan_stats.file_types.items():
+            name = extension_class("" if ext == "sans_extension" else ext)
+            files_by_class[name] = files_by_class.get(name, 0) + count
+            mb_by_class[name] = mb_by_class.get(name, 0.0) + scan_stats.type_sizes.get(ext, 0) / (1024 * 1024)
+
+        estimated_seconds = self.estimate(files_by_class, mb_by_class)
+        return {
+            'total_files': scan_stats.eligible_files,
+            'total_size_mb': scan_stats.total_size / (1024 * 1024),
+            'estimated_seconds': estimated_seconds,
+            'estimated_minutes': estimated_seconds / 60
+        }
+
+    def format_eta(self):
+        """Temps restant lisible pour l'interface ("12.5 min", "(calibrage)" avant les premières mesures)"""
+        minutes = self.estimate() / 60
+        return f"{minutes:.1f} min" if self.calibrated else f"{minutes:.1f} min (calibrage)"
@@ -6,21 +6,26 @@ Compresse récursivement tous les fichiers d'un disque externe avec optimisation
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import os
+from tkinter import ttk, messagebox
 import sys
-import subprocess
 import threading
 import time
 import psutil
-from pathlib import Path
-import queue
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import shutil
-from compression_optimizer import CompressionOptimizer
 import config
+from compression_engine import CompressionEngine
+from progress_channel import ProgressChannel
 
 class UltraCompressionApp:
+    # Couleur des logs en temps réel selon leur niveau
+    LOG_COLORS = {
+        "INFO": "black",
+        "ANALYSIS": "blue",
+        "COMPRESS": "green",
+        "ERROR": "red",
+        "WARNING": "orange",
+        "SUCCESS": "dark green"
+    }
+    
     def __init__(self, root):
         self.root = root
         self.root.title("UltraCompression - Compression Intelligente 7zip")
@@ -32,43 +37,34 @@ class UltraCompressionApp:
         self.compression_thread = None
         self.total_files = 0
         self.processed_files = 0
-        self.progress_queue = queue.Queue(maxsize=1000)  # Limiter la taille de la queue
+        # Progression agrégée par le moteur, relevée à chaque rafraîchissement de l'interface
+        self.progress_channel = ProgressChannel()
         self.selected_drive = tk.StringVar()
         self.compression_level = tk.IntVar(value=5)
         
-        # Optimiseur de compression
-        self.optimizer = CompressionOptimizer()
-        
-        # Vérifier la présence de 7zip
-        self.seven_zip_path = self.find_7zip()
-        if not self.seven_zip_path:
-            messagebox.showerror("Erreur", "7zip n'est pas installé ou introuvable dans le PATH")
+        # Moteur de compression sans interface: l'application n'en est qu'un client
+        try:
+            self.engine = CompressionEngine(
+                log_callback=self.progress_channel.log,
+                event_callback=self.progress_channel.event,
+                should_continue=lambda: self.is_compressing
+            )
+        except RuntimeError as e:
+            messagebox.showerror("Erreur", str(e))
             sys.exit(1)
+        self.optimizer = self.engine.optimizer
             
         self.setup_ui()
         self.update_drives()
         
         # Log d'initialisation
         self.log_realtime("🚀 UltraCompression initialisé", "INFO")
-        self.log_realtime(f"📦 7zip trouvé: {os.path.basename(self.seven_zip_path)}", "INFO")
-        self.log_realtime(f"💻 Système: {self.optimizer.disk_type}, {self.optimizer.cpu_count} cores", "INFO")
+        self.log_realtime(self.engine.describe_backend(), "INFO")
+        self.log_realtime(f"💻 Système: {self.optimizer.cpu_count} cores (disque analysé au lancement)", "INFO")
         
         # Démarrer la mise à jour de la progression
         self.root.after(100, self.update_progress)
     
-    def find_7zip(self):
-        """Trouve l'exécutable 7zip sur le système"""
-        possible_paths = [
-            "7z.exe",  # Dans le PATH
-            "C:\\Program Files\\7-Zip\\7z.exe",
-            "C:\\Program Files (x86)\\7-Zip\\7z.exe",
-        ]
-        
-        for path in possible_paths:
-            if shutil.which(path) or os.path.exists(path):
-                return path
-        return None
-    
     def setup_ui(self):
         """Configure l'interface utilisateur"""
         # Style
@@ -174,6 +170,8 @@ class UltraCompressionApp:
         logs_scrollbar = ttk.Scrollbar(logs_frame, orient=tk.VERTICAL, 
                                       command=self.realtime_log_text.yview)
         self.realtime_log_text.configure(yscrollcommand=logs_scrollbar.set)
+        for level, color in self.LOG_COLORS.items():
+            self.realtime_log_text.tag_configure(f"color_{level.lower()}", foreground=color)
         
         self.realtime_log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         logs_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
@@ -260,32 +258,8 @@ class UltraCompressionApp:
         self.root.update_idletasks()
     
     def log_realtime(self, message, level="INFO"):
-        """Ajoute un message aux logs en temps réel de façon asynchrone et non-bloquante"""
-        try:
-            import datetime
-            now = datetime.datetime.now()
-            timestamp = now.strftime("%H:%M:%S.") + f"{now.microsecond//1000:03d}"
-            
-            # Définir les couleurs selon le niveau
-            colors = {
-                "INFO": "black",
-                "ANALYSIS": "blue",
-                "COMPRESS": "green",
-                "ERROR": "red",
-                "WARNING": "orange",
-                "SUCCESS": "dark green"
-            }
-            color = colors.get(level, "black")
-            
-            # Ajouter au queue de manière non-bloquante
-            try:
-                self.progress_queue.put_nowait(("realtime_log", timestamp, level, message, color))
-            except queue.Full:
-                # Si la queue est pleine, ignorer ce log pour éviter le blocage
-                pass
-        except Exception:
-            # En cas d'erreur, ne pas bloquer l'application
-            pass
+        """Ajoute un message aux logs en temps réel (affiché au prochain rafraîchissement)"""
+        self.progress_channel.log(message, level)
     
     def copy_logs_to_clipboard(self):
         """Copie les logs en temps réel dans le presse-papier"""
@@ -311,520 +285,46 @@ class UltraCompressionApp:
             return drive_text.split(' ')[0]
         return None
     
-    def count_files(self, path):
-        """Compte le nombre total de fichiers à traiter avec logs détaillés"""
-        count = 0
-        total_files_found = 0
-        ignored_files = 0
-        ignored_dirs = 0
-        
-        try:
-            self.log_realtime(f"📂 Début du scan récursif de: {path}", "ANALYSIS")
-            
-            for root, dirs, files in os.walk(path):
-                if not self.is_compressing:
-                    break
-                
-                # Afficher le répertoire en cours d'analyse
-                rel_path = os.path.relpath(root, path)
-                if rel_path != ".":
-                    self.log_realtime(f"📁 Scan: {rel_path}", "ANALYSIS")
-                
-                # Compter les fichiers trouvés dans ce répertoire
-                total_files_found += len(files)
-                
-                # Filtrer les dossiers système et logger les exclusions
-                original_dirs = dirs.copy()
-                dirs[:] = [d for d in dirs if not any(sys_folder in os.path.join(root, d) 
-                          for sys_folder in config.SYSTEM_FOLDERS)]
-                
-                excluded_dirs = set(original_dirs) - set(dirs)
-                for excluded_dir in excluded_dirs:
-                    ignored_dirs += 1
-                    self.log_realtime(f"🚫 Dossier ignoré: {excluded_dir} (système)", "WARNING")
-                
-                # Analyser chaque fichier avec gestion d'erreurs robuste
-                eligible_in_dir = 0
-                ignored_in_dir = 0
-                error_in_dir = 0
-                
-                for file in files:
-                    try:
-                        file_path = os.path.join(root, file)
-                        
-                        # Vérifier si le fichier existe et est accessible
-                        if not os.path.exists(file_path):
-                            error_in_dir += 1
-                            if error_in_dir <= 2:  # Logger quelques erreurs
-                                self.log_realtime(f"❌ Fichier introuvable: {file}", "ERROR")
-                            continue
-                        
-                        # Tester l'accès au fichier
-                        try:
-                            os.path.getsize(file_path)  # Test d'accès basique
-                        except (OSError, IOError, PermissionError) as e:
-                            error_in_dir += 1
-                            if error_in_dir <= 2:
-                                self.log_realtime(f"❌ Erreur d'accès: {file} ({e})", "ERROR")
-                            continue
-                        
-                        # Vérifier l'éligibilité du fichier
-                        if self.optimizer.should_compress_file(file_path):
-                            count += 1
-                            eligible_in_dir += 1
-                        else:
-                            ignored_files += 1
-                            ignored_in_dir += 1
-                            # Logger seulement quelques exemples pour éviter la surcharge
-                            if ignored_in_dir <= 3:  # Limiter à 3 exemples par répertoire
-                                reason = self._get_exclusion_reason(file_path)
-                                self.log_realtime(f"⚠️ Fichier ignoré: {file} ({reason})", "WARNING")
-                            elif ignored_in_dir == 4:
-                                remaining_ignored = len(files) - eligible_in_dir - error_in_dir - 3
-                                if remaining_ignored > 0:
-                                    self.log_realtime(f"⚠️ ... et {remaining_ignored} autres fichiers ignorés", "WARNING")
-                    
-                    except Exception as e:
-                        error_in_dir += 1
-                        if error_in_dir <= 2:  # Logger les premières erreurs
-                            self.log_realtime(f"💥 Erreur inattendue sur {file}: {e}", "ERROR")
-                        continue
-                
-                # Logger les erreurs du répertoire si il y en a
-                if error_in_dir > 2:
-                    self.log_realtime(f"⚠️ {error_in_dir} erreurs d'accès dans ce répertoire", "WARNING")
-                
-                # Résumé pour ce répertoire
-                if files:  # Seulement si le répertoire contient des fichiers
-                    dir_name = os.path.basename(root) if rel_path != "." else "racine"
-                    self.log_realtime(f"📊 {dir_name}: {eligible_in_dir}/{len(files)} fichiers éligibles", "ANALYSIS")
-            
-            # Résumé final de l'analyse
-            self.log_realtime(f"✅ Analyse terminée:", "ANALYSIS")
-            self.log_realtime(f"   📁 Fichiers trouvés: {total_files_found}", "ANALYSIS")
-            self.log_realtime(f"   ✅ Fichiers éligibles: {count}", "ANALYSIS")
-            self.log_realtime(f"   ⚠️ Fichiers ignorés: {ignored_files}", "ANALYSIS")
-            self.log_realtime(f"   🚫 Dossiers ignorés: {ignored_dirs}", "ANALYSIS")
-            
-        except Exception as e:
-            self.log_message(f"Erreur lors du comptage des fichiers: {e}")
-            self.log_realtime(f"💥 Erreur d'analyse: {e}", "ERROR")
-            
-        return count
-    
-    def _get_exclusion_reason(self, file_path):
-        """Détermine la raison pour laquelle un fichier est exclu avec gestion d'erreurs robuste"""
-        try:
-            # Vérifier d'abord si le fichier existe
-            if not os.path.exists(file_path):
-                return "fichier inexistant"
-            
-            path_obj = Path(file_path)
-            
-            # Vérifier les dossiers système
-            try:
-                if any(sys_folder in str(path_obj) for sys_folder in config.SYSTEM_FOLDERS):
-                    return "dossier système"
-            except Exception:
-                pass
-            
-            # Vérifier les extensions système
-            try:
-                if path_obj.suffix.lower() in config.SYSTEM_EXTENSIONS:
-                    return "extension système"
-            except Exception:
-                pass
-            
-            # Vérifier les fichiers déjà compressés
-            try:
-                if path_obj.suffix.lower() in config.IGNORE_EXTENSIONS:
-                    return "déjà compressé"
-            except Exception:
-                pass
-            
-            # Vérifier la taille minimale
-            try:
-                file_size = os.path.getsize(file_path)
-                if file_size < config.MIN_FILE_SIZE:
-                    return f"trop petit ({file_size} bytes)"
-            except (OSError, IOError, PermissionError) as e:
-                return f"erreur taille: {e}"
-            except Exception as e:
-                return f"erreur accès: {e}"
-            
-            return "critères non remplis"
-            
-        except Exception as e:
-            return f"erreur analyse: {e}"
-    
-    def compress_file(self, file_path, compression_level):
-        """Compresse un fichier individuel avec 7zip"""
-        try:
-            output_path = file_path + ".7z"
-            filename = os.path.basename(file_path)
-            
-            # Log du début de compression
-            self.log_realtime(f"🔄 {filename}", "COMPRESS")
-            
-            # Obtenir les paramètres optimisés
-            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-            optimized_params = self.optimizer.get_optimal_compression_params(compression_level, file_size)
-            
-            # Construire la commande 7zip optimisée
-            cmd = [self.seven_zip_path, "a"] + optimized_params + [output_path, file_path]
-            
-            # Exécuter la commande sans interface
-            result = subprocess.run(cmd, capture_output=True, text=True, 
-                                  creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            if result.returncode == 0:
-                # Supprimer le fichier original si la compression a réussi
-                try:
-                    os.remove(file_path)
-                    # Calculer le taux de compression
-                    original_size = file_size
-                    compressed_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-                    ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
-                    
-                    return True, f"Compressé: {os.path.basename(file_path)} ({ratio:.1f}% économisé)"
-                except OSError as e:
-                    return False, f"Erreur suppression {os.path.basename(file_path)}: {e}"
-            else:
-                return False, f"Erreur compression {os.path.basename(file_path)}: {result.stderr}"
-                
-        except Exception as e:
-            return False, f"Erreur: {e}"
-    
     def compression_worker(self):
-        """Thread principal de compression"""
-        drive_path = self.get_drive_path()
-        if not drive_path or not os.path.exists(drive_path):
-            self.progress_queue.put(("error", "Disque sélectionné invalide"))
-            return
-        
-        self.log_message(f"Démarrage de la compression sur {drive_path}")
-        self.log_message(f"Niveau de compression: {self.compression_level.get()}")
-        self.log_realtime(f"🚀 Initialisation de la compression", "INFO")
-        self.log_realtime(f"📁 Disque cible: {drive_path}", "INFO")
-        self.log_realtime(f"⚙️ Niveau de compression: {self.compression_level.get()}", "INFO")
-        
-        # Compter les fichiers
-        self.progress_queue.put(("status", "Analyse des fichiers..."))
-        self.log_realtime("🔍 Début de l'analyse des fichiers...", "ANALYSIS")
-        self.total_files = self.count_files(drive_path)
-        self.progress_queue.put(("total", self.total_files))
-        
-        if self.total_files == 0:
-            self.log_realtime("⚠️ Aucun fichier éligible trouvé", "WARNING")
-            self.progress_queue.put(("complete", "Aucun fichier à compresser"))
-            return
-        
-        self.log_message(f"Fichiers à traiter: {self.total_files}")
-        self.log_realtime(f"📊 {self.total_files} fichiers éligibles détectés", "ANALYSIS")
-        
-        # Collecter tous les fichiers éligibles avec gestion d'erreurs
-        self.log_realtime("📋 Collecte des fichiers pour la compression...", "ANALYSIS")
-        files_to_compress = []
-        current_dir = ""
-        collected_count = 0
-        collection_errors = 0
+        """Thread de compression: le moteur exécute le pipeline scan → compression"""
+        summary = self.engine.compress(self.get_drive_path(), self.compression_level.get())
+        if summary is not None:
+            self.processed_files = summary['processed']
+    
+    def update_progress(self):
+        """Applique le relevé du canal de progression: un instantané et une insertion groupée par rafraîchissement"""
+        update = self.progress_channel.drain()
         
-        try:
-            for root, dirs, files in os.walk(drive_path):
-                if not self.is_compressing:
-                    self.log_realtime("⏹️ Collecte interrompue par l'utilisateur", "WARNING")
-                    break
-                
-                try:
-                    # Log du répertoire en cours de collecte (seulement tous les 50 fichiers)
-                    if root != current_dir:
-                        current_dir = root
-                        rel_path = os.path.relpath(root, drive_path)
-                        if rel_path != "." and len(files_to_compress) % 50 == 0:
-                            self.log_realtime(f"📁 Collecte: {rel_path} ({len(files_to_compress)} fichiers collectés)", "ANALYSIS")
-                    
-                    # Filtrer les dossiers système avec gestion d'erreurs
-                    try:
-                        dirs[:] = [d for d in dirs if not any(sys_folder in os.path.join(root, d) 
-                                  for sys_folder in config.SYSTEM_FOLDERS)]
-                    except Exception as e:
-                        self.log_realtime(f"⚠️ Erreur filtrage dossiers: {e}", "WARNING")
-                    
-                    # Collecter les fichiers éligibles
-                    eligible_in_dir = 0
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            
-                            # Vérification d'accès avant d'appeler should_compress_file
-                            if not os.path.exists(file_path):
-                                collection_errors += 1
-                                continue
-                            
-                            if self.optimizer.should_compress_file(file_path):
-                                files_to_compress.append(file_path)
-                                collected_count += 1
-                                eligible_in_dir += 1
-                                
-                        except Exception as e:
-                            collection_errors += 1
-                            if collection_errors <= 5:  # Logger quelques erreurs
-                                self.log_realtime(f"❌ Erreur collecte {file}: {e}", "ERROR")
-                            continue
+        # Événements de fin de passage d'abord: une erreur d'affichage ne doit jamais les perdre
+        for event in update.events:
+            try:
+                if event[0] == "error":
+                    messagebox.showerror("Erreur", event[1])
+                    self.reset_ui()
                     
-                    # Log du nombre de fichiers collectés (seulement pour les gros répertoires)
-                    if eligible_in_dir > 10:
-                        try:
-                            dir_name = os.path.basename(root) if rel_path != "." else "racine"
-                            self.log_realtime(f"✅ {dir_name}: {eligible_in_dir} fichiers ajoutés à la file", "ANALYSIS")
-                        except Exception:
-                            pass
-                            
-                except Exception as e:
-                    collection_errors += 1
-                    if collection_errors <= 3:
-                        self.log_realtime(f"💥 Erreur dans répertoire {root}: {e}", "ERROR")
-                    continue
+                elif event[0] == "complete":
+                    self.log_message(event[1])
+                    messagebox.showinfo("Terminé", event[1])
+                    self.reset_ui()
                     
-        except Exception as e:
-            self.log_realtime(f"💥 Erreur critique de collecte: {e}", "ERROR")
-            self.log_message(f"Erreur critique lors de la collecte: {e}")
-        
-        # Logger les erreurs de collecte
-        if collection_errors > 5:
-            self.log_realtime(f"⚠️ {collection_errors} erreurs de collecte au total", "WARNING")
-        
-        self.log_realtime(f"📦 Collecte terminée: {collected_count} fichiers prêts pour compression", "ANALYSIS")
-        
-        # Vérification de cohérence
-        if collected_count != self.total_files:
-            difference = abs(collected_count - self.total_files)
-            self.log_realtime(f"⚠️ Incohérence détectée: {difference} fichiers de différence entre analyse et collecte", "WARNING")
-            self.log_realtime(f"   Analysés: {self.total_files}, Collectés: {collected_count}", "WARNING")
-            if collection_errors > 0:
-                self.log_realtime(f"   Possiblement dû aux {collection_errors} erreurs de collecte", "WARNING")
-        
-        # Optimiser l'ordre des fichiers pour maximiser la vitesse
-        self.progress_queue.put(("status", "Optimisation de l'ordre des fichiers..."))
-        self.log_realtime("🔧 Optimisation de l'ordre des fichiers...", "ANALYSIS")
-        
-        # Analyser les types de fichiers avant optimisation avec gestion d'erreurs
-        file_types = {}
-        total_size = 0
-        analysis_errors = 0
-        
-        for file_path in files_to_compress:
-            try:
-                # Vérifier que le fichier existe encore
-                if not os.path.exists(file_path):
-                    analysis_errors += 1
-                    continue
-                
-                ext = Path(file_path).suffix.lower() or "sans_extension"
-                size = os.path.getsize(file_path)
-                file_types[ext] = file_types.get(ext, 0) + 1
-                total_size += size
-                
-            except (OSError, IOError, PermissionError) as e:
-                analysis_errors += 1
-                if analysis_errors <= 3:  # Logger quelques erreurs
-                    filename = os.path.basename(file_path)
-                    self.log_realtime(f"❌ Erreur analyse {filename}: {e}", "ERROR")
-                continue
+                elif event[0] == "stopped":
+                    self.log_message(event[1])
+                    self.reset_ui()
             except Exception as e:
-                analysis_errors += 1
-                if analysis_errors <= 3:
-                    filename = os.path.basename(file_path)
-                    self.log_realtime(f"💥 Erreur inattendue {filename}: {e}", "ERROR")
-                continue
-        
-        # Logger les erreurs d'analyse
-        if analysis_errors > 3:
-            self.log_realtime(f"⚠️ {analysis_errors} erreurs d'analyse des types de fichiers", "WARNING")
-        
-        # Logger les statistiques des types de fichiers
-        self.log_realtime("📈 Analyse des types de fichiers:", "ANALYSIS")
-        for ext, count in sorted(file_types.items(), key=lambda x: x[1], reverse=True)[:10]:  # Top 10
-            self.log_realtime(f"   {ext}: {count} fichiers", "ANALYSIS")
-        
-        self.log_realtime(f"💾 Taille totale à compresser: {total_size/(1024*1024):.1f} MB", "ANALYSIS")
+                self.log_realtime(f"⚠️ Erreur de traitement de l'événement {event[0]}: {e}", "ERROR")
         
-        # Optimisation de l'ordre avec gestion d'erreurs
         try:
-            self.log_realtime("🎯 Tri par priorité et taille...", "ANALYSIS")
-            files_to_compress = self.optimizer.optimize_file_order(files_to_compress)
+            if update.snapshot is not None:
+                self.apply_snapshot(update.snapshot)
             
-            self.log_realtime("📂 Groupement par répertoire...", "ANALYSIS")
-            files_to_compress = self.optimizer.group_files_by_location(files_to_compress)
+            if update.logs or update.logs_dropped:
+                self.insert_realtime_logs(update.logs, update.logs_dropped, update.overflow_path)
             
+            if update.messages or update.messages_dropped:
+                self.insert_messages(update.messages, update.messages_dropped, update.overflow_path)
         except Exception as e:
-            self.log_realtime(f"⚠️ Erreur d'optimisation: {e}", "WARNING")
-            self.log_realtime("📋 Utilisation de l'ordre par défaut", "INFO")
-            # Continuer avec la liste non optimisée
-        
-        # Estimer le temps de compression
-        self.log_realtime("📈 Calcul des estimations de performance...", "ANALYSIS")
-        estimation = self.optimizer.estimate_compression_time(files_to_compress)
-        self.log_message(f"Estimation: {estimation['estimated_minutes']:.1f} minutes pour {estimation['total_size_mb']:.1f} MB")
-        self.progress_queue.put(("time_estimate", f"{estimation['estimated_minutes']:.1f} min"))
-        
-        # Détails de l'estimation
-        self.log_realtime("⏱️ Estimations détaillées:", "ANALYSIS")
-        self.log_realtime(f"   📊 Taille totale: {estimation['total_size_mb']:.1f} MB", "ANALYSIS")
-        self.log_realtime(f"   📈 Vitesse estimée: {estimation['total_size_mb']/estimation['estimated_minutes']:.1f} MB/min", "ANALYSIS")
-        self.log_realtime(f"   ⏱️ Temps estimé: {estimation['estimated_minutes']:.1f} minutes", "ANALYSIS")
-        
-        # Informations d'optimisation
-        disk_type = self.optimizer.disk_type
-        cpu_count = self.optimizer.cpu_count
-        available_ram = self.optimizer.available_memory / (1024**3)  # GB
-        
-        self.progress_queue.put(("optimizations", f"{disk_type}, {cpu_count} CPU cores"))
-        self.log_realtime("🔧 Configuration système détectée:", "INFO")
-        self.log_realtime(f"   💾 Type de disque: {disk_type}", "INFO")
-        self.log_realtime(f"   🖥️ CPU cores: {cpu_count}", "INFO")
-        self.log_realtime(f"   💻 RAM disponible: {available_ram:.1f} GB", "INFO")
-        
-        # Nombre optimal de workers
-        max_workers = self.optimizer.get_optimal_thread_count(len(files_to_compress))
-        self.log_message(f"Utilisation de {max_workers} threads pour la compression")
-        self.log_realtime("⚡ Optimisations appliquées:", "INFO")
-        self.log_realtime(f"   🔀 Threads parallèles: {max_workers}", "INFO")
-        self.log_realtime(f"   📋 Ordre optimisé: {len(files_to_compress)} fichiers", "INFO")
-        
-        # Paramètres 7zip pour ce niveau
-        sample_params = self.optimizer.get_optimal_compression_params(self.compression_level.get())
-        self.log_realtime(f"   🗜️ Paramètres 7zip: {' '.join(sample_params[:3])}", "INFO")
-        
-        self.log_realtime("🎯 Début de la compression...", "COMPRESS")
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Soumettre les tâches
-            future_to_file = {
-                executor.submit(self.compress_file, file_path, self.compression_level.get()): file_path
-                for file_path in files_to_compress
-            }
-            
-            for future in as_completed(future_to_file):
-                if not self.is_compressing:
-                    break
-                    
-                file_path = future_to_file[future]
-                try:
-                    success, message = future.result()
-                    self.processed_files += 1
-                    
-                    self.progress_queue.put(("progress", self.processed_files, os.path.basename(file_path)))
-                    
-                    if success:
-                        self.progress_queue.put(("log", message))
-                        # Log en temps réel pour succès
-                        filename = os.path.basename(file_path)
-                        self.log_realtime(f"✅ {filename}", "SUCCESS")
-                    else:
-                        self.progress_queue.put(("error_log", message))
-                        # Log en temps réel pour erreur
-                        filename = os.path.basename(file_path)
-                        self.log_realtime(f"❌ {filename} - {message}", "ERROR")
-                        
-                except Exception as e:
-                    self.progress_queue.put(("error_log", f"Erreur inattendue: {e}"))
-                    filename = os.path.basename(file_path)
-                    self.log_realtime(f"💥 {filename} - Erreur inattendue: {e}", "ERROR")
-                    self.processed_files += 1
-        
-        if self.is_compressing:
-            self.log_realtime("🎉 Compression terminée avec succès!", "SUCCESS")
-            self.progress_queue.put(("complete", f"Compression terminée! {self.processed_files} fichiers traités"))
-        else:
-            self.log_realtime("⏹️ Compression arrêtée par l'utilisateur", "WARNING")
-            self.progress_queue.put(("stopped", "Compression arrêtée par l'utilisateur"))
-    
-    def update_progress(self):
-        """Met à jour l'interface avec les informations de progression"""
-        try:
-            while not self.progress_queue.empty():
-                item = self.progress_queue.get_nowait()
-                
-                if item[0] == "status":
-                    self.status_label.config(text=item[1])
-                    
-                elif item[0] == "total":
-                    self.total_files = item[1]
-                    self.files_label.config(text=f"0 / {self.total_files}")
-                    
-                elif item[0] == "progress":
-                    processed, current_file = item[1], item[2]
-                    self.files_label.config(text=f"{processed} / {self.total_files}")
-                    self.current_file_label.config(text=current_file)
-                    
-                    if self.total_files > 0:
-                        progress_percent = (processed / self.total_files) * 100
-                        self.progress_bar['value'] = progress_percent
-                        self.progress_text.config(text=f"{progress_percent:.1f}%")
-                    
-                elif item[0] == "log":
-                    self.log_message(item[1])
-                    
-                elif item[0] == "error_log":
-                    self.log_message(f"ERREUR: {item[1]}")
-                
-                elif item[0] == "time_estimate":
-                    self.time_estimate_label.config(text=item[1])
-                
-                elif item[0] == "optimizations":
-                    self.optimizations_label.config(text=item[1])
-                
-                elif item[0] == "realtime_log":
-                    try:
-                        timestamp, level, message, color = item[1], item[2], item[3], item[4]
-                        self.realtime_log_text.config(state=tk.NORMAL)
-                        
-                        # Ajouter le message de manière simplifiée
-                        log_line = f"[{timestamp}] {message}\n"
-                        self.realtime_log_text.insert(tk.END, log_line)
-                        
-                        # Appliquer la couleur de manière optimisée
-                        start_pos = self.realtime_log_text.index(f"{tk.END}-1c linestart")
-                        end_pos = self.realtime_log_text.index(f"{tk.END}-1c")
-                        
-                        # Créer un tag pour cette couleur si nécessaire
-                        tag_name = f"color_{level.lower()}"
-                        if tag_name not in self.realtime_log_text.tag_names():
-                            self.realtime_log_text.tag_configure(tag_name, foreground=color)
-                        
-                        # Appliquer le tag à la ligne (après le timestamp)
-                        timestamp_end = f"{start_pos}+{len(f'[{timestamp}] ')}c"
-                        self.realtime_log_text.tag_add(tag_name, timestamp_end, end_pos)
-                        
-                        # Faire défiler vers le bas seulement si nécessaire
-                        self.realtime_log_text.see(tk.END)
-                        
-                        # Limiter à 500 lignes pour de meilleures performances
-                        lines = int(self.realtime_log_text.index('end-1c').split('.')[0])
-                        if lines > 500:
-                            self.realtime_log_text.delete("1.0", "50.0")  # Supprimer les 50 premières lignes
-                        
-                        self.realtime_log_text.config(state=tk.DISABLED)
-                    except Exception:
-                        # En cas d'erreur, ignorer ce log pour éviter le crash
-                        pass
-                    
-                elif item[0] == "error":
-                    messagebox.showerror("Erreur", item[1])
-                    self.reset_ui()
-                    
-                elif item[0] == "complete":
-                    self.log_message(item[1])
-                    messagebox.showinfo("Terminé", item[1])
-                    self.reset_ui()
-                    
-                elif item[0] == "stopped":
-                    self.log_message(item[1])
-                    self.reset_ui()
-                    
-        except queue.Empty:
-            pass
+            # Une erreur d'affichage n'interrompt pas les rafraîchissements suivants
+            self.log_realtime(f"⚠️ Erreur d'affichage de la progression: {e}", "ERROR")
         
         # Programmer la prochaine mise à jour avec une fréquence adaptative
         if self.is_compressing:
@@ -834,6 +334,70 @@ class UltraCompressionApp:
             # Moins fréquent quand inactif pour économiser les ressources
             self.root.after(200, self.update_progress)
     
+    def apply_snapshot(self, snapshot):
+        """Met à jour les labels et la barre de progression à partir d'un instantané"""
+        if snapshot['status'] is not None:
+            self.status_label.config(text=snapshot['status'])
+        if snapshot['time_estimate'] is not None:
+            self.time_estimate_label.config(text=snapshot['time_estimate'])
+        if snapshot['optimizations'] is not None:
+            self.optimizations_label.config(text=snapshot['optimizations'])
+        
+        processed = snapshot['processed']
+        # Le total grandit pendant le scan: ne jamais afficher plus de 100%
+        self.total_files = max(snapshot['total'], processed)
+        self.files_label.config(
+            text=f"{processed} / {self.total_files} ({snapshot['bytes_in'] / (1024 * 1024):.1f} MB compressés)")
+        if snapshot['current_file'] is not None:
+            self.current_file_label.config(text=snapshot['current_file'])
+        
+        if self.total_files > 0:
+            progress_percent = (processed / self.total_files) * 100
+            self.progress_bar['value'] = progress_percent
+            self.progress_text.config(text=f"{progress_percent:.1f}%")
+    
+    def insert_realtime_logs(self, logs, dropped, overflow_path=None):
+        """Ajoute les logs détaillés en une seule insertion (couleur par niveau via les tags)"""
+        chunks = []
+        if dropped:
+            chunks += [self.overflow_notice(dropped, overflow_path), "color_warning"]
+        for created, level, message in logs:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(created)) + f".{int(created * 1000) % 1000:03d}"
+            chunks += [f"[{timestamp}] ", (), f"{message}\n", f"color_{level.lower()}"]
+        self.append_lines(self.realtime_log_text, chunks, config.UI_LOG_BUFFER_SIZE)
+    
+    def insert_messages(self, messages, dropped, overflow_path=None):
+        """Ajoute les messages du journal principal en une seule insertion"""
+        chunks = []
+        if dropped:
+            chunks += [self.overflow_notice(dropped, overflow_path), ()]
+        for created, message, is_error in messages:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(created))
+            chunks += [f"[{timestamp}] {'ERREUR: ' if is_error else ''}{message}\n", ()]
+        self.append_lines(self.log_text, chunks, config.UI_MESSAGE_BUFFER_SIZE)
+    
+    def overflow_notice(self, dropped, overflow_path):
+        """Ligne signalant les messages arrivés trop vite pour être affichés"""
+        if overflow_path is None:
+            return f"⏩ {dropped} messages non affichés (trop rapides)\n"
+        return f"⏩ {dropped} messages non affichés (trop rapides), écrits dans {overflow_path}\n"
+    
+    def append_lines(self, text_widget, chunks, max_lines):
+        """Insertion groupée (texte, tags, texte, tags...), puis une seule purge et un seul défilement"""
+        if not chunks:
+            return
+        state = text_widget.cget("state")
+        text_widget.config(state=tk.NORMAL)
+        text_widget.insert(tk.END, *chunks)
+        
+        # Conserver les max_lines dernières lignes
+        lines = int(text_widget.index("end-1c").split(".")[0])
+        if lines > max_lines:
+            text_widget.delete("1.0", f"{lines - max_lines + 1}.0")
+        
+        text_widget.see(tk.END)
+        text_widget.config(state=state)
+    
     def start_compression(self):
         """Démarre le processus de compression"""
         if not self.selected_drive.get():
@@ -858,6 +422,7 @@ class UltraCompressionApp:
         # Démarrer la compression
         self.is_compressing = True
         self.processed_files = 0
+        self.progress_channel.reset()
         
         # Mettre à jour l'interface
         self.start_btn.config(state=tk.DISABLED)
@@ -899,6 +464,7 @@ class UltraCompressionApp:
                 return
             self.is_compressing = False
         
+        self.progress_channel.close()
         self.root.quit()
 
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UltraCompression en ligne de commande (sans interface graphique, sans tkinter)
+Utilisable sur un serveur sans écran, depuis cron ou un script.
+
+    python ultracompression_cli.py scan E:\\
+    python ultracompression_cli.py compress E:\\ --level 5 --yes
+    python ultracompression_cli.py compress E:\\ F:\\ G:\\ --yes    (disques compressés en parallèle)
+"""
+
+import argparse
+import signal
+import sys
+import threading
+import time
+
+import config
+from compression_backends import BACKENDS
+from compression_engine import CompressionEngine
+from job_manager import JobManager
+
+# Niveaux de log affichés sans --verbose (les autres sont produits pour chaque fichier)
+_QUIET_LEVELS = {"COMPRESS", "SUCCESS"}
+
+
+class ConsoleReporter:
+    """Affiche les logs et la progression du moteur sur la console"""
+
+    def __init__(self, verbose=False, progress_every=100):
+        self.verbose = verbose
+        self.progress_every = progress_every
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def log(self, message, level="INFO"):
+        if self.verbose or level not in _QUIET_LEVELS:
+            self._print(message, sys.stderr if level == "ERROR" else sys.stdout)
+
+    def event(self, event_type, *data):
+        if event_type == "total":
+            self.total = data[0]
+        elif event_type == "progress":
+            processed = data[0]
+            if processed % self.progress_every == 0:
+                self._print(f"⏳ {processed} / {max(self.total, processed)} fichiers traités")
+        elif event_type == "error_log":
+            self._print(f"ERREUR: {data[0]}", sys.stderr)
+        elif event_type == "log" and self.verbose:
+            self._print(data[0])
+        elif event_type in ("complete", "stopped", "error", "time_estimate"):
+            self._print(f"{event_type}: {data[0]}", sys.stderr if event_type == "error" else sys.stdout)
+
+    def _print(self, message, stream=sys.stdout):
+        timestamp = time.strftime("%H:%M:%S")
+        with self._lock:
+            print(f"[{timestamp}] {message}", file=stream, flush=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="ultracompression",
+        description="Compresse récursivement tous les fichiers d'un disque (les originaux sont supprimés)")
+    parser.add_argument("--backend", choices=["auto"] + sorted(BACKENDS),
+                        default=config.COMPRESSION_BACKEND, help="moteur de compression")
+    parser.add_argument("-v", "--verbose", action="store_true", help="afficher chaque fichier traité")
+    parser.add_argument("--scan-workers", type=int, default=config.SCAN_WORKERS, metavar="N",
+                        help="threads de listage des répertoires (défaut: selon le disque)")
+    parser.add_argument("--deterministic-scan", action="store_true", default=config.SCAN_DETERMINISTIC,
+                        help="parcourir les fichiers dans l'ordre du scan séquentiel")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = subparsers.add_parser("scan", help="analyser sans rien modifier (fichiers éligibles, estimation)")
+    scan_parser.add_argument("path", help="disque ou dossier à analyser")
+    scan_parser.add_argument("-l", "--level", type=int, choices=range(10), default=5,
+                             metavar="0-9", help="niveau de compression prévu, pour l'estimation (défaut: 5)")
+
+    compress_parser = subparsers.add_parser("compress", help="compresser puis supprimer les originaux")
+    compress_parser.add_argument("path", nargs="+",
+                                 help="disques ou dossiers à compresser (un pipeline par disque physique)")
+    compress_parser.add_argument("-l", "--level", type=int, choices=range(10), default=5,
+                                 metavar="0-9", help="niveau de compression (défaut: 5)")
+    compress_parser.add_argument("-y", "--yes", action="store_true",
+                                 help="ne pas demander de confirmation (obligatoire hors terminal)")
+    return parser
+
+
+def _confirm(paths, level):
+    """Demande confirmation avant de supprimer les originaux (refus si pas de terminal)"""
+    if not sys.stdin.isatty():
+        print("Confirmation impossible hors terminal: utilisez --yes", file=sys.stderr)
+        return False
+    answer = input(f"Compresser tous les fichiers de {', '.join(paths)} (niveau {level}) "
+                   "et supprimer les originaux ? [o/N] ")
+    return answer.strip().lower() in ("o", "oui", "y", "yes")
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande; retourne le code de sortie"""
+    args = build_parser().parse_args(argv)
+    config.SCAN_WORKERS = args.scan_workers
+    config.SCAN_DETERMINISTIC = args.deterministic_scan
+    reporter = ConsoleReporter(verbose=args.verbose)
+
+    # Ctrl+C demande un arrêt propre (journal et index sont refermés par le moteur)
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_requested.set())
+
+    should_continue = lambda: not stop_requested.is_set()
+    try:
+        engine = CompressionEngine(reporter.log, reporter.event, should_continue, backend_name=args.backend)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.command == "scan":
+        stats, estimation = engine.plan(args.path, args.level)
+        print(f"Fichiers éligibles: {stats.eligible_files} ({stats.total_size / (1024 * 1024):.1f} MB)")
+        print(f"Fichiers ignorés: {stats.ignored_files}, dossiers ignorés: {stats.ignored_dirs}")
+        for ext, count in stats.top_file_types(10):
+            print(f"   {ext}: {count} fichiers")
+        print(f"Temps estimé: {estimation['estimated_minutes']:.1f} minutes")
+        return 130 if stop_requested.is_set() else 0
+
+    if not args.yes and not _confirm(args.path, args.level):
+        return 1
+
+    reporter.log(engine.describe_backend(), "INFO")
+    if len(args.path) > 1:
+        summary = JobManager(reporter.log, reporter.event, should_continue,
+                             backend_name=args.backend).run(args.path, args.level)
+    else:
+        summary = engine.compress(args.path[0], args.level)
+    if summary is None:
+        return 2
+    if stop_requested.is_set():
+        return 130
+    return 1 if summary['failed'] or summary['stage_errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())